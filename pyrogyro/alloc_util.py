@@ -0,0 +1,35 @@
+"""
+Measuring what a hot-path call allocates, for the gyro_math benchmark and
+the gyro allocation test.
+"""
+
+import statistics
+import tracemalloc
+
+# bytes an in-place gyro frame may allocate; less than a single Vec2
+GYRO_FRAME_ALLOC_BUDGET = 32
+
+
+def peak_frame_bytes(step, frames: int) -> int:
+    """
+    The memory a call of step() has allocated at its peak, by tracemalloc:
+    the median over frames, so an occasional allocator refill isn't counted,
+    less what reading tracemalloc's counters allocates itself.
+    """
+
+    def median_peak(call):
+        peaks = []
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            call()
+            _, peak = tracemalloc.get_traced_memory()
+            peaks.append(peak - before)
+        return statistics.median(peaks)
+
+    tracemalloc.start()
+    try:
+        overhead = median_peak(lambda: None)
+        return max(int(median_peak(step) - overhead), 0)
+    finally:
+        tracemalloc.stop()
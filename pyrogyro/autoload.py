@@ -0,0 +1,110 @@
+import collections
+import re
+import typing
+
+from pyrogyro.constants import AUTOLOAD_CACHE_SIZE
+from pyrogyro.mapping import Mapping
+
+MATCH_ALL = ".*"
+
+# a pattern made only of plain and escaped characters matches one literal string
+_LITERAL_PATTERN = re.compile(r"(?:[^\\.^$*+?{}\[\]|()]|\\[^A-Za-z0-9])*")
+_ESCAPED_CHAR = re.compile(r"\\(.)")
+
+
+def literal_pattern(pattern: str):
+    """
+    Returns the string a regex pattern matches if it's a plain literal, else None.
+    """
+    if _LITERAL_PATTERN.fullmatch(pattern):
+        return _ESCAPED_CHAR.sub(r"\1", pattern)
+    return None
+
+
+def _compile_matcher(pattern: str):
+    if pattern == MATCH_ALL:
+        return None
+    return re.compile(pattern).fullmatch
+
+
+class AutoloadEntry:
+    def __init__(self, mapping: Mapping):
+        autoload = mapping.autoload
+        self.mapping = mapping
+        self.specificity = autoload.count_specificity()
+        self.match_controller_name = _compile_matcher(autoload.match_controller_name)
+        self.match_window_name = _compile_matcher(autoload.match_window_name)
+        self.match_exe_name = _compile_matcher(autoload.match_exe_name)
+
+    def matches(self, controller_name: str, exe_name: str, window_title: str):
+        return (
+            (
+                not self.match_controller_name
+                or self.match_controller_name(controller_name)
+            )
+            and (not self.match_window_name or self.match_window_name(window_title))
+            and (not self.match_exe_name or self.match_exe_name(exe_name))
+        )
+
+
+class AutoloadIndex:
+    """
+    Picks the autoload mapping for a (controller, exe, window): of the configs
+    whose patterns all fully match, the one with the highest specificity, or
+    none if that's a tie. Every pattern is compiled once, configs that name
+    one literal exe are bucketed by it, and decisions are memoized in an LRU.
+    Build a new index whenever the set of mappings changes.
+    """
+
+    def __init__(
+        self,
+        mappings: typing.Iterable[Mapping],
+        cache_size: int = AUTOLOAD_CACHE_SIZE,
+    ):
+        self.exe_buckets = collections.defaultdict(list)
+        self.pattern_entries = []
+        for mapping in mappings:
+            entry = AutoloadEntry(mapping)
+            exe_literal = literal_pattern(mapping.autoload.match_exe_name)
+            if exe_literal is not None:
+                entry.match_exe_name = None
+                self.exe_buckets[exe_literal].append(entry)
+            else:
+                self.pattern_entries.append(entry)
+        self.cache_size = cache_size
+        self.decisions = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.pattern_entries) + sum(map(len, self.exe_buckets.values()))
+
+    def choose(self, controller_name: str, exe_name: str, window_title: str):
+        key = (controller_name, exe_name, window_title)
+        decisions = self.decisions
+        if key in decisions:
+            decisions.move_to_end(key)
+            self.hits += 1
+            return decisions[key]
+        self.misses += 1
+        chosen = self.resolve(controller_name, exe_name, window_title)
+        decisions[key] = chosen
+        if len(decisions) > self.cache_size:
+            decisions.popitem(last=False)
+        return chosen
+
+    def resolve(self, controller_name: str, exe_name: str, window_title: str):
+        candidates = [
+            entry
+            for entries in (self.exe_buckets.get(exe_name, ()), self.pattern_entries)
+            for entry in entries
+            if entry.matches(controller_name, exe_name, window_title)
+        ]
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0].mapping
+        best_specificity = max(entry.specificity for entry in candidates)
+        best = [entry for entry in candidates if entry.specificity == best_specificity]
+        # an ambiguous best match picks nothing, as before
+        return best[0].mapping if len(best) == 1 else None
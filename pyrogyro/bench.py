@@ -0,0 +1,631 @@
+"""
+Micro-benchmarks for PyroGyro's hot paths.
+
+Run with `poetry run bench [name ...]`; with no names, every benchmark runs.
+"""
+
+import argparse
+import logging
+import time
+import typing
+import uuid
+
+import sdl3
+
+from pyrogyro.constants import LOG_FORMAT
+
+BENCHMARKS: typing.Dict[str, typing.Callable[..., typing.Dict[str, float]]] = {}
+
+logger = logging.getLogger("PyroGyroBench")
+
+
+def benchmark(name: str):
+    def register(func):
+        BENCHMARKS[name] = func
+        return func
+
+    return register
+
+
+def per_second(func, iterations: int) -> float:
+    start = time.perf_counter_ns()
+    func(iterations)
+    elapsed_ns = time.perf_counter_ns() - start
+    return iterations / (elapsed_ns / 1000000000.0) if elapsed_ns else float("inf")
+
+
+@benchmark("routing")
+def bench_event_routing(iterations: int = 500000, pad_count: int = 4):
+    """
+    Gamepad event -> pad lookup, comparing the old GUID/UUID lookup against the
+    instance ID routing table. The GUID path uses prebuilt SDL_GUID structs in
+    place of SDL_GetGamepadGUIDForID, so it understates the old cost by one FFI call.
+    """
+    guids = {}
+    pads_by_uuid = {}
+    pad_routes = {}
+    for instance_id in range(1, pad_count + 1):
+        guid = sdl3.SDL_GUID()
+        guid.data[15] = instance_id
+        guids[instance_id] = guid
+        pad = object()
+        pads_by_uuid[uuid.UUID(bytes=bytes(guid.data[0:16]))] = pad
+        pad_routes[instance_id] = pad
+    event_ids = [(ix % pad_count) + 1 for ix in range(iterations)]
+
+    def guid_lookup(count):
+        for which in event_ids[:count]:
+            joystick_uuid_bytes = guids[which].data[0:16]
+            joystick_uuid = uuid.UUID(bytes=bytes(joystick_uuid_bytes))
+            pads_by_uuid.get(joystick_uuid)
+
+    def routed_lookup(count):
+        for which in event_ids[:count]:
+            pad_routes.get(which)
+
+    guid_rate = per_second(guid_lookup, iterations)
+    routed_rate = per_second(routed_lookup, iterations)
+    return {
+        "guid events/s": guid_rate,
+        "routed events/s": routed_rate,
+        "speedup": routed_rate / guid_rate,
+    }
+
+
+@benchmark("decode")
+def bench_event_decode(iterations: int = 200000):
+    """
+    Reading sensor events through the ctypes union wrappers, compared with
+    decoding them out of the raw EventBatch buffer.
+    """
+    from pyrogyro.sdl_events import EVENT_DECODERS, EventBatch
+
+    batch = EventBatch()
+    for event in batch.events:
+        event.gsensor.type = sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE
+        event.gsensor.sensor = sdl3.SDL_SENSOR_GYRO
+        event.gsensor.data[0] = 1.0
+    batch_size, event_size = batch.batch_size, batch.event_size
+    decode = EVENT_DECODERS[sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE]
+
+    def ctypes_fields(count):
+        for ix in range(count):
+            event = batch.events[ix % batch_size]
+            if event.type == sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE:
+                sensor_event = event.gsensor
+                (
+                    sensor_event.which,
+                    sensor_event.sensor,
+                    *sensor_event.data,
+                    sensor_event.sensor_timestamp,
+                )
+
+    def buffer_decode(count):
+        buffer = batch.buffer
+        for ix in range(count):
+            decode(buffer, (ix % batch_size) * event_size)
+
+    ctypes_rate = per_second(ctypes_fields, iterations)
+    decode_rate = per_second(buffer_decode, iterations)
+    return {
+        "ctypes events/s": ctypes_rate,
+        "decoded events/s": decode_rate,
+        "speedup": decode_rate / ctypes_rate,
+    }
+
+
+class SyntheticPad:
+    """
+    Stand-in for PyroGyroPad that burns a fixed amount of CPU per frame.
+    """
+
+    def __init__(self, sdl_joystick_id: int, work_iterations: int):
+        self.sdl_joystick_id = sdl_joystick_id
+        self.work_iterations = work_iterations
+
+    def on_poll_start(self):
+        pass
+
+    def handle_event(self, event):
+        pass
+
+    def update(self, time_now: float):
+        total = 0.0
+        for ix in range(self.work_iterations):
+            total += ix * 0.5
+
+
+@benchmark("pad_threads")
+def bench_pad_threads(
+    frames: int = 500,
+    pad_counts: typing.Sequence[int] = (1, 2, 4, 8),
+    work_iterations: int = 2000,
+    poll_rate: int = 1000,
+):
+    """
+    Mean per-pad output latency (frame submitted -> pad update finished) for
+    INLINE and THREADED execution as the pad count grows.
+    """
+    from pyrogyro.pad_worker import PadWorker
+
+    period = 1.0 / poll_rate
+    results = {}
+    for pad_count in pad_counts:
+        pads = [SyntheticPad(ix, work_iterations) for ix in range(pad_count)]
+        inline_total_ns = 0
+        for _ in range(frames):
+            frame_start = time.perf_counter_ns()
+            for pad in pads:
+                pad.on_poll_start()
+                pad.update(time.time())
+                inline_total_ns += time.perf_counter_ns() - frame_start
+            time.sleep(period)
+        workers = [PadWorker(pad).start() for pad in pads]
+        for _ in range(frames):
+            for worker in workers:
+                worker.on_poll_start()
+                worker.update(time.time())
+            time.sleep(period)
+        for worker in workers:
+            worker.stop()
+        threaded_total_ns = sum(worker.latency_total_ns for worker in workers)
+        threaded_frames = max(sum(worker.frame_count for worker in workers), 1)
+        results[f"{pad_count} pads inline us"] = (
+            inline_total_ns / (frames * pad_count) / 1000
+        )
+        results[f"{pad_count} pads threaded us"] = (
+            threaded_total_ns / threaded_frames / 1000
+        )
+    return results
+
+
+@benchmark("dispatch")
+def bench_dispatch(iterations: int = 20000):
+    """
+    Sending one frame of changed inputs through a ReplayPad, with targets
+    resolved from the mapping on every input compared with the compiled plan.
+    """
+    from pyrogyro.capture import ReplayPad
+    from pyrogyro.dispatch import DispatchMode
+    from pyrogyro.io_types import (
+        AsAim,
+        DoubleAxisSource,
+        MouseTarget,
+        SDLButtonSource,
+        SingleAxisSource,
+    )
+    from pyrogyro.mapping import get_default_xbox_mapping
+    from pyrogyro.math import Vec2
+
+    inputs = (
+        (SDLButtonSource.S, True),
+        (SingleAxisSource.L2, 0.5),
+        (DoubleAxisSource.LSTICK, Vec2(0.5, 0.25)),
+        (DoubleAxisSource.RSTICK, Vec2(0.0, 0.05)),
+    )
+
+    def run_frames(dispatch_mode):
+        mapping = get_default_xbox_mapping()
+        mapping.mapping[DoubleAxisSource.RSTICK] = AsAim(
+            map_as="AIM", o=MouseTarget.MOUSE
+        )
+        pad = ReplayPad(0, "Bench Pad", mapping=mapping, dispatch_mode=dispatch_mode)
+
+        def frames(count):
+            for _ in range(count):
+                for source, value in inputs:
+                    pad.input_store.put_input(source, value)
+                pad.send_changed_input_values(delta_time=0.001)
+                pad.outputs.clear()
+
+        return frames
+
+    interpreted_rate = per_second(run_frames(DispatchMode.INTERPRETED), iterations)
+    compiled_rate = per_second(run_frames(DispatchMode.COMPILED), iterations)
+    return {
+        "interpreted frames/s": interpreted_rate,
+        "compiled frames/s": compiled_rate,
+        "speedup": compiled_rate / interpreted_rate,
+    }
+
+
+def write_synthetic_profiles(config_dir, profile_count: int):
+    """
+    Writes `profile_count` per-game style configs (autoload rules, aim, dpad,
+    gyro settings and a layer each) into config_dir, returning their paths.
+    """
+    from pathlib import Path
+
+    from pyrogyro.io_types import (
+        AsAim,
+        AsDpad,
+        ButtonTarget,
+        DoubleAxisSource,
+        LayerTarget,
+        MouseTarget,
+        SDLButtonSource,
+    )
+    from pyrogyro.mapping import AutoloadConfig, Layer, get_default_xbox_mapping
+
+    paths = []
+    for index in range(profile_count):
+        mapping = get_default_xbox_mapping()
+        mapping.name = f"Synthetic Game {index}"
+        mapping.autoload = AutoloadConfig(match_exe_name=f"game{index}\\.exe")
+        mapping.in_game_sens = 1.0 + index % 7
+        mapping.mapping[DoubleAxisSource.RSTICK] = AsAim(
+            map_as="AIM", o=MouseTarget.MOUSE, sens=180.0 + index
+        )
+        mapping.mapping[SDLButtonSource.M1] = LayerTarget(map_as="LAYER", layer="alt")
+        mapping.layers = {
+            "alt": Layer(
+                mapping={
+                    DoubleAxisSource.LSTICK: AsDpad(
+                        map_as="DPAD",
+                        UP=ButtonTarget.X_UP,
+                        DOWN=ButtonTarget.X_DOWN,
+                        LEFT=ButtonTarget.X_LEFT,
+                        RIGHT=ButtonTarget.X_RIGHT,
+                    ),
+                }
+            )
+        }
+        path = Path(config_dir) / f"game{index}.yml"
+        with open(path, "w") as config_file:
+            mapping.save_to_file(config_file)
+        paths.append(path)
+    return paths
+
+
+@benchmark("config_cache")
+def bench_config_cache(profile_count: int = 500):
+    """
+    Loading a synthetic library of configs by parsing and validating each,
+    compared with loading them from a warm ConfigCache in a fresh process
+    (a new ConfigCache reading the cache file back in).
+    """
+    import tempfile
+    from pathlib import Path
+
+    from pyrogyro.config_loader import ConfigCache
+    from pyrogyro.mapping import Mapping
+
+    with tempfile.TemporaryDirectory() as config_dir:
+        paths = write_synthetic_profiles(config_dir, profile_count)
+        cache_path = Path(config_dir) / ".config_cache"
+
+        start = time.perf_counter()
+        for path in paths:
+            Mapping.load_from_file(file_handle=path)
+        parse_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cold_cache = ConfigCache(cache_path)
+        for path in paths:
+            cold_cache.load(path)
+        cold_cache.save()
+        cold_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        warm_cache = ConfigCache(cache_path)
+        for path in paths:
+            warm_cache.load(path)
+        warm_seconds = time.perf_counter() - start
+        cache_kib = cache_path.stat().st_size / 1024
+
+    return {
+        "profiles": profile_count,
+        "parse ms": parse_seconds * 1000,
+        "cold cache ms": cold_seconds * 1000,
+        "warm cache ms": warm_seconds * 1000,
+        "cache file KiB": cache_kib,
+        "speedup": parse_seconds / warm_seconds,
+    }
+
+
+@benchmark("config_load")
+def bench_config_load(profile_count: int = 500):
+    """
+    Cold-loading a synthetic library of configs (no config cache) serially and
+    with parallel parsing at increasing worker counts. Pool start-up is
+    included, as it is on a real first launch.
+    """
+    import os
+    import tempfile
+    from pathlib import Path
+
+    from pyrogyro.config_loader import ConfigCache, ConfigLoadMode
+
+    def cold_load(mode, max_workers=None):
+        start = time.perf_counter()
+        results = ConfigCache(Path(config_dir) / ".config_cache").load_many(
+            paths, mode=mode, max_workers=max_workers
+        )
+        elapsed = time.perf_counter() - start
+        assert all(result.mapping for result in results)
+        return elapsed
+
+    results = {"profiles": profile_count}
+    with tempfile.TemporaryDirectory() as config_dir:
+        paths = write_synthetic_profiles(config_dir, profile_count)
+        serial_seconds = cold_load(ConfigLoadMode.SERIAL)
+        results["serial ms"] = serial_seconds * 1000
+        worker_count = 2
+        while worker_count <= (os.cpu_count() or 1):
+            parallel_seconds = cold_load(ConfigLoadMode.PARALLEL, worker_count)
+            results[f"{worker_count} workers ms"] = parallel_seconds * 1000
+            results[f"{worker_count} workers speedup"] = (
+                serial_seconds / parallel_seconds
+            )
+            worker_count *= 2
+    return results
+
+
+@benchmark("autoload")
+def bench_autoload(profile_count: int = 500, iterations: int = 2000):
+    """
+    Choosing an autoload mapping on a focus change with the AutoloadIndex, for
+    apps seen for the first time and for apps switched back to, and building
+    the index, as every config change does.
+    """
+    from pyrogyro.autoload import AutoloadIndex
+    from pyrogyro.mapping import AutoloadConfig, Mapping
+
+    mappings = [Mapping(name="Default", autoload=AutoloadConfig.get_match_all())]
+    for index in range(profile_count):
+        if index % 10:
+            autoload = AutoloadConfig(match_exe_name=f"game{index}\\.exe")
+        else:
+            autoload = AutoloadConfig(
+                match_exe_name=f"launcher{index}.*",
+                match_window_name=f".*Game {index}.*",
+            )
+        mappings.append(Mapping(name=f"Synthetic Game {index}", autoload=autoload))
+    controller_name = "Xbox Series X Controller"
+    focus_changes = [
+        (f"game{index * 7 % profile_count}.exe", f"Game {index}")
+        for index in range(iterations)
+    ]
+    seen_focus = focus_changes[:16] * (iterations // 16)
+
+    def build(count):
+        for _ in range(count):
+            AutoloadIndex(mappings)
+
+    def indexed(focus_list):
+        autoload_index = AutoloadIndex(mappings)
+
+        def run(count):
+            for exe_name, window_title in focus_list[:count]:
+                autoload_index.choose(controller_name, exe_name, window_title)
+
+        return run
+
+    return {
+        "index builds/s": per_second(build, 20),
+        "new focus decisions/s": per_second(indexed(focus_changes), iterations),
+        "cached decisions/s": per_second(indexed(seen_focus), len(seen_focus)),
+    }
+
+
+@benchmark("led")
+def bench_led(frames: int = 20000, poll_rate: int = 1000):
+    """
+    Per-frame LED cost for one pad at poll_rate, lerping and converting the
+    colour every frame compared with the baked table at the LED refresh
+    rate, and how many LED writes each would make.
+    """
+    from pyrogyro.led import ROYGBIV, ColorSpace, LedTable, LerpableLED, PadLed
+
+    def new_led():
+        return LerpableLED().set_sequence(
+            ROYGBIV,
+            color_space=ColorSpace.HSV,
+            duration_per_color=10,
+            instant_loop=True,
+        )
+
+    timestamps = [index / poll_rate for index in range(frames)]
+
+    def lerped(count):
+        led = new_led()
+        for timestamp in timestamps[:count]:
+            led.update(timestamp)
+            color = led.get_rgb_color()
+            (int(color.x * 255), int(color.y * 255), int(color.z * 255))
+
+    writes = 0
+
+    def tabled(count):
+        nonlocal writes
+        pad_led = PadLed(LedTable(new_led()))
+        for timestamp in timestamps[:count]:
+            pad_led.update(timestamp)
+        writes = pad_led.written
+
+    lerp_rate = per_second(lerped, frames)
+    table_rate = per_second(tabled, frames)
+    return {
+        "lerp frames/s": lerp_rate,
+        "table frames/s": table_rate,
+        "speedup": table_rate / lerp_rate,
+        "lerp writes": frames,
+        "table writes": writes,
+    }
+
+
+@benchmark("gyro_math")
+def bench_gyro_math(frames: int = 100000):
+    """
+    One pad's per-frame gyro path: calibration, sensor fusion and the world
+    gyro camera. The allocating path builds a new Vec3/Quat per operation, as
+    the gyro path used to; the in-place path reuses the pad's scratch objects.
+    Also measures the most either allocates in a frame, and checks the
+    in-place path against GYRO_FRAME_ALLOC_BUDGET.
+    """
+    import random
+
+    from pyrogyro.alloc_util import GYRO_FRAME_ALLOC_BUDGET, peak_frame_bytes
+    from pyrogyro.gamepad_motion import (
+        GyroCalibration,
+        GyroConfig,
+        GyroMode,
+        sensor_fusion_gravity,
+    )
+    from pyrogyro.math import Quat, Vec2, Vec3
+
+    delta_seconds = 0.001
+    rand = random.Random(0)
+    samples = [
+        (
+            Vec3(rand.gauss(0, 90), rand.gauss(0, 90), rand.gauss(0, 90)),
+            Vec3(rand.gauss(0, 0.1), rand.gauss(-1, 0.1), rand.gauss(0, 0.1)),
+        )
+        for _ in range(1024)
+    ]
+    calibration = GyroCalibration()
+    calibration.update(Vec3(0.5, -0.25, 0.125))
+    config = GyroConfig(gyro_mode=GyroMode.WORLD, gyro_sens=2.0)
+
+    allocating_gravity = Vec3(0.0, -1.0, 0.0)
+
+    def allocating_frame(index):
+        nonlocal allocating_gravity
+        sample, accel = samples[index & 1023]
+        gyro = calibration.calibrated(sample)
+        rotation = Quat.angle_axis(
+            gyro.length() * delta_seconds, -gyro.x, -gyro.y, -gyro.z
+        )
+        gravity = allocating_gravity
+        rotated = rotation * Quat(0.0, gravity.x, gravity.y, gravity.z)
+        rotated = rotated * rotation.inverse()
+        gravity = Vec3(rotated.x, rotated.y, rotated.z)
+        gravity += (accel * -1 - gravity) * 0.02
+        allocating_gravity = gravity
+        return config.gyro_pixels(gyro, gravity.normalized(), delta_seconds)
+
+    gravity = Vec3(0.0, -1.0, 0.0)
+    gyro = Vec3()
+    rotation = Quat(1.0, 0.0, 0.0, 0.0)
+    grav_norm = Vec3()
+    pixel_vel = Vec2()
+
+    def in_place_frame(index):
+        sample, accel = samples[index & 1023]
+        gyro.set_value(sample.x, sample.y, sample.z)
+        calibration.calibrate(gyro)
+        sensor_fusion_gravity(gravity, gyro, accel, delta_seconds, rotation=rotation)
+        return config.gyro_pixels(
+            gyro, grav_norm.set_normalized(gravity), delta_seconds, out=pixel_vel
+        )
+
+    def allocating(count):
+        for index in range(count):
+            allocating_frame(index)
+
+    def in_place(count):
+        for index in range(count):
+            in_place_frame(index)
+
+    allocating_rate = per_second(allocating, frames)
+    in_place_rate = per_second(in_place, frames)
+    allocating_bytes = peak_frame_bytes(lambda: allocating_frame(0), 1000)
+    in_place_bytes = peak_frame_bytes(lambda: in_place_frame(0), 1000)
+    if in_place_bytes > GYRO_FRAME_ALLOC_BUDGET:
+        logger.error(
+            f"in-place gyro frame allocated {in_place_bytes} bytes,"
+            f" over the {GYRO_FRAME_ALLOC_BUDGET} byte budget"
+        )
+    return {
+        "allocating frames/s": allocating_rate,
+        "in-place frames/s": in_place_rate,
+        "speedup": in_place_rate / allocating_rate,
+        "allocating bytes/frame": allocating_bytes,
+        "in-place bytes/frame": in_place_bytes,
+        "budget bytes/frame": GYRO_FRAME_ALLOC_BUDGET,
+    }
+
+
+@benchmark("sensor_pipeline")
+def bench_sensor_pipeline(frames: int = 20000, samples_per_frame: int = 4):
+    """
+    Gyro processing for frames carrying several gyro samples each, a steady
+    90 deg/s yaw: summing the frame's samples and processing them once, as
+    SUMMED sensor pipeline mode does, against PER_SAMPLE's SensorPipeline.
+    Also reports the yaw each integrates over a second of frames.
+    """
+    from pyrogyro.gamepad_motion import (
+        GyroCalibration,
+        GyroConfig,
+        GyroMode,
+        sensor_fusion_gravity,
+    )
+    from pyrogyro.math import Quat, Vec2, Vec3
+    from pyrogyro.sensor_pipeline import SensorPipeline
+
+    poll_rate = 1000
+    sample_ns = 1000000000 // (poll_rate * samples_per_frame)
+    delta_max = 5 / poll_rate
+    config = GyroConfig(gyro_mode=GyroMode.WORLD)
+    calibration = GyroCalibration()
+
+    def summed_run(count):
+        gravity = Vec3(0.0, -1.0, 0.0)
+        gyro, accel, sample = Vec3(), Vec3(), Vec3()
+        rotation, grav_norm, pixels = Quat(1.0, 0.0, 0.0, 0.0), Vec3(), Vec2()
+        yaw = 0.0
+        for _ in range(count):
+            gyro.set_value(0, 0, 0)
+            accel.set_value(0, 0, 0)
+            for _ in range(samples_per_frame):
+                gyro += sample.set_value(0.0, 90.0, 0.0)
+                accel += sample.set_value(0.0, 1.0, 0.0)
+            delta_seconds = sample_ns * samples_per_frame / 1000000000.0
+            calibration.calibrate(gyro)
+            sensor_fusion_gravity(
+                gravity, gyro, accel, delta_seconds, rotation=rotation
+            )
+            config.gyro_pixels(
+                gyro, grav_norm.set_normalized(gravity), delta_seconds, out=pixels
+            )
+            yaw += pixels.x
+        return yaw
+
+    def per_sample_run(count):
+        pipeline = SensorPipeline()
+        gravity = Vec3(0.0, -1.0, 0.0)
+        pixels = Vec2()
+        timestamp = 0
+        yaw = 0.0
+        for _ in range(count):
+            for _ in range(samples_per_frame):
+                timestamp += sample_ns
+                pipeline.add_accel(0.0, 1.0, 0.0)
+                pipeline.add_gyro(timestamp, 0.0, 90.0, 0.0)
+            yaw += pipeline.process(gravity, calibration, config, pixels, delta_max).x
+        return yaw
+
+    summed_rate = per_second(summed_run, frames)
+    per_sample_rate = per_second(per_sample_run, frames)
+    return {
+        "summed frames/s": summed_rate,
+        "per-sample frames/s": per_sample_rate,
+        "relative cost": summed_rate / per_sample_rate,
+        "summed yaw/s": abs(summed_run(poll_rate)),
+        "per-sample yaw/s": abs(per_sample_run(poll_rate)),
+    }
+
+
+def bench_main(*args, **kwargs):
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    parser = argparse.ArgumentParser(description="PyroGyro micro-benchmarks")
+    parser.add_argument("names", nargs="*", help=f"any of {', '.join(BENCHMARKS)}")
+    cmd_args = parser.parse_args()
+    for name in cmd_args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark '{name}'")
+    for name in cmd_args.names or BENCHMARKS:
+        results = BENCHMARKS[name]()
+        logger.info(f"== {name} ==")
+        for key, value in results.items():
+            logger.info(f"{key}: {value:,.2f}")
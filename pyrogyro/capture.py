@@ -0,0 +1,374 @@
+"""
+Recording of live gamepad input, and deterministic replay of it through
+PyroGyroPad with outputs captured instead of sent to the OS or a virtual pad.
+
+Capture file layout (little-endian):
+    header:  b"PGCAP" + u16 version
+    records: u8 tag, then
+        TAG_DEVICE: u32 instance ID, u16 name length, utf-8 name
+        TAG_FRAME:  f64 frame time, u32 event count, then that many events
+    events:  u32 SDL event type, then the rest of the decoded event tuple
+             (see pyrogyro.sdl_events), packed per event type
+"""
+
+import argparse
+import json
+import logging
+import math
+import struct
+import time
+import typing
+
+import sdl3
+
+from pyrogyro.constants import (
+    DEFAULT_DISPATCH_MODE,
+    DEFAULT_SENSOR_PIPELINE_MODE,
+    LOG_FORMAT,
+)
+from pyrogyro.dispatch import DispatchMode
+from pyrogyro.io_types import (
+    ButtonTarget,
+    DoubleAxisTarget,
+    LayerTarget,
+    SingleAxisTarget,
+)
+from pyrogyro.mapping import Mapping
+from pyrogyro.math import Vec2
+from pyrogyro.pyrogyro_pad import PyroGyroPad
+from pyrogyro.sensor_pipeline import SensorPipelineMode
+from pyrogyro.virtual_pad import VpadBackend
+
+CAPTURE_MAGIC = b"PGCAP"
+CAPTURE_VERSION = 1
+
+TAG_DEVICE = 1
+TAG_FRAME = 2
+
+_HEADER_STRUCT = struct.Struct(f"<{len(CAPTURE_MAGIC)}sH")
+_TAG_STRUCT = struct.Struct("<B")
+_DEVICE_STRUCT = struct.Struct("<IH")
+_FRAME_STRUCT = struct.Struct("<dI")
+_EVENT_TYPE_STRUCT = struct.Struct("<I")
+
+_BUTTON_STRUCT = struct.Struct("<IQIB?")
+_AXIS_STRUCT = struct.Struct("<IQIBh")
+_SENSOR_STRUCT = struct.Struct("<IQIi3fQ")
+_TOUCHPAD_STRUCT = struct.Struct("<IQIii3f")
+
+CAPTURE_EVENT_STRUCTS = {
+    sdl3.SDL_EVENT_GAMEPAD_BUTTON_DOWN: _BUTTON_STRUCT,
+    sdl3.SDL_EVENT_GAMEPAD_BUTTON_UP: _BUTTON_STRUCT,
+    sdl3.SDL_EVENT_GAMEPAD_AXIS_MOTION: _AXIS_STRUCT,
+    sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE: _SENSOR_STRUCT,
+    sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_DOWN: _TOUCHPAD_STRUCT,
+    sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_MOTION: _TOUCHPAD_STRUCT,
+    sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_UP: _TOUCHPAD_STRUCT,
+}
+
+
+class CaptureFormatError(ValueError):
+    pass
+
+
+class CaptureWriter:
+    def __init__(self, path):
+        self.path = path
+        self.file_handle = open(path, "wb")
+        self.file_handle.write(_HEADER_STRUCT.pack(CAPTURE_MAGIC, CAPTURE_VERSION))
+        self.frame_count = 0
+
+    def add_device(self, which: int, name: str):
+        name_bytes = name.encode()
+        self.file_handle.write(_TAG_STRUCT.pack(TAG_DEVICE))
+        self.file_handle.write(_DEVICE_STRUCT.pack(which, len(name_bytes)))
+        self.file_handle.write(name_bytes)
+
+    def write_frame(self, time_now: float, events: typing.Sequence[tuple]):
+        chunks = [
+            _TAG_STRUCT.pack(TAG_FRAME),
+            _FRAME_STRUCT.pack(time_now, len(events)),
+        ]
+        for event in events:
+            chunks.append(CAPTURE_EVENT_STRUCTS[event[0]].pack(*event))
+        self.file_handle.write(b"".join(chunks))
+        self.frame_count += 1
+
+    def close(self):
+        self.file_handle.close()
+
+
+class CaptureReader:
+    """
+    Iterates a capture file as ("device", which, name) and
+    ("frame", time_now, events) records.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    def __iter__(self):
+        with open(self.path, "rb") as file_handle:
+            data = file_handle.read()
+        magic, version = _HEADER_STRUCT.unpack_from(data, 0)
+        if magic != CAPTURE_MAGIC or version != CAPTURE_VERSION:
+            raise CaptureFormatError(f"{self.path} is not a v{CAPTURE_VERSION} capture")
+        offset = _HEADER_STRUCT.size
+        while offset < len(data):
+            (tag,) = _TAG_STRUCT.unpack_from(data, offset)
+            offset += _TAG_STRUCT.size
+            if tag == TAG_DEVICE:
+                which, name_len = _DEVICE_STRUCT.unpack_from(data, offset)
+                offset += _DEVICE_STRUCT.size
+                name = data[offset : offset + name_len].decode()
+                offset += name_len
+                yield "device", which, name
+            elif tag == TAG_FRAME:
+                time_now, event_count = _FRAME_STRUCT.unpack_from(data, offset)
+                offset += _FRAME_STRUCT.size
+                events = []
+                for _ in range(event_count):
+                    (evt_type,) = _EVENT_TYPE_STRUCT.unpack_from(data, offset)
+                    event_struct = CAPTURE_EVENT_STRUCTS[evt_type]
+                    events.append(event_struct.unpack_from(data, offset))
+                    offset += event_struct.size
+                yield "frame", time_now, events
+            else:
+                raise CaptureFormatError(f"unknown record tag {tag} at {offset}")
+
+
+def _output_value(value):
+    if isinstance(value, Vec2):
+        return [value.x, value.y]
+    if isinstance(value, (bool, int, float)):
+        return value
+    return repr(value)
+
+
+def output_record(frame_index: int, pad_id: int, target, value):
+    return {
+        "frame": frame_index,
+        "pad": pad_id,
+        "target": getattr(target, "name", repr(target)),
+        "value": _output_value(value),
+    }
+
+
+# targets recording pads still hand to PyroGyroPad: virtual pad outputs, which
+# reach the (recorder) virtual pad, and layer changes; keyboard and mouse
+# outputs never leave the recording pad
+PAD_LOCAL_TARGET_TYPES = (ButtonTarget, SingleAxisTarget, DoubleAxisTarget, LayerTarget)
+
+
+class ReplayPad(PyroGyroPad):
+    """
+    A PyroGyroPad with no SDL gamepad behind it, driving a recorder virtual
+    pad; every output is also appended to `outputs`. Latency isn't tracked,
+    as capture timestamps are from another run's clock.
+    """
+
+    track_latency = False
+
+    def __init__(self, sdl_joystick, controller_name: str, outputs=None, **kwargs):
+        self.controller_name = controller_name
+        self.outputs = outputs if outputs is not None else []
+        self.frame_index = 0
+        kwargs.setdefault("vpad_backend", VpadBackend.RECORDER)
+        super().__init__(sdl_joystick, **kwargs)
+
+    def open_devices(self, sdl_joystick):
+        self.open_vpad()
+        self.sdl_pad = None
+
+    @property
+    def real_controller_name(self):
+        return self.controller_name
+
+    def send_value(self, source_value, target, source=None):
+        if isinstance(target, PAD_LOCAL_TARGET_TYPES):
+            super().send_value(source_value, target, source=source)
+        self.outputs.append(
+            output_record(self.frame_index, self.sdl_joystick_id, target, source_value)
+        )
+
+    def write_led(self, color_r: int, color_g: int, color_b: int):
+        pass
+
+    def flush_outputs(self):
+        super().flush_outputs()
+        self.frame_index += 1
+
+
+def replay_capture(
+    capture_path,
+    mapping: Mapping | None = None,
+    realtime: bool = False,
+    dispatch_mode: DispatchMode = DispatchMode(DEFAULT_DISPATCH_MODE),
+    sensor_pipeline_mode: SensorPipelineMode = SensorPipelineMode(
+        DEFAULT_SENSOR_PIPELINE_MODE
+    ),
+):
+    """
+    Feeds a capture through one ReplayPad per recorded device, returning every
+    output produced, in order.
+    """
+    pads = {}
+    outputs = []
+    first_frame_time = None
+    replay_start = time.perf_counter()
+    for record in CaptureReader(capture_path):
+        match record:
+            case "device", which, name:
+                pads[which] = ReplayPad(
+                    which,
+                    name,
+                    outputs=outputs,
+                    mapping=mapping,
+                    dispatch_mode=dispatch_mode,
+                    sensor_pipeline_mode=sensor_pipeline_mode,
+                )
+            case "frame", time_now, events:
+                if realtime:
+                    if first_frame_time is None:
+                        first_frame_time = time_now
+                    wait = (time_now - first_frame_time) - (
+                        time.perf_counter() - replay_start
+                    )
+                    if wait > 0:
+                        time.sleep(wait)
+                for pad in pads.values():
+                    pad.on_poll_start()
+                for event in events:
+                    pad = pads.get(event[2])
+                    if pad:
+                        pad.handle_event(event)
+                for pad in pads.values():
+                    pad.update(time_now)
+    return outputs
+
+
+def _values_match(expected, actual, tolerance):
+    if isinstance(expected, float) or isinstance(actual, float):
+        return all(
+            isinstance(val, (int, float)) for val in (expected, actual)
+        ) and math.isclose(expected, actual, rel_tol=tolerance, abs_tol=tolerance)
+    if isinstance(expected, list) and isinstance(actual, list):
+        return len(expected) == len(actual) and all(
+            _values_match(exp, act, tolerance) for exp, act in zip(expected, actual)
+        )
+    return expected == actual
+
+
+def diff_outputs(expected, actual, tolerance: float = 1e-9):
+    """
+    Returns a list of human-readable differences between two output streams.
+    """
+    differences = []
+    for index, (exp, act) in enumerate(zip(expected, actual)):
+        if not all(
+            _values_match(exp.get(key), act.get(key), tolerance)
+            for key in ("frame", "pad", "target", "value")
+        ):
+            differences.append(f"output {index}: expected {exp}, got {act}")
+    if len(expected) != len(actual):
+        differences.append(
+            f"expected {len(expected)} outputs, replay produced {len(actual)}"
+        )
+    return differences
+
+
+def load_outputs(path):
+    with open(path) as file_handle:
+        return [json.loads(line) for line in file_handle if line.strip()]
+
+
+def save_outputs(path, outputs):
+    with open(path, "w") as file_handle:
+        for output in outputs:
+            file_handle.write(json.dumps(output) + "\n")
+
+
+def replay_main(*args, **kwargs):
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    logger = logging.getLogger("PyroGyroReplay")
+    parser = argparse.ArgumentParser(description="Replay a PyroGyro input capture")
+    parser.add_argument("capture", help="capture file to replay")
+    parser.add_argument("--mapping", help="config file to map the capture with")
+    parser.add_argument(
+        "--realtime", action="store_true", help="replay at the recorded pace"
+    )
+    parser.add_argument(
+        "--dispatch",
+        default=DEFAULT_DISPATCH_MODE,
+        help="COMPILED or INTERPRETED mapping dispatch",
+    )
+    parser.add_argument(
+        "--sensor-pipeline",
+        default=DEFAULT_SENSOR_PIPELINE_MODE,
+        help="PER_SAMPLE or SUMMED gyro processing",
+    )
+    parser.add_argument(
+        "--diff-dispatch",
+        action="store_true",
+        help="also replay with the other dispatch mode and diff the two",
+    )
+    parser.add_argument("--golden", help="output stream to diff the replay against")
+    parser.add_argument("--save-outputs", help="write the replay's output stream here")
+    cmd_args = parser.parse_args()
+    try:
+        dispatch_mode = DispatchMode(cmd_args.dispatch.upper())
+        sensor_pipeline_mode = SensorPipelineMode(cmd_args.sensor_pipeline.upper())
+    except ValueError as error:
+        parser.error(str(error))
+
+    def load_mapping():
+        if cmd_args.mapping:
+            with open(cmd_args.mapping) as mapping_file:
+                return Mapping.load_from_file(mapping_file)
+        return None
+
+    # runtime state lives in each pad, so every replay can share one mapping
+    mapping = load_mapping()
+
+    def replay(mode):
+        replay_start = time.perf_counter()
+        outputs = replay_capture(
+            cmd_args.capture,
+            mapping,
+            realtime=cmd_args.realtime,
+            dispatch_mode=mode,
+            sensor_pipeline_mode=sensor_pipeline_mode,
+        )
+        logger.info(
+            f"Replayed {cmd_args.capture} ({mode.value}): {len(outputs)} outputs in {time.perf_counter() - replay_start:.3f}s"
+        )
+        return outputs
+
+    def report(differences, expected_name):
+        for difference in differences[:20]:
+            logger.info(difference)
+        if differences:
+            logger.info(f"{len(differences)} difference(s) from {expected_name}")
+            return False
+        logger.info(f"Outputs match {expected_name}")
+        return True
+
+    outputs = replay(dispatch_mode)
+    matched = True
+    if cmd_args.save_outputs:
+        save_outputs(cmd_args.save_outputs, outputs)
+    if cmd_args.diff_dispatch:
+        other_mode = (
+            DispatchMode.INTERPRETED
+            if dispatch_mode == DispatchMode.COMPILED
+            else DispatchMode.COMPILED
+        )
+        matched &= report(
+            diff_outputs(replay(other_mode), outputs), f"{other_mode.value} dispatch"
+        )
+    if cmd_args.golden:
+        matched &= report(
+            diff_outputs(load_outputs(cmd_args.golden), outputs), cmd_args.golden
+        )
+    if not matched:
+        raise SystemExit(1)
@@ -0,0 +1,306 @@
+"""
+A persistent cache of validated Mappings, so configs that haven't changed
+since the last run skip YAML parsing and pydantic validation.
+
+Entries are keyed by config path and checked against the file's mtime and
+size; a file whose mtime or size changed is re-hashed, and only re-parsed if
+its content hash changed too.
+
+Batches of configs that miss the cache can be parsed in parallel: in worker
+processes, or in threads on free-threaded builds where validation can run
+concurrently in one process.
+"""
+
+import collections
+import concurrent.futures
+import enum
+import functools
+import hashlib
+import json
+import logging
+import multiprocessing
+import os
+import pickle
+import sys
+from pathlib import Path
+
+import pydantic
+from pydantic import ValidationError
+from ruamel.yaml.scanner import ScannerError
+
+from pyrogyro.constants import (
+    CONFIG_CACHE_PATH,
+    CONFIG_LOAD_MAX_WORKERS,
+    CONFIG_PARALLEL_MIN_FILES,
+)
+from pyrogyro.mapping import Mapping
+
+CONFIG_CACHE_VERSION = 2
+
+
+@functools.cache
+def _cache_tag():
+    # cached objects are only valid for the Mapping schema that pickled them
+    schema = json.dumps(Mapping.model_json_schema(), sort_keys=True)
+    schema_digest = hashlib.sha1(schema.encode()).hexdigest()
+    return (CONFIG_CACHE_VERSION, pydantic.VERSION, schema_digest)
+
+
+CacheEntry = collections.namedtuple(
+    "CacheEntry", ("mtime_ns", "size", "digest", "pickled_mapping")
+)
+
+# mapping is None if the config couldn't be loaded; errors holds the
+# (log level, message) pairs describing why
+ConfigLoadResult = collections.namedtuple(
+    "ConfigLoadResult", ("config_path", "mapping", "errors")
+)
+ParsedConfig = collections.namedtuple(
+    "ParsedConfig", ("config_path", "mapping", "errors", "stat_result", "content")
+)
+
+
+class ConfigLoadMode(enum.Enum):
+    # parse configs one after another on the calling thread
+    SERIAL = "SERIAL"
+    # parse batches of configs in a worker pool
+    PARALLEL = "PARALLEL"
+
+
+def describe_load_error(config_path, error: Exception):
+    """
+    Returns the (log level, message) pairs reported for a config that failed
+    to load.
+    """
+    match error:
+        case ValidationError():
+            errors = [
+                (logging.INFO, f"Error loading config {config_path}; skipping"),
+                (logging.DEBUG, f"== VALIDATION ERRORS =="),
+            ]
+            for err_count, validation_error in enumerate(error.errors(), 1):
+                errors.append(
+                    (
+                        logging.DEBUG,
+                        f"{err_count}: {validation_error.get('type')} AT {validation_error.get('loc')}: {validation_error.get('msg')}",
+                    )
+                )
+            return errors
+        case ScannerError():
+            return [
+                (logging.INFO, f"Error parsing config {config_path}; skipping"),
+                (logging.DEBUG, f"{error}"),
+            ]
+    return [
+        (logging.INFO, f"Unknown error loading config {config_path}; skipping"),
+        (logging.DEBUG, f"{type(error)}: {error}"),
+    ]
+
+
+def parse_config(config_path) -> ParsedConfig:
+    """
+    Reads, parses and validates one config. Runs in pool workers, so errors
+    are returned as messages rather than raised.
+    """
+    try:
+        stat_result = os.stat(config_path)
+        with open(config_path, "rb") as config_file:
+            content = config_file.read()
+        mapping = Mapping.load_from_file(file_handle=content.decode())
+    except Exception as error:
+        return ParsedConfig(
+            config_path, None, describe_load_error(config_path, error), None, None
+        )
+    # the YAML tree is only needed to save a config back out, and is slow to
+    # send back from a worker process
+    mapping._loaded_yml_map = None
+    return ParsedConfig(config_path, mapping, (), stat_result, content)
+
+
+def is_free_threaded():
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled is not None and not is_gil_enabled()
+
+
+def config_executor(max_workers: int):
+    if is_free_threaded():
+        return concurrent.futures.ThreadPoolExecutor(
+            max_workers, thread_name_prefix="ConfigLoader"
+        )
+    # spawn rather than fork; the mapper has SDL and other threads running
+    return concurrent.futures.ProcessPoolExecutor(
+        max_workers, mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def parse_configs(config_paths, mode=ConfigLoadMode.PARALLEL, max_workers=None):
+    """
+    Parses every config in config_paths, yielding a ParsedConfig for each in
+    order. Batches too small to pay for starting a pool are parsed serially.
+    """
+    config_paths = list(config_paths)
+    if max_workers is None:
+        max_workers = min(os.cpu_count() or 1, CONFIG_LOAD_MAX_WORKERS)
+    if (
+        mode == ConfigLoadMode.SERIAL
+        or max_workers < 2
+        or len(config_paths) < CONFIG_PARALLEL_MIN_FILES
+    ):
+        yield from map(parse_config, config_paths)
+        return
+    chunk_size = max(len(config_paths) // (max_workers * 4), 1)
+    with config_executor(max_workers) as executor:
+        yield from executor.map(parse_config, config_paths, chunksize=chunk_size)
+
+
+class ConfigCache:
+    def __init__(self, cache_path=CONFIG_CACHE_PATH):
+        self.logger = logging.getLogger("ConfigCache")
+        self.cache_path = Path(cache_path)
+        self.entries = None
+        self.dirty = False
+        self.hits = 0
+        self.misses = 0
+
+    def _load_entries(self):
+        self.entries = {}
+        try:
+            with open(self.cache_path, "rb") as cache_file:
+                tag, entries = pickle.load(cache_file)
+            if tag == _cache_tag():
+                self.entries = entries
+            else:
+                self.logger.debug(f"Discarding config cache from {tag}")
+        except FileNotFoundError:
+            pass
+        except Exception as error:
+            self.logger.info(f"Config cache {self.cache_path} unreadable; ignoring")
+            self.logger.debug(f"{type(error)}: {error}")
+
+    def _lookup(self, key, stat_result):
+        entry = self.entries.get(key)
+        if not entry:
+            return None, None
+        if (
+            entry.mtime_ns == stat_result.st_mtime_ns
+            and entry.size == stat_result.st_size
+        ):
+            return entry, None
+        with open(key, "rb") as config_file:
+            content = config_file.read()
+        digest = hashlib.sha1(content).digest()
+        if digest == entry.digest:
+            # touched but unchanged; refresh the stat key
+            entry = entry._replace(
+                mtime_ns=stat_result.st_mtime_ns, size=stat_result.st_size
+            )
+            self.entries[key] = entry
+            self.dirty = True
+            return entry, content
+        return None, content
+
+    def cached(self, config_path):
+        """
+        Returns the cached Mapping for a config file if it's current, else None.
+        """
+        if self.entries is None:
+            self._load_entries()
+        key = os.path.abspath(config_path)
+        entry, _ = self._lookup(key, os.stat(key))
+        if entry:
+            try:
+                mapping = pickle.loads(entry.pickled_mapping)
+                self.hits += 1
+                return mapping
+            except Exception:
+                self.entries.pop(key, None)
+        return None
+
+    def load_many(self, config_paths, mode=ConfigLoadMode.PARALLEL, max_workers=None):
+        """
+        Loads several configs, returning a ConfigLoadResult for each. Configs
+        that aren't cached are parsed with parse_configs and then cached.
+        """
+        results = []
+        to_parse = []
+        for config_path in config_paths:
+            try:
+                mapping = self.cached(config_path)
+            except OSError as error:
+                errors = describe_load_error(config_path, error)
+                results.append(ConfigLoadResult(config_path, None, errors))
+                continue
+            if mapping:
+                results.append(ConfigLoadResult(config_path, mapping, ()))
+            else:
+                to_parse.append(config_path)
+        for parsed in parse_configs(to_parse, mode=mode, max_workers=max_workers):
+            self.misses += 1
+            if parsed.mapping:
+                self.store(
+                    os.path.abspath(parsed.config_path),
+                    parsed.stat_result,
+                    parsed.content,
+                    parsed.mapping,
+                )
+            results.append(
+                ConfigLoadResult(parsed.config_path, parsed.mapping, parsed.errors)
+            )
+        return results
+
+    def load(self, config_path) -> Mapping:
+        """
+        Returns the Mapping for a config file, from the cache if it's current.
+        Parse and validation errors propagate as from Mapping.load_from_file.
+        """
+        if self.entries is None:
+            self._load_entries()
+        key = os.path.abspath(config_path)
+        stat_result = os.stat(key)
+        entry, content = self._lookup(key, stat_result)
+        if entry:
+            try:
+                mapping = pickle.loads(entry.pickled_mapping)
+                self.hits += 1
+                return mapping
+            except Exception:
+                self.entries.pop(key, None)
+        self.misses += 1
+        if content is None:
+            with open(key, "rb") as config_file:
+                content = config_file.read()
+        mapping = Mapping.load_from_file(file_handle=content.decode())
+        self.store(key, stat_result, content, mapping)
+        return mapping
+
+    def store(self, key, stat_result, content: bytes, mapping: Mapping):
+        cached_mapping = mapping.model_copy()
+        # the round-trip YAML tree is only needed to save a config back out
+        cached_mapping._loaded_yml_map = None
+        self.entries[key] = CacheEntry(
+            stat_result.st_mtime_ns,
+            stat_result.st_size,
+            hashlib.sha1(content).digest(),
+            pickle.dumps(cached_mapping, protocol=pickle.HIGHEST_PROTOCOL),
+        )
+        self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        for key in [key for key in self.entries if not os.path.exists(key)]:
+            self.entries.pop(key)
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = self.cache_path.with_name(self.cache_path.name + ".tmp")
+        try:
+            with open(temp_path, "wb") as cache_file:
+                pickle.dump(
+                    (_cache_tag(), self.entries),
+                    cache_file,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            os.replace(temp_path, self.cache_path)
+            self.dirty = False
+        except OSError as error:
+            self.logger.info(f"Couldn't write config cache {self.cache_path}")
+            self.logger.debug(f"{type(error)}: {error}")
@@ -0,0 +1,237 @@
+"""
+Watches the config directory and reports config files that were written,
+added or removed, so the autoload set can be kept up to date incrementally
+instead of rescanning the tree on every focus change.
+
+Linux uses inotify; elsewhere the tree is polled with stat().
+"""
+
+import ctypes
+import errno
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import typing
+from pathlib import Path
+
+from pyrogyro.constants import CONFIG_POLL_INTERVAL, CONFIG_WATCH_SETTLE
+
+CONFIG_SUFFIX = ".yml"
+
+ChangeCallback = typing.Callable[[typing.Set[Path], typing.Set[Path]], typing.Any]
+
+
+def scan_configs(root: Path):
+    return set(root.rglob(f"*{CONFIG_SUFFIX}"))
+
+
+class ConfigWatcher:
+    """
+    Calls on_change(changed, removed) from its own thread with the sets of
+    config paths that were written or added, and that were removed.
+    """
+
+    def __init__(self, root, on_change: ChangeCallback):
+        self.logger = logging.getLogger("ConfigWatcher")
+        self.root = Path(root)
+        self.on_change = on_change
+        self.running = False
+        self.thread = threading.Thread(
+            target=self.run, daemon=True, name=type(self).__name__
+        )
+
+    def start(self):
+        self.running = True
+        self.thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        self.running = False
+        self.thread.join(timeout)
+
+    def report(self, changed, removed):
+        if changed or removed:
+            try:
+                self.on_change(changed, removed)
+            except Exception:
+                self.logger.exception("Unhandled error handling config changes")
+
+    def run(self):
+        raise NotImplementedError
+
+
+class PollingConfigWatcher(ConfigWatcher):
+    def __init__(self, root, on_change: ChangeCallback, interval=CONFIG_POLL_INTERVAL):
+        super().__init__(root, on_change)
+        self.interval = interval
+        self.wake = threading.Event()
+
+    def stop(self, timeout: float = 1.0):
+        self.running = False
+        self.wake.set()
+        self.thread.join(timeout)
+
+    def snapshot(self):
+        stats = {}
+        for config_path in scan_configs(self.root):
+            try:
+                stat_result = config_path.stat()
+            except OSError:
+                continue
+            stats[config_path] = (stat_result.st_mtime_ns, stat_result.st_size)
+        return stats
+
+    def run(self):
+        known = self.snapshot()
+        while self.running:
+            self.wake.wait(self.interval)
+            if not self.running:
+                break
+            current = self.snapshot()
+            changed = {
+                config_path
+                for config_path, stat_key in current.items()
+                if known.get(config_path) != stat_key
+            }
+            removed = set(known) - set(current)
+            known = current
+            self.report(changed, removed)
+
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+INOTIFY_WATCH_MASK = (
+    IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+    | IN_DELETE_SELF
+    | IN_MOVE_SELF
+)
+_INOTIFY_EVENT_STRUCT = struct.Struct("iIII")
+
+
+class InotifyConfigWatcher(ConfigWatcher):
+    def __init__(self, root, on_change: ChangeCallback):
+        super().__init__(root, on_change)
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.inotify_fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.inotify_fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watch_dirs = {}
+        self.known = set()
+
+    def add_watches(self, directory: Path):
+        """
+        Watches directory and everything under it, returning the configs found.
+        """
+        found = set()
+        for dir_path, dir_names, file_names in os.walk(directory):
+            watch = self.libc.inotify_add_watch(
+                self.inotify_fd, os.fsencode(dir_path), INOTIFY_WATCH_MASK
+            )
+            if watch < 0:
+                self.logger.debug(
+                    f"Couldn't watch {dir_path}: {os.strerror(ctypes.get_errno())}"
+                )
+                continue
+            self.watch_dirs[watch] = Path(dir_path)
+            found.update(
+                Path(dir_path) / file_name
+                for file_name in file_names
+                if file_name.endswith(CONFIG_SUFFIX)
+            )
+        return found
+
+    def read_events(self):
+        try:
+            data = os.read(self.inotify_fd, 65536)
+        except OSError as error:
+            if error.errno == errno.EAGAIN:
+                return []
+            raise
+        events = []
+        offset = 0
+        while offset < len(data):
+            watch, mask, _, name_len = _INOTIFY_EVENT_STRUCT.unpack_from(data, offset)
+            offset += _INOTIFY_EVENT_STRUCT.size
+            name = data[offset : offset + name_len].rstrip(b"\0")
+            offset += name_len
+            events.append((watch, mask, os.fsdecode(name)))
+        return events
+
+    def handle_event(self, watch, mask, name, changed, removed):
+        if mask & IN_Q_OVERFLOW:
+            # events were dropped; rescan everything
+            current = self.add_watches(self.root)
+            changed.update(current)
+            removed.update(self.known - current)
+            return
+        if mask & IN_IGNORED:
+            self.watch_dirs.pop(watch, None)
+            return
+        directory = self.watch_dirs.get(watch)
+        if directory is None or not name:
+            return
+        path = directory / name
+        if mask & IN_ISDIR:
+            if mask & (IN_CREATE | IN_MOVED_TO):
+                changed.update(self.add_watches(path))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                removed.update(
+                    known_path
+                    for known_path in self.known
+                    if known_path.is_relative_to(path)
+                )
+        elif name.endswith(CONFIG_SUFFIX):
+            if mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changed.add(path)
+                removed.discard(path)
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                removed.add(path)
+                changed.discard(path)
+
+    def run(self):
+        self.known = self.add_watches(self.root)
+        poller = select.poll()
+        poller.register(self.inotify_fd, select.POLLIN)
+        try:
+            while self.running:
+                if not poller.poll(CONFIG_POLL_INTERVAL * 1000):
+                    continue
+                changed, removed = set(), set()
+                # editors save in bursts of events; let them settle
+                while poller.poll(CONFIG_WATCH_SETTLE * 1000):
+                    for watch, mask, name in self.read_events():
+                        self.handle_event(watch, mask, name, changed, removed)
+                self.known.update(changed)
+                self.known.difference_update(removed)
+                self.report(changed, removed)
+        finally:
+            os.close(self.inotify_fd)
+
+
+def create_config_watcher(root, on_change: ChangeCallback) -> ConfigWatcher:
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyConfigWatcher(root, on_change)
+        except (OSError, AttributeError) as error:
+            logging.getLogger("ConfigWatcher").info(
+                f"inotify unavailable ({error}); polling configs instead"
+            )
+    return PollingConfigWatcher(root, on_change)
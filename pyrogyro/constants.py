@@ -7,6 +7,65 @@ LOG_LEVEL = logging.DEBUG
 LOG_FORMAT = "%(message)s"
 LOG_FORMAT_DEBUG = "%(relativeCreated)6d  %(threadName)s | %(filename)s:%(lineno)d | %(name)s - %(levelname)s | %(message)s"
 DEFAULT_POLL_RATE = 1000
+# "DEADLINE", or "DELAY" for the old sleep-the-remainder loop
+DEFAULT_SCHEDULER_MODE = "DEADLINE"
+# busy-wait this long before each deadline
+SCHEDULER_SPIN_NS = 50000
+# how often waits shorter than SDL's 1ms resolution check for a pending event
+SCHEDULER_EVENT_CHECK_NS = 100000
+# SDL events drained per SDL_PeepEvents call
+EVENT_BATCH_SIZE = 256
+# "INLINE", "THREADED", or "AUTO"
+DEFAULT_PAD_EXECUTION_MODE = "AUTO"
+# "COMPILED", or "INTERPRETED" to resolve targets on every input
+DEFAULT_DISPATCH_MODE = "COMPILED"
+# composed maps kept per mapping, one per active-layer combination
+LAYER_CACHE_SIZE = 16
+# validated mappings from configs/
+CONFIG_CACHE_PATH = Path("configs") / ".config_cache"
+# seconds between config scans where inotify is unavailable
+CONFIG_POLL_INTERVAL = 1.0
+# seconds of quiet before a burst of config writes is applied
+CONFIG_WATCH_SETTLE = 0.05
+# "PARALLEL", or "SERIAL" to parse configs on the calling thread
+DEFAULT_CONFIG_LOAD_MODE = "PARALLEL"
+# uncached configs needed before a load uses a worker pool
+CONFIG_PARALLEL_MIN_FILES = 32
+# upper bound on config parsing workers
+CONFIG_LOAD_MAX_WORKERS = 8
+# autoload decisions remembered per (controller, exe, window)
+AUTOLOAD_CACHE_SIZE = 256
+# recent config hot reloads kept for /stats/reloads
+RELOAD_HISTORY_SIZE = 32
+# seconds before an unchanged virtual pad report is resent; 0 to never
+VPAD_KEEPALIVE_INTERVAL = 1.0
+# Hz; most rumble writes per pad, the latest request wins
+RUMBLE_UPDATE_RATE = 100
+# seconds each rumble write lasts; running motors are rewritten before it ends
+RUMBLE_DURATION = 1.0
+# Hz; LED animation steps, written only when the colour changes
+LED_REFRESH_RATE = 30
+# "THREADED", or "INLINE" to send outputs from the thread computing them
+DEFAULT_OUTPUT_DISPATCH_MODE = "THREADED"
+# "MERGE" or "DROP": what a full output queue does with stale frames
+DEFAULT_OUTPUT_QUEUE_POLICY = "MERGE"
+# output frames waiting for the dispatcher before the queue policy applies
+OUTPUT_QUEUE_SIZE = 8
+# "UINPUT", "PYAUTOGUI", or "AUTO" (uinput on Linux when /dev/uinput is writable)
+DEFAULT_MKB_BACKEND = "AUTO"
+# "VIGEM", "UINPUT", "RECORDER" (no device), or "AUTO"
+# (ViGEm on Windows, else uinput if writable)
+DEFAULT_VPAD_BACKEND = "AUTO"
+# Hz; the tray is pumped from the poll loop
+TRAY_UPDATE_RATE = 30
+# "SUMMED", or "PER_SAMPLE" to integrate each gyro sample over its own timestamp
+DEFAULT_SENSOR_PIPELINE_MODE = "SUMMED"
+# gyro samples buffered per pad per frame; later ones replace the last
+SENSOR_BUFFER_SIZE = 32
+# latency histograms keep values to within 1/2**bits
+LATENCY_HISTOGRAM_BITS = 7
+# larger latencies share the top bucket
+LATENCY_HISTOGRAM_MAX_NS = 10000000000
 
 VID_PID_IGNORE_LIST = ((1118, 654),)  # Ignore ViGEmBus-mapped virtual devices
 
@@ -0,0 +1,197 @@
+"""
+Compiles a Mapping's active map into a DispatchPlan: for every source, a tuple
+of handlers prebound to their targets, with the mapping-wide constants (real
+world calibration, in-game sensitivity) read once at compile time instead of
+on every input. The OS mouse speed can change while a mapping runs, so it's
+still read on each input, from the plan's os_mouse_speed callable.
+
+Handlers are called as handler(pad, source, value, delta_time), and send
+exactly what resolving the target with resolve_outputs would, in the same order.
+Plans hold no runtime state: stateful targets read and update theirs in the
+pad's PadState, so one plan serves every pad running the mapping.
+"""
+
+import enum
+import typing
+
+from pyrogyro.io_types import (
+    AsAim,
+    AsDpad,
+    AsGridSticks,
+    InputPreserver,
+    MapDirectTargetTypes,
+    resolve_outputs,
+)
+
+
+class DispatchMode(enum.Enum):
+    # run each source's handlers from the mapping's compiled DispatchPlan
+    COMPILED = "COMPILED"
+    # look up and resolve every target from the mapping on each input
+    INTERPRETED = "INTERPRETED"
+
+
+def is_direct_target(target):
+    return type(target) in MapDirectTargetTypes
+
+
+def _direct_handler(target):
+    def handle(pad, source, value, delta_time):
+        pad.send_value(value, target, source=source)
+
+    return handle
+
+
+def _aim_handler(target: AsAim, constants, os_mouse_speed):
+    output = target.o
+    get_output_velocity = target.get_output_velocity
+    real_world_calibration = constants["real_world_calibration"]
+    in_game_sens = constants["in_game_sens"]
+
+    def handle(pad, source, value, delta_time):
+        pad.send_value(
+            get_output_velocity(
+                value,
+                delta_time,
+                real_world_calibration=real_world_calibration,
+                in_game_sens=in_game_sens,
+                os_mouse_speed=os_mouse_speed(),
+                aim_state=pad.state.target_state(target),
+            ),
+            output,
+            source=source,
+        )
+
+    return handle
+
+
+def _flat_complex_handler(target, constants, os_mouse_speed):
+    # every output the target can produce is direct, so its own output dict is
+    # already what resolve_outputs would have built
+    map_to_outputs = target.map_to_outputs
+
+    def handle(pad, source, value, delta_time):
+        outputs = map_to_outputs(
+            value,
+            delta_time=delta_time,
+            pad_state=pad.state,
+            os_mouse_speed=os_mouse_speed(),
+            **constants,
+        )
+        for output, output_value in outputs.items():
+            pad.send_value(output_value, output, source=source)
+
+    return handle
+
+
+def _complex_handler(target, constants, os_mouse_speed):
+    map_to_outputs = target.map_to_outputs
+
+    def handle(pad, source, value, delta_time):
+        resolved = {}
+        pad_state = pad.state
+        speed = os_mouse_speed()
+        outputs = map_to_outputs(
+            value,
+            delta_time=delta_time,
+            pad_state=pad_state,
+            os_mouse_speed=speed,
+            **constants,
+        )
+        for output, output_value in outputs.items():
+            resolve_outputs(
+                resolved,
+                output,
+                output_value,
+                pad_state=pad_state,
+                os_mouse_speed=speed,
+                **constants,
+            )
+        for output, output_value in resolved.items():
+            pad.send_value(output_value, output, source=source)
+
+    return handle
+
+
+def _nested_targets(target):
+    match target:
+        case AsDpad():
+            return (target.UP, target.RIGHT, target.DOWN, target.LEFT)
+        case AsGridSticks():
+            return tuple(
+                finger_target
+                for fingers in (target.pad_fingers or {}).values()
+                for finger_target in fingers.values()
+            )
+    return None
+
+
+def _preserving_handler(target: InputPreserver, handler):
+    preserve_input = target.preserve_input
+
+    def handle(pad, source, value, delta_time):
+        pad.input_store.set_preserved(source, preserve_input(value))
+        handler(pad, source, value, delta_time)
+
+    return handle
+
+
+def unit_mouse_speed():
+    return 1.0
+
+
+def compile_target(target, constants, os_mouse_speed=unit_mouse_speed):
+    if is_direct_target(target):
+        handler = _direct_handler(target)
+    elif isinstance(target, AsAim) and is_direct_target(target.o):
+        handler = _aim_handler(target, constants, os_mouse_speed)
+    else:
+        nested_targets = _nested_targets(target)
+        if nested_targets is not None and all(
+            is_direct_target(nested) for nested in nested_targets
+        ):
+            handler = _flat_complex_handler(target, constants, os_mouse_speed)
+        else:
+            handler = _complex_handler(target, constants, os_mouse_speed)
+    if isinstance(target, InputPreserver):
+        handler = _preserving_handler(target, handler)
+    return handler
+
+
+class DispatchPlan:
+    def __init__(
+        self,
+        active_map,
+        real_world_calibration: float = 1.0,
+        in_game_sens: float = 1.0,
+        os_mouse_speed: typing.Callable[[], float] = unit_mouse_speed,
+    ):
+        constants = {
+            "real_world_calibration": real_world_calibration,
+            "in_game_sens": in_game_sens,
+        }
+        self.handlers = {}
+        for source, target_raw in active_map.items():
+            targets = (
+                target_raw if isinstance(target_raw, typing.Sequence) else (target_raw,)
+            )
+            handlers = tuple(
+                compile_target(target, constants, os_mouse_speed)
+                for target in targets
+                if target
+            )
+            if handlers:
+                self.handlers[source] = handlers
+
+    @classmethod
+    def compile(cls, mapping, active_map):
+        return cls(
+            active_map,
+            real_world_calibration=mapping.get_real_world_calibration(),
+            in_game_sens=mapping.get_in_game_sens(),
+            os_mouse_speed=(
+                mapping.get_os_mouse_speed_correction
+                if mapping.counter_os_mouse_speed
+                else unit_mouse_speed
+            ),
+        )
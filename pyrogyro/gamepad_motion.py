@@ -36,44 +36,101 @@ class GyroCalibration:
     def calibrated(self, uncalibrated_gyro):
         return uncalibrated_gyro - self.calibration_offset
 
+    def calibrate(self, gyro: Vec3):
+        """
+        Removes the calibration offset from gyro in place.
+        """
+        if self.num_samples != 0:
+            num_samples = float(self.num_samples)
+            calibration = self.calibration
+            gyro.set_value(
+                gyro.x - calibration.x / num_samples,
+                gyro.y - calibration.y / num_samples,
+                gyro.z - calibration.z / num_samples,
+            )
+        return gyro
+
 
 def sensor_fusion_gravity(
-    gravity: Vec3, gyro: Vec3, accel: Vec3, delta_seconds: float, nudge_value=0.02
+    gravity: Vec3,
+    gyro: Vec3,
+    accel: Vec3,
+    delta_seconds: float,
+    nudge_value=0.02,
+    rotation: Quat | None = None,
 ):
+    """
+    Updates gravity in place. rotation, if given, is scratch space for the
+    frame's rotation, so a caller running this every frame allocates nothing.
+    """
     # convert gyro input to reverse rotation
-    rotation = Quat.angle_axis(gyro.length() * delta_seconds, -gyro.x, -gyro.y, -gyro.z)
+    if rotation is None:
+        rotation = Quat(1.0, 0.0, 0.0, 0.0)
+    rotation.set_angle_axis(gyro.length() * delta_seconds, -gyro.x, -gyro.y, -gyro.z)
 
     # rotate gravity vector
-    gravity.mul(rotation)
+    gravity.rotate(rotation)
 
     # nudge towards gravity according to current acceleration
-    newGravity = accel * -1
-    gravity += (newGravity - gravity) * nudge_value
+    gravity.set_value(
+        gravity.x + (accel.x * -1 - gravity.x) * nudge_value,
+        gravity.y + (accel.y * -1 - gravity.y) * nudge_value,
+        gravity.z + (accel.z * -1 - gravity.z) * nudge_value,
+    )
     return gravity
 
 
-def gyro_camera_local(gyro: Vec3, delta_seconds: float, yaw_turn_axis: bool = True):
+def _camera_vec(yaw_vel: float, pitch_vel: float, out: Vec2 | None):
+    if out is None:
+        return Vec2(yaw_vel, pitch_vel)
+    return out.set_value(yaw_vel, pitch_vel)
+
+
+# The gyro_camera_* functions write their result to out when it's given, and
+# return a new Vec2 otherwise.
+
+
+def gyro_camera_local(
+    gyro: Vec3,
+    delta_seconds: float,
+    yaw_turn_axis: bool = True,
+    out: Vec2 | None = None,
+):
     if yaw_turn_axis:
         yaw_vel = gyro.y * delta_seconds
     else:
         yaw_vel = gyro.z * delta_seconds
     pitch_vel = gyro.x * delta_seconds
-    return Vec2(yaw_vel, pitch_vel)
+    return _camera_vec(yaw_vel, pitch_vel, out)
 
 
-def gyro_camera_local_ow(gyro: Vec3, delta_seconds: float):
-    yaw_axes = Vec2(gyro.y, gyro.z)
-    if abs(yaw_axes.x) > abs(yaw_axes.y):
-        yaw_direction = sign(yaw_axes.x)
+def gyro_camera_local_ow(gyro: Vec3, delta_seconds: float, out: Vec2 | None = None):
+    if abs(gyro.y) > abs(gyro.z):
+        yaw_direction = sign(gyro.y)
     else:
-        yaw_direction = sign(yaw_axes.y)
+        yaw_direction = sign(gyro.z)
 
-    yaw_vel = yaw_axes.length() * yaw_direction * delta_seconds
+    yaw_vel = math.sqrt(gyro.y**2 + gyro.z**2) * yaw_direction * delta_seconds
     pitch_vel = gyro.x * delta_seconds
-    return Vec2(yaw_vel, pitch_vel)
+    return _camera_vec(yaw_vel, pitch_vel, out)
 
 
-def gyro_camera_world(gyro: Vec3, grav_norm: Vec3, delta_seconds: float):
+def _pitch_vector(grav_norm: Vec3):
+    """
+    The pitch axis projected onto the gravity plane, as (x, y, z).
+    """
+    grav_dot_pitch_axis = grav_norm.x
+    # shortcut for (1, 0, 0).Dot(gravNorm)
+    return (
+        1 - grav_norm.x * grav_dot_pitch_axis,
+        0 - grav_norm.y * grav_dot_pitch_axis,
+        0 - grav_norm.z * grav_dot_pitch_axis,
+    )
+
+
+def gyro_camera_world(
+    gyro: Vec3, grav_norm: Vec3, delta_seconds: float, out: Vec2 | None = None
+):
     flatness = abs(grav_norm.y)  # 1 when controller is flat
     upness = abs(grav_norm.z)  # 1 when controller is upright
     side_reduction = clamp((max(flatness, upness) - 0.125) / 0.125, 0, 1)
@@ -83,18 +140,26 @@ def gyro_camera_world(gyro: Vec3, grav_norm: Vec3, delta_seconds: float):
     yaw_vel = gyro.dot(grav_norm) * delta_seconds * -1
 
     # project pitch axis onto gravity plane
-    grav_dot_pitch_axis = grav_norm.x
-    # shortcut for (1, 0, 0).Dot(gravNorm)
-    pitch_vector = Vec3(1, 0, 0) - grav_norm * grav_dot_pitch_axis
+    pitch_x, pitch_y, pitch_z = _pitch_vector(grav_norm)
     # that's all it took!
 
     # normalize. it'll be zero if pitch and gravity are parallel, which we ignore
-    if not pitch_vector.is_zero_vector():
-        pitch_vector.normalize()
+    if not (pitch_x == 0 and pitch_y == 0 and pitch_z == 0):
+        pitch_len = math.sqrt(pitch_x**2 + pitch_y**2 + pitch_z**2)
+        if pitch_len != 0:
+            pitch_x, pitch_y, pitch_z = (
+                pitch_x / pitch_len,
+                pitch_y / pitch_len,
+                pitch_z / pitch_len,
+            )
         # camera pitch velocity just like yaw velocity at the beginning
         # (but squish to 0 when controller is on its side)
-        pitch_vel = gyro.dot(pitch_vector) * side_reduction * delta_seconds
-    return Vec2(yaw_vel, pitch_vel)
+        pitch_vel = (
+            (gyro.x * pitch_x + gyro.y * pitch_y + gyro.z * pitch_z)
+            * side_reduction
+            * delta_seconds
+        )
+    return _camera_vec(yaw_vel, pitch_vel, out)
 
 
 def gyro_camera_player_turn(
@@ -102,18 +167,19 @@ def gyro_camera_player_turn(
     grav_norm: Vec3,
     delta_seconds: float,
     yaw_relax_factor=1.41,
+    out: Vec2 | None = None,
 ):
     # use world yaw for yaw direction, local combined yaw for magnitude
     world_yaw = gyro.y * grav_norm.y + gyro.z * grav_norm.z
     # dot product but just yaw and roll
     yaw_vel = (
         -sign(world_yaw)
-        * min(abs(world_yaw) * yaw_relax_factor, Vec2(gyro.y, gyro.z).length())
+        * min(abs(world_yaw) * yaw_relax_factor, math.sqrt(gyro.y**2 + gyro.z**2))
         * delta_seconds
     )
 
     pitch_vel = gyro.x * delta_seconds
-    return Vec2(yaw_vel, pitch_vel)
+    return _camera_vec(yaw_vel, pitch_vel, out)
 
 
 def gyro_camera_player_lean(
@@ -121,6 +187,7 @@ def gyro_camera_player_lean(
     grav_norm: Vec3,
     delta_seconds: float,
     roll_relax_factor: float = 1.15,
+    out: Vec2 | None = None,
 ):
     # some info about the controller's orientation that we'll use to smooth over boundaries
     flatness = abs(grav_norm.y)  # 1 when controller is flat
@@ -128,27 +195,32 @@ def gyro_camera_player_lean(
     side_reduction = clamp((max(flatness, upness) - 0.125) / 0.125, 0, 1)
 
     # project pitch axis onto gravity plane
-    grav_dot_pitch_axis = grav_norm.x
-    pitch_vector = Vec3(1, 0, 0) - grav_norm * grav_dot_pitch_axis
+    pitch_x, pitch_y, pitch_z = _pitch_vector(grav_norm)
 
     yaw_vel = 0
 
-    if not pitch_vector.is_zero_vector():
-        roll_vector = pitch_vector.cross(grav_norm)
-        if not roll_vector.is_zero_vector():
-            roll_vector.normalize()
-            world_roll = gyro.y * roll_vector.y + gyro.z * roll_vector.z
+    if not (pitch_x == 0 and pitch_y == 0 and pitch_z == 0):
+        # pitch_vector.cross(grav_norm)
+        roll_x = pitch_y * grav_norm.z - grav_norm.y * pitch_z
+        roll_y = pitch_z * grav_norm.x - grav_norm.z * pitch_x
+        roll_z = pitch_x * grav_norm.y - grav_norm.x * pitch_y
+        if not (roll_x == 0 and roll_y == 0 and roll_z == 0):
+            roll_len = math.sqrt(roll_x**2 + roll_y**2 + roll_z**2)
+            if roll_len != 0:
+                roll_y, roll_z = roll_y / roll_len, roll_z / roll_len
+            world_roll = gyro.y * roll_y + gyro.z * roll_z
             yaw_vel = (
                 -sign(world_roll)
                 * side_reduction
                 * min(
-                    abs(world_roll) * roll_relax_factor, Vec2(gyro.y, gyro.z).length()
+                    abs(world_roll) * roll_relax_factor,
+                    math.sqrt(gyro.y**2 + gyro.z**2),
                 )
                 * delta_seconds
             )
 
     pitch_vel = gyro.x * delta_seconds
-    return Vec2(yaw_vel, pitch_vel)
+    return _camera_vec(yaw_vel, pitch_vel, out)
 
 
 class GyroMode(enum.Enum):
@@ -171,21 +243,24 @@ class GyroConfig:
     smooth_threshold: typing.Optional[float] = None
     tightening_theshold: typing.Optional[float] = None
 
-    def __post_init__(self):
-        self._smooth_buffer = deque()
+    def new_smooth_buffer(self):
+        # the last smooth_window samples; each pad keeps its own
+        return deque(maxlen=self.smooth_window)
 
-    def get_smoothed_gyro(self, sample: Vec2):
-        self._smooth_buffer.append(sample)
-        if len(self._smooth_buffer) > self.smooth_window:
-            self._smooth_buffer.popleft()
+    def get_smoothed_gyro(self, sample: Vec2, smooth_buffer: deque):
+        smooth_buffer.append(sample)
         smoothed = Vec2()
-        for entry in self._smooth_buffer:
+        for entry in smooth_buffer:
             smoothed += entry
-        smoothed /= len(self._smooth_buffer)
+        smoothed /= len(smooth_buffer)
         return smoothed
 
     def get_tiered_smoothed_gyro(
-        self, sample: Vec2, smooth_thresh: float, delta_seconds: float
+        self,
+        sample: Vec2,
+        smooth_thresh: float,
+        delta_seconds: float,
+        smooth_buffer: deque,
     ):
         smooth_thresh *= delta_seconds
         half_thresh = smooth_thresh * 0.5
@@ -196,7 +271,7 @@ class GyroConfig:
             direct_weight = 0
         direct_weight = clamp(direct_weight, 0.0, 1.0)
         return (sample * direct_weight) + self.get_smoothed_gyro(
-            sample * (1.0 - direct_weight)
+            sample * (1.0 - direct_weight), smooth_buffer
         )
 
     def get_tightened_sample(
@@ -243,31 +318,51 @@ class GyroConfig:
             slow_sens_y, fast_sens_y, slow_fast_factor
         )
 
-    def gyro_camera(self, gyro: Vec3, grav_norm: Vec3, delta_seconds: float):
+    def gyro_camera(
+        self,
+        gyro: Vec3,
+        grav_norm: Vec3,
+        delta_seconds: float,
+        smooth_buffer: deque | None = None,
+        out: Vec2 | None = None,
+    ):
+        smoothing = bool(self.smooth_window)
+        if smoothing and smooth_buffer is None:
+            # smoothing state is per pad, see new_smooth_buffer
+            raise ValueError("smooth_window is set but no smooth_buffer was given")
+        # smoothed samples are kept in the buffer, so each needs its own Vec2
+        sample_out = None if smoothing else out
         match self.gyro_mode:
             case GyroMode.OFF:
-                calibrated_gyro = Vec2(0, 0)
+                calibrated_gyro = _camera_vec(0, 0, sample_out)
             case GyroMode.LOCAL:
-                calibrated_gyro = gyro_camera_local(gyro, delta_seconds)
+                calibrated_gyro = gyro_camera_local(gyro, delta_seconds, out=sample_out)
             case GyroMode.LOCAL_OW:
-                calibrated_gyro = gyro_camera_local_ow(gyro, delta_seconds)
+                calibrated_gyro = gyro_camera_local_ow(
+                    gyro, delta_seconds, out=sample_out
+                )
             case GyroMode.WORLD:
-                calibrated_gyro = gyro_camera_world(gyro, grav_norm, delta_seconds)
+                calibrated_gyro = gyro_camera_world(
+                    gyro, grav_norm, delta_seconds, out=sample_out
+                )
             case GyroMode.PLAYER_TURN:
                 calibrated_gyro = gyro_camera_player_turn(
-                    gyro, grav_norm, delta_seconds
+                    gyro, grav_norm, delta_seconds, out=sample_out
                 )
             case GyroMode.PLAYER_LEAN:
                 calibrated_gyro = gyro_camera_player_lean(
-                    gyro, grav_norm, delta_seconds
+                    gyro, grav_norm, delta_seconds, out=sample_out
                 )
-        if self.smooth_window:
+        if smoothing:
             if self.smooth_threshold:
                 calibrated_gyro = self.get_tiered_smoothed_gyro(
-                    calibrated_gyro, self.smooth_threshold, delta_seconds
+                    calibrated_gyro,
+                    self.smooth_threshold,
+                    delta_seconds,
+                    smooth_buffer,
                 )
             else:
-                calibrated_gyro = self.get_smoothed_gyro(calibrated_gyro)
+                calibrated_gyro = self.get_smoothed_gyro(calibrated_gyro, smooth_buffer)
 
         if self.tightening_theshold:
             calibrated_gyro = self.get_tightened_sample(
@@ -277,6 +372,8 @@ class GyroConfig:
         gyro_sens_x, gyro_sens_y = self.get_accel_sens(
             calibrated_gyro, self.slow_threshold, self.fast_threshold, delta_seconds
         )
+        if out is not None and calibrated_gyro is not out:
+            calibrated_gyro = out.set_value(calibrated_gyro.x, calibrated_gyro.y)
         calibrated_gyro.x *= gyro_sens_x
         calibrated_gyro.y *= gyro_sens_y
         return calibrated_gyro
@@ -288,10 +385,14 @@ class GyroConfig:
         delta_seconds: float = 0.0,
         real_world_calibration: float = 1.0,
         in_game_sens: float = 1.0,
+        smooth_buffer: deque | None = None,
+        out: Vec2 | None = None,
     ):
         os_mouse_speed = 1.0
         mouse_calib = real_world_calibration / os_mouse_speed / in_game_sens
-        camera_vec = self.gyro_camera(gyro, grav_norm, delta_seconds)
+        camera_vec = self.gyro_camera(
+            gyro, grav_norm, delta_seconds, smooth_buffer=smooth_buffer, out=out
+        )
         camera_vec *= mouse_calib
         camera_vec *= -1
         return camera_vec
@@ -0,0 +1,409 @@
+"""
+Headless end-to-end load test.
+
+Runs PyroGyroMapper under SDL's dummy video driver against SDL virtual
+joysticks with gyro, accelerometer and touchpad, driven by a script of stick
+sweeps, button storms and sinusoidal gyro. Pad outputs are counted (and
+optionally recorded) and go to recorder virtual pads, not to the OS, so it runs on
+machines with no controllers, no ViGEmBus and no display.
+
+Run with `pyrogyro bench [options]`.
+"""
+
+import argparse
+import ctypes
+import functools
+import logging
+import math
+import threading
+import time
+
+import sdl3
+
+from pyrogyro.capture import PAD_LOCAL_TARGET_TYPES, output_record, save_outputs
+from pyrogyro.constants import DEFAULT_POLL_RATE, LOG_FORMAT
+from pyrogyro.mapping import Mapping
+from pyrogyro.pad_worker import PadExecutionMode
+from pyrogyro.pyrogyro_pad import PyroGyroPad
+from pyrogyro.scheduler import NS_PER_SECOND, SchedulerMode
+from pyrogyro.uinput import MkbBackend
+from pyrogyro.virtual_pad import VpadBackend
+
+# pid.codes test VID/PID, so the bench pads never match a real device's config
+BENCH_VENDOR_ID = 0x1209
+BENCH_PRODUCT_ID = 0x0001
+STANDARD_GRAVITY = 9.80665
+STICK_SWEEP_HZ = 0.5
+GYRO_WAVE_HZ = 2.0
+GYRO_AMPLITUDE = 3.0  # rad/s
+TOUCH_CIRCLE_HZ = 1.0
+FRAME_PERCENTILES = (50, 90, 99, 99.9)
+
+logger = logging.getLogger("PyroGyroHeadlessBench")
+
+
+class NullOutputPad(PyroGyroPad):
+    """
+    A PyroGyroPad reading a real (here, virtual) SDL gamepad; virtual pad
+    outputs reach its virtual pad (a recorder, as the bench runs the mapper
+    with one), keyboard and mouse outputs go nowhere. Every output is
+    counted, and appended to `outputs` when given.
+    Also counts events handled and the thread CPU time spent on this pad.
+    """
+
+    def __init__(self, sdl_joystick, outputs=None, **kwargs):
+        self.outputs = outputs
+        self.frame_index = 0
+        self.reset_counters()
+        super().__init__(sdl_joystick, **kwargs)
+
+    def reset_counters(self):
+        self.event_count = 0
+        self.output_count = 0
+        self.cpu_ns = 0
+
+    def handle_event(self, event):
+        start_ns = time.thread_time_ns()
+        super().handle_event(event)
+        self.cpu_ns += time.thread_time_ns() - start_ns
+        self.event_count += 1
+
+    def update(self, time_now: float):
+        start_ns = time.thread_time_ns()
+        super().update(time_now)
+        self.cpu_ns += time.thread_time_ns() - start_ns
+
+    def send_value(self, source_value, target, source=None):
+        if isinstance(target, PAD_LOCAL_TARGET_TYPES):
+            super().send_value(source_value, target, source=source)
+        self.output_count += 1
+        if self.outputs is not None:
+            self.outputs.append(
+                output_record(
+                    self.frame_index, self.sdl_joystick_id, target, source_value
+                )
+            )
+
+    def flush_outputs(self):
+        super().flush_outputs()
+        self.frame_index += 1
+
+
+class VirtualBenchPad:
+    """
+    An SDL virtual gamepad with gyro, accelerometer and a two-finger touchpad.
+    Each drive() step sweeps the sticks and triggers, releases the last button
+    and presses the next, sends a gyro/accel sample and moves a finger around
+    the touchpad.
+    """
+
+    def __init__(self, index: int, sensor_rate: float):
+        self.index = index
+        self.name = f"PyroGyro Bench Pad {index}".encode()
+        self.sensors = (sdl3.SDL_VirtualJoystickSensorDesc * 2)()
+        self.sensors[0].type = sdl3.SDL_SENSOR_GYRO
+        self.sensors[0].rate = sensor_rate
+        self.sensors[1].type = sdl3.SDL_SENSOR_ACCEL
+        self.sensors[1].rate = sensor_rate
+        self.touchpads = (sdl3.SDL_VirtualJoystickTouchpadDesc * 1)()
+        self.touchpads[0].nfingers = 2
+
+        desc = sdl3.SDL_VirtualJoystickDesc()
+        desc.version = ctypes.sizeof(desc)
+        desc.type = sdl3.SDL_JOYSTICK_TYPE_GAMEPAD
+        desc.vendor_id = BENCH_VENDOR_ID
+        desc.product_id = BENCH_PRODUCT_ID
+        desc.naxes = sdl3.SDL_GAMEPAD_AXIS_COUNT
+        desc.nbuttons = sdl3.SDL_GAMEPAD_BUTTON_COUNT
+        desc.ntouchpads = 1
+        desc.touchpads = self.touchpads
+        desc.nsensors = 2
+        desc.sensors = self.sensors
+        desc.name = self.name
+        self.instance_id = sdl3.SDL_AttachVirtualJoystick(ctypes.byref(desc))
+        if not self.instance_id:
+            raise RuntimeError(
+                f"Couldn't attach virtual joystick: {sdl3.SDL_GetError().decode()}"
+            )
+        self.joystick = sdl3.SDL_OpenJoystick(self.instance_id)
+        self.sensor_data = (ctypes.c_float * 3)()
+        self.button = 0
+
+    def drive(self, elapsed: float):
+        joystick = self.joystick
+        phase = elapsed * 2 * math.pi + self.index
+        stick_phase = phase * STICK_SWEEP_HZ
+        stick_x = int(math.sin(stick_phase) * 32767)
+        stick_y = int(math.cos(stick_phase) * 32767)
+        trigger = int((math.sin(stick_phase) + 1) * 16383)
+        sdl3.SDL_SetJoystickVirtualAxis(joystick, sdl3.SDL_GAMEPAD_AXIS_LEFTX, stick_x)
+        sdl3.SDL_SetJoystickVirtualAxis(joystick, sdl3.SDL_GAMEPAD_AXIS_LEFTY, stick_y)
+        sdl3.SDL_SetJoystickVirtualAxis(
+            joystick, sdl3.SDL_GAMEPAD_AXIS_RIGHTX, -stick_y
+        )
+        sdl3.SDL_SetJoystickVirtualAxis(joystick, sdl3.SDL_GAMEPAD_AXIS_RIGHTY, stick_x)
+        sdl3.SDL_SetJoystickVirtualAxis(
+            joystick, sdl3.SDL_GAMEPAD_AXIS_LEFT_TRIGGER, trigger
+        )
+        sdl3.SDL_SetJoystickVirtualAxis(
+            joystick, sdl3.SDL_GAMEPAD_AXIS_RIGHT_TRIGGER, 32767 - trigger
+        )
+
+        sdl3.SDL_SetJoystickVirtualButton(joystick, self.button, False)
+        self.button = (self.button + 1) % sdl3.SDL_GAMEPAD_BUTTON_COUNT
+        sdl3.SDL_SetJoystickVirtualButton(joystick, self.button, True)
+
+        sensor_timestamp = sdl3.SDL_GetTicksNS()
+        gyro_phase = phase * GYRO_WAVE_HZ
+        data = self.sensor_data
+        data[0] = math.sin(gyro_phase) * GYRO_AMPLITUDE
+        data[1] = math.cos(gyro_phase) * GYRO_AMPLITUDE
+        data[2] = math.sin(gyro_phase * 0.5) * GYRO_AMPLITUDE * 0.25
+        sdl3.SDL_SendJoystickVirtualSensorData(
+            joystick, sdl3.SDL_SENSOR_GYRO, sensor_timestamp, data, 3
+        )
+        data[0] = 0.0
+        data[1] = STANDARD_GRAVITY
+        data[2] = 0.0
+        sdl3.SDL_SendJoystickVirtualSensorData(
+            joystick, sdl3.SDL_SENSOR_ACCEL, sensor_timestamp, data, 3
+        )
+
+        touch_phase = phase * TOUCH_CIRCLE_HZ
+        sdl3.SDL_SetJoystickVirtualTouchpad(
+            joystick,
+            0,
+            0,
+            True,
+            0.5 + math.cos(touch_phase) * 0.4,
+            0.5 + math.sin(touch_phase) * 0.4,
+            1.0,
+        )
+
+    def close(self):
+        sdl3.SDL_CloseJoystick(self.joystick)
+        sdl3.SDL_DetachVirtualJoystick(self.instance_id)
+
+
+def percentile(sorted_samples, pct: float):
+    if not sorted_samples:
+        return 0
+    rank = math.ceil(pct / 100 * len(sorted_samples)) - 1
+    return sorted_samples[min(max(rank, 0), len(sorted_samples) - 1)]
+
+
+class HeadlessBench:
+    """
+    Starts a PyroGyroMapper on NullOutputPads, attaches the virtual pads, waits
+    for every one to be registered, then drives them for `duration` seconds
+    while the mapper's own poll loop runs on the calling thread.
+    """
+
+    def __init__(
+        self,
+        pad_count: int = 4,
+        duration: float = 10.0,
+        drive_rate: int = 500,
+        poll_rate: int = DEFAULT_POLL_RATE,
+        scheduler_mode: SchedulerMode = SchedulerMode.DEADLINE,
+        pad_execution_mode: PadExecutionMode = PadExecutionMode.INLINE,
+        mapping: Mapping | None = None,
+        record: bool = False,
+        register_timeout: float = 10.0,
+    ):
+        self.pad_count = pad_count
+        self.duration = duration
+        self.drive_interval_ns = NS_PER_SECOND // drive_rate
+        self.mapping = mapping
+        self.outputs = [] if record else None
+        self.register_timeout = register_timeout
+        self.error = None
+        self.measure_start = None
+        self.measure_end = None
+        self.measure_cpu_start = None
+        self.measure_cpu_end = None
+
+        sdl3.SDL_SetHint(sdl3.SDL_HINT_VIDEO_DRIVER, "dummy".encode())
+        sdl3.SDL_SetHint(sdl3.SDL_HINT_JOYSTICK_ALLOW_BACKGROUND_EVENTS, "1".encode())
+        sdl3.SDL_Init(
+            sdl3.SDL_INIT_VIDEO | sdl3.SDL_INIT_GAMEPAD | sdl3.SDL_INIT_SENSOR
+        )
+
+        from pyrogyro.pyrogyro import PyroGyroMapper
+
+        self.mapper = PyroGyroMapper(
+            poll_rate=poll_rate,
+            scheduler_mode=scheduler_mode,
+            pad_execution_mode=pad_execution_mode,
+            pad_factory=functools.partial(NullOutputPad, outputs=self.outputs),
+            vpad_backend=VpadBackend.RECORDER,
+            mkb_backend=MkbBackend.PYAUTOGUI,
+        )
+        self.virtual_pads = [
+            VirtualBenchPad(index, sensor_rate=drive_rate) for index in range(pad_count)
+        ]
+
+    def wait_for_pads(self):
+        deadline = time.perf_counter() + self.register_timeout
+        while len(self.mapper.pad_routes) < self.pad_count:
+            if time.perf_counter() > deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def start_measuring(self):
+        # runs on the poll thread, between frames
+        for pyropad in self.mapper.pyropads.values():
+            if self.mapping:
+                pyropad.apply_mapping(self.mapping)
+            pyropad.reset_counters()
+        self.mapper.scheduler.summary(reset=True)
+        self.mapper.scheduler.frame_times = []
+        self.measure_start = time.perf_counter()
+        self.measure_cpu_start = time.process_time()
+
+    def stop_measuring(self):
+        # runs on the poll thread, between frames
+        scheduler = self.mapper.scheduler
+        self.measure_end = time.perf_counter()
+        self.measure_cpu_end = time.process_time()
+        self.frame_times = scheduler.frame_times
+        scheduler.frame_times = None
+        self.scheduler_summary = scheduler.summary()
+        self.mapper.running = False
+
+    def drive(self):
+        mapper = self.mapper
+        try:
+            if not self.wait_for_pads():
+                raise RuntimeError(
+                    f"only {len(mapper.pad_routes)} of {self.pad_count} virtual pads were registered"
+                )
+            mapper.housekeeper.hand_off(self.start_measuring)
+            start_ns = time.perf_counter_ns()
+            next_step_ns = start_ns
+            end_ns = start_ns + int(self.duration * NS_PER_SECOND)
+            while mapper.running and next_step_ns < end_ns:
+                elapsed = (next_step_ns - start_ns) / NS_PER_SECOND
+                for virtual_pad in self.virtual_pads:
+                    virtual_pad.drive(elapsed)
+                next_step_ns += self.drive_interval_ns
+                wait_ns = next_step_ns - time.perf_counter_ns()
+                if wait_ns > 0:
+                    sdl3.SDL_DelayPrecise(wait_ns)
+            mapper.housekeeper.hand_off(self.stop_measuring)
+        except Exception as error:
+            self.error = error
+            mapper.running = False
+
+    def run(self):
+        mapper = self.mapper
+        mapper.housekeeper.start()
+        mapper.housekeeper.submit(mapper.refresh_autoload_mappings)
+        driver = threading.Thread(target=self.drive, daemon=True, name="BenchDriver")
+        driver.start()
+        try:
+            mapper.input_poll()
+        finally:
+            mapper.running = False
+            driver.join()
+            for pad_worker in mapper.pad_workers.values():
+                pad_worker.stop()
+            mapper.housekeeper.stop()
+            for virtual_pad in self.virtual_pads:
+                virtual_pad.close()
+        if self.error:
+            raise self.error
+        return self.results()
+
+    def results(self):
+        elapsed = self.measure_end - self.measure_start
+        pyropads = list(self.mapper.pyropads.values())
+        event_count = sum(pyropad.event_count for pyropad in pyropads)
+        frame_times = sorted(self.frame_times)
+        results = {
+            "pads": len(pyropads),
+            "seconds": elapsed,
+            "events": event_count,
+            "events/s": event_count / elapsed,
+            "outputs/s": sum(pyropad.output_count for pyropad in pyropads) / elapsed,
+            "frames": len(frame_times),
+            "achieved rate": self.scheduler_summary["achieved_rate"],
+            "overruns": self.scheduler_summary["overruns"],
+        }
+        for pct in FRAME_PERCENTILES:
+            results[f"frame p{pct} us"] = percentile(frame_times, pct) / 1000
+        results["frame max us"] = frame_times[-1] / 1000 if frame_times else 0
+        results["process cpu %"] = (
+            (self.measure_cpu_end - self.measure_cpu_start) / elapsed * 100
+        )
+        for pyropad in pyropads:
+            pad_name = f"pad {pyropad.sdl_joystick_id}"
+            results[f"{pad_name} events/s"] = pyropad.event_count / elapsed
+            results[f"{pad_name} cpu %"] = (
+                pyropad.cpu_ns / NS_PER_SECOND / elapsed * 100
+            )
+        return results
+
+
+def headless_bench_main(argv=None):
+    logging.basicConfig(level=logging.INFO, format=LOG_FORMAT)
+    # per-button log lines would swamp the output under a button storm
+    logging.getLogger("PyroGyroPad").setLevel(logging.WARNING)
+    parser = argparse.ArgumentParser(
+        prog="pyrogyro bench",
+        description="Headless PyroGyro load test on SDL virtual joysticks",
+    )
+    parser.add_argument("--pads", type=int, default=4, help="virtual pads to attach")
+    parser.add_argument(
+        "--duration", type=float, default=10.0, help="seconds to drive the pads for"
+    )
+    parser.add_argument(
+        "--drive-rate",
+        type=int,
+        default=500,
+        help="virtual pad input (and sensor) updates per second",
+    )
+    parser.add_argument("--poll-rate", type=int, default=DEFAULT_POLL_RATE)
+    parser.add_argument(
+        "--scheduler", default=SchedulerMode.DEADLINE.value, help="DEADLINE or DELAY"
+    )
+    parser.add_argument(
+        "--pad-execution",
+        default=PadExecutionMode.INLINE.value,
+        help="INLINE, THREADED or AUTO",
+    )
+    parser.add_argument(
+        "--mapping", help="config file to map every pad with, instead of autoload"
+    )
+    parser.add_argument("--record", help="write every pad output to this file")
+    cmd_args = parser.parse_args(argv)
+
+    try:
+        scheduler_mode = SchedulerMode(cmd_args.scheduler.upper())
+        pad_execution_mode = PadExecutionMode(cmd_args.pad_execution.upper())
+    except ValueError as error:
+        parser.error(str(error))
+    mapping = None
+    if cmd_args.mapping:
+        with open(cmd_args.mapping) as mapping_file:
+            mapping = Mapping.load_from_file(mapping_file)
+
+    bench = HeadlessBench(
+        pad_count=cmd_args.pads,
+        duration=cmd_args.duration,
+        drive_rate=cmd_args.drive_rate,
+        poll_rate=cmd_args.poll_rate,
+        scheduler_mode=scheduler_mode,
+        pad_execution_mode=pad_execution_mode,
+        mapping=mapping,
+        record=bool(cmd_args.record),
+    )
+    results = bench.run()
+    logger.info("== headless bench ==")
+    for key, value in results.items():
+        logger.info(f"{key}: {value:,.2f}")
+    if cmd_args.record:
+        save_outputs(cmd_args.record, bench.outputs)
+        logger.info(f"Wrote {len(bench.outputs)} outputs to {cmd_args.record}")
+    sdl3.SDL_Quit()
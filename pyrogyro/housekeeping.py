@@ -0,0 +1,52 @@
+import logging
+import queue
+import threading
+import typing
+
+
+class Housekeeper:
+    """
+    Runs slow bookkeeping (device enumeration, config loading, autoload
+    evaluation) on a thread of its own. The system tray stays on the main
+    thread, as SDL's tray functions have to be called from there.
+
+    Work that has to touch live pads is handed back with hand_off(), and is
+    applied by the poll loop calling apply_handoffs() between frames.
+    """
+
+    def __init__(self):
+        self.logger = logging.getLogger("Housekeeper")
+        self.jobs = queue.SimpleQueue()
+        self.handoffs = queue.SimpleQueue()
+        self.running = False
+        self.thread = threading.Thread(target=self.run, daemon=True, name="Housekeeper")
+
+    def start(self):
+        self.running = True
+        self.thread.start()
+        return self
+
+    def stop(self, timeout: float = 2.0):
+        self.running = False
+        self.jobs.put(None)
+        self.thread.join(timeout)
+
+    def submit(self, job: typing.Callable[[], typing.Any]):
+        self.jobs.put(job)
+
+    def hand_off(self, callback: typing.Callable[[], typing.Any]):
+        self.handoffs.put(callback)
+
+    def apply_handoffs(self):
+        handoffs = self.handoffs
+        while not handoffs.empty():
+            handoffs.get_nowait()()
+
+    def run(self):
+        while self.running:
+            job = self.jobs.get()
+            if job:
+                try:
+                    job()
+                except Exception:
+                    self.logger.exception("Unhandled error in housekeeping job")
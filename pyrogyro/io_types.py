@@ -74,14 +74,9 @@ class ButtonTarget(enum.Enum):
 class MouseTarget(InputPreserver, enum.Enum):
     MOUSE = "MOUSE"
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._leftover_vel = Vec2()
-
-    def move_mouse(self, x: float, y: float):
-        self._leftover_vel.set_value(
-            *move_mouse(x, y, self._leftover_vel.x, self._leftover_vel.y)
-        )
+    def move_mouse(self, x: float, y: float, leftover_vel: Vec2):
+        # leftover_vel carries the sub-pixel remainder between moves, per pad
+        leftover_vel.set_value(*move_mouse(x, y, leftover_vel.x, leftover_vel.y))
 
     def preserve_input(self, input_val=None):
         if isinstance(input_val, Vec2) and input_val.length() > 0.01:
@@ -241,6 +236,7 @@ def resolve_outputs(
     real_world_calibration=1.0,
     in_game_sens=1.0,
     os_mouse_speed=1.0,
+    pad_state=None,
     **kwargs
 ):
     if type(target) in MapDirectTargetTypes:
@@ -252,6 +248,7 @@ def resolve_outputs(
             real_world_calibration=real_world_calibration,
             in_game_sens=in_game_sens,
             os_mouse_speed=os_mouse_speed,
+            pad_state=pad_state,
         )
         for key in rec_updates:
             resolve_outputs(
@@ -261,6 +258,7 @@ def resolve_outputs(
                 real_world_calibration=real_world_calibration,
                 in_game_sens=in_game_sens,
                 os_mouse_speed=os_mouse_speed,
+                pad_state=pad_state,
                 **kwargs
             )
     return resolve_dict
@@ -277,6 +275,20 @@ class MapComplexTarget(BaseModel):
 ZERO_VEC2 = Vec2()
 
 
+def _target_state(target, pad_state):
+    # with no pad to hold it, a target runs from a fresh state every time
+    if pad_state is None:
+        return target.new_state()
+    return pad_state.target_state(target)
+
+
+class AimState:
+    __slots__ = ("accel_mult",)
+
+    def __init__(self):
+        self.accel_mult = 1.0
+
+
 class AndTarget(BaseModel):
     AND: BasicMappingOrListOfMappings
 
@@ -302,18 +314,22 @@ class AsAim(InputPreserver, BaseModel):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        self._accel_mult = 1.0
-        self._output_vec = Vec2()
         self._max_output_thresh = 1.0 - self.deadzone_outer
 
+    def new_state(self):
+        return AimState()
+
     def _interp_input(self, input_vec: Vec2):
+        # Vec2.lerp(ZERO_VEC2, input_vec.normalized(), progress), as (x, y)
+        input_len = input_vec.length()
         magnitude = (
-            input_vec.length() / self._max_output_thresh
-            if self._max_output_thresh != 0
-            else 1.0
+            input_len / self._max_output_thresh if self._max_output_thresh != 0 else 1.0
         )
-        progress = magnitude**self.power
-        return Vec2.lerp(ZERO_VEC2, input_vec.normalized(), progress)
+        progress = clamp(magnitude**self.power, 1.0, 0.0)
+        input_x, input_y = input_vec.x, input_vec.y
+        if input_len != 0:
+            input_x, input_y = input_x / input_len, input_y / input_len
+        return input_x * progress, input_y * progress
 
     def preserve_input(self, input_val=None):
         if isinstance(input_val, Vec2) and input_val.length() > 0.01:
@@ -334,35 +350,47 @@ class AsAim(InputPreserver, BaseModel):
         real_world_calibration=1.0,
         in_game_sens=1.0,
         os_mouse_speed=1.0,
+        accel_mult=1.0,
     ):
-        vel_vec = (
-            self.sens_vec
-            * min(self._accel_mult, self.accel_cap)
-            * (real_world_calibration / os_mouse_speed / in_game_sens)
+        if isinstance(self.sens, float):
+            sens_x = sens_y = self.sens
+        else:
+            sens_x, sens_y = self.sens
+        accel_mult = min(accel_mult, self.accel_cap)
+        calibration = real_world_calibration / os_mouse_speed / in_game_sens
+        input_x, input_y = self._interp_input(input_value)
+        return Vec2(
+            sens_x
+            * accel_mult
+            * calibration
             * delta_time
+            * input_x
+            * (-1 if self.invert_x else 1),
+            sens_y
+            * accel_mult
+            * calibration
+            * delta_time
+            * input_y
+            * (-1 if self.invert_y else 1),
         )
-        input_value = self._interp_input(input_value)
-        vel_vec.set_value(
-            vel_vec.x * input_value.x * (-1 if self.invert_x else 1),
-            vel_vec.y * input_value.y * (-1 if self.invert_y else 1),
-        )
-        return vel_vec
 
-    def map_to_outputs(
+    def get_output_velocity(
         self,
         input_value,
         delta_time=0.0,
         real_world_calibration=1.0,
         in_game_sens=1.0,
         os_mouse_speed=1.0,
-        **kwargs
+        aim_state: AimState | None = None,
     ):
         result = ZERO_VEC2
         if isinstance(input_value, Vec2):
+            if aim_state is None:
+                aim_state = AimState()
             magnitude = input_value.length()
             full_tilt = magnitude >= self._max_output_thresh
             if not full_tilt:
-                self._accel_mult = 1.0
+                aim_state.accel_mult = 1.0
             if magnitude >= self.deadzone_inner:
                 result = self.get_velocity_vec(
                     input_value,
@@ -370,12 +398,33 @@ class AsAim(InputPreserver, BaseModel):
                     real_world_calibration=real_world_calibration,
                     in_game_sens=in_game_sens,
                     os_mouse_speed=os_mouse_speed,
+                    accel_mult=aim_state.accel_mult,
                 )
                 if full_tilt:
-                    self._accel_mult = min(
-                        self._accel_mult + (delta_time * self.accel_rate),
+                    aim_state.accel_mult = min(
+                        aim_state.accel_mult + (delta_time * self.accel_rate),
                         self.accel_cap,
                     )
+        return result
+
+    def map_to_outputs(
+        self,
+        input_value,
+        delta_time=0.0,
+        real_world_calibration=1.0,
+        in_game_sens=1.0,
+        os_mouse_speed=1.0,
+        pad_state=None,
+        **kwargs
+    ):
+        result = self.get_output_velocity(
+            input_value,
+            delta_time=delta_time,
+            real_world_calibration=real_world_calibration,
+            in_game_sens=in_game_sens,
+            os_mouse_speed=os_mouse_speed,
+            aim_state=_target_state(self, pad_state),
+        )
         return resolve_outputs(
             {},
             self.o,
@@ -384,6 +433,7 @@ class AsAim(InputPreserver, BaseModel):
             real_world_calibration=real_world_calibration,
             in_game_sens=in_game_sens,
             os_mouse_speed=os_mouse_speed,
+            pad_state=pad_state,
             **kwargs
         )
 
@@ -436,17 +486,19 @@ class AsGridSticks(BaseModel):
         typing.Mapping[int, typing.Mapping[int, "MapTarget"]]
     ] = None
 
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self._start_points = {}
+    def new_state(self):
+        # (touchpad, finger) -> where that finger first touched down
+        return {}
 
-    def map_to_outputs(self, input_value, **kwargs):
+    def map_to_outputs(self, input_value, pad_state=None, **kwargs):
         outputs = {}
         if isinstance(input_value, dict):
             to_remove = set()
-            for finger_index in set(self._start_points.keys()):
+            start_points = _target_state(self, pad_state)
+            kwargs["pad_state"] = pad_state
+            for finger_index in set(start_points.keys()):
                 if finger_index not in input_value:
-                    self._start_points.pop(finger_index)
+                    start_points.pop(finger_index)
                     if self.pad_fingers:
                         target = self.pad_fingers.get(finger_index[0], {}).get(
                             finger_index[1]
@@ -456,9 +508,9 @@ class AsGridSticks(BaseModel):
             for finger_index in input_value:
                 entry = input_value[finger_index]
                 if isinstance(entry, Vec2):
-                    if finger_index not in self._start_points:
-                        self._start_points[finger_index] = entry
-                    result = entry - self._start_points[finger_index]
+                    if finger_index not in start_points:
+                        start_points[finger_index] = entry
+                    result = entry - start_points[finger_index]
                     if self.pad_fingers:
                         target = self.pad_fingers.get(finger_index[0], {}).get(
                             finger_index[1]
@@ -0,0 +1,120 @@
+"""
+Input-to-output latency tracking.
+
+Each input a pad stores keeps the SDL timestamp of the oldest event that fed
+it this frame; once the frame's outputs have been submitted, the age of that
+timestamp is recorded, per source type, into a LatencyHistogram.
+"""
+
+from pyrogyro.constants import LATENCY_HISTOGRAM_BITS, LATENCY_HISTOGRAM_MAX_NS
+from pyrogyro.io_types import (
+    DoubleAxisSource,
+    GyroSource,
+    SDLButtonSource,
+    SingleAxisSource,
+    TouchSource,
+)
+
+SOURCE_TYPE_NAMES = {
+    SDLButtonSource: "button",
+    SingleAxisSource: "axis",
+    DoubleAxisSource: "stick",
+    GyroSource: "gyro",
+    TouchSource: "touchpad",
+}
+
+SUMMARY_PERCENTILES = (50, 90, 99, 99.9)
+
+
+class LatencyHistogram:
+    """
+    A log-linear (HDR-style) histogram of nanosecond values. Each power of two
+    is split into 2**bits linear sub-buckets, so any recorded value is kept to
+    within 1 part in 2**bits, at a fixed memory cost and O(1) per record.
+    """
+
+    def __init__(
+        self, bits: int = LATENCY_HISTOGRAM_BITS, max_ns: int = LATENCY_HISTOGRAM_MAX_NS
+    ):
+        self.bits = bits
+        self.sub_buckets = 1 << bits
+        max_shift = max(max_ns.bit_length() - bits - 1, 0)
+        self.counts = [0] * ((max_shift + 2) * self.sub_buckets)
+        self.reset()
+
+    def reset(self):
+        for index in range(len(self.counts)):
+            self.counts[index] = 0
+        self.count = 0
+        self.total_ns = 0
+        self.min_ns = None
+        self.max_ns = 0
+
+    def bucket_index(self, value_ns: int):
+        shift = max(value_ns.bit_length() - self.bits - 1, 0)
+        return min(
+            (shift * self.sub_buckets) + (value_ns >> shift), len(self.counts) - 1
+        )
+
+    def bucket_value(self, index: int):
+        # highest value that lands in the bucket, so percentiles never under-report
+        shift = max(index // self.sub_buckets - 1, 0)
+        return ((index - shift * self.sub_buckets) << shift) + (1 << shift) - 1
+
+    def record(self, value_ns: int):
+        if value_ns < 0:
+            value_ns = 0
+        self.counts[self.bucket_index(value_ns)] += 1
+        self.count += 1
+        self.total_ns += value_ns
+        if self.min_ns is None or value_ns < self.min_ns:
+            self.min_ns = value_ns
+        if value_ns > self.max_ns:
+            self.max_ns = value_ns
+
+    def percentile(self, pct: float):
+        if not self.count:
+            return 0
+        target = max(int(self.count * pct / 100 + 0.5), 1)
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return min(self.bucket_value(index), self.max_ns)
+        return self.max_ns
+
+    def summary(self):
+        summary = {
+            "count": self.count,
+            "mean_us": self.total_ns / self.count / 1000 if self.count else 0.0,
+            "min_us": (self.min_ns or 0) / 1000,
+        }
+        for pct in SUMMARY_PERCENTILES:
+            summary[f"p{pct}_us"] = self.percentile(pct) / 1000
+        summary["max_us"] = self.max_ns / 1000
+        return summary
+
+
+class LatencyTracker:
+    """
+    One pad's latency histograms, keyed by source type name.
+    """
+
+    def __init__(self):
+        self.histograms = {
+            name: LatencyHistogram() for name in SOURCE_TYPE_NAMES.values()
+        }
+
+    def record(self, source, latency_ns: int):
+        self.histograms[SOURCE_TYPE_NAMES[type(source)]].record(latency_ns)
+
+    def reset(self):
+        for histogram in self.histograms.values():
+            histogram.reset()
+
+    def summary(self):
+        return {
+            name: histogram.summary()
+            for name, histogram in self.histograms.items()
+            if histogram.count
+        }
@@ -0,0 +1,166 @@
+"""
+Controller LED animation.
+
+An animation is described by a LerpableLED (a colour sequence to lerp
+through) and baked into an LedTable: one 8-bit RGB colour per LED refresh
+across one loop of it, so a frame's colour is a table lookup rather than a
+lerp and a colour space conversion. PadLed steps through the table at its own
+refresh rate, independent of the poll rate, and only hands back a colour to
+write when the quantized colour changes, so the pad isn't sent an LED report
+every frame.
+"""
+
+import colorsys
+import enum
+import typing
+from dataclasses import dataclass, field
+
+from pyrogyro.constants import LED_REFRESH_RATE
+from pyrogyro.math import Vec3
+
+ROYGBIV = (
+    Vec3(x=0, y=1, z=1),
+    Vec3(x=1, y=1, z=1),
+)
+
+
+class ColorSpace(enum.Enum):
+    RGB = "RGB"
+    HSV = "HSV"
+
+    def to_rgb(self, in_color: Vec3):
+        match self.value:
+            case self.HSV.value:
+                rgb = colorsys.hsv_to_rgb(in_color.x, in_color.y, in_color.z)
+                return Vec3(x=rgb[0], y=rgb[1], z=rgb[2])
+            case self.RGB.value:
+                return in_color
+        return in_color
+
+
+@dataclass
+class LerpableLED:
+    current_color: Vec3 = field(default_factory=Vec3)
+    color_sequence: typing.Sequence[Vec3] = field(default_factory=list)
+    index_start: int = 0
+    index_end: int = 0
+    start_ts: typing.Optional[int] = None
+    duration_per_color: float = 1
+    color_space: ColorSpace = ColorSpace.RGB
+    instant_loop: bool = False
+
+    def set_sequence(
+        self,
+        color_sequence: typing.Sequence[Vec3],
+        color_space=ColorSpace.RGB,
+        duration_per_color=1,
+        instant_loop=False,
+    ):
+        self.instant_loop = instant_loop
+        self.color_sequence = color_sequence
+        self.color_space = color_space
+        self.index_start = 0
+        self.duration_per_color = duration_per_color
+        if len(self.color_sequence) > 1:
+            self.index_end = 1
+        else:
+            self.index_end = 0
+        return self
+
+    def update(self, timestamp):
+        if self.start_ts == None:
+            self.start_ts = timestamp
+        time_delta = timestamp - self.start_ts
+        if self.duration_per_color == 0:
+            delta = 0
+        else:
+            delta = time_delta / self.duration_per_color
+        start, end = (
+            self.color_sequence[self.index_start],
+            self.color_sequence[self.index_end],
+        )
+        self.current_color.set_lerp(start, end, delta)
+        if delta >= 1.0:
+            self.index_start = self.index_start + 1
+            self.index_end = self.index_end + 1
+            len_seq = len(self.color_sequence)
+            if self.index_start == len_seq - 1 and self.instant_loop:
+                self.index_start = 0
+                self.index_end = 1 if len_seq > 1 else 0
+            else:
+                self.index_start = self.index_start % len_seq
+                self.index_end = self.index_end % len_seq
+            self.start_ts = timestamp
+
+    def get_rgb_color(self):
+        return self.color_space.to_rgb(self.current_color)
+
+
+def quantize_color(color: Vec3):
+    return int(color.x * 255), int(color.y * 255), int(color.z * 255)
+
+
+class LedTable:
+    """
+    The RGB colours a LerpableLED's sequence shows at each refresh of one loop.
+    """
+
+    def __init__(self, led: LerpableLED, refresh_rate: float = LED_REFRESH_RATE):
+        self.refresh_rate = refresh_rate
+        sequence = led.color_sequence
+        segments = list(zip(sequence, sequence[1:]))
+        if len(sequence) > 1 and not led.instant_loop:
+            # fade from the last colour back to the first
+            segments.append((sequence[-1], sequence[0]))
+        if not segments or led.duration_per_color == 0:
+            segments = [(sequence[0], sequence[0])] if sequence else [(Vec3(), Vec3())]
+        frames_per_segment = max(1, round(led.duration_per_color * refresh_rate))
+        color = Vec3()
+        self.colors = [
+            quantize_color(
+                led.color_space.to_rgb(
+                    color.set_lerp(start, end, frame / frames_per_segment)
+                )
+            )
+            for start, end in segments
+            for frame in range(frames_per_segment)
+        ]
+
+    def __len__(self):
+        return len(self.colors)
+
+    def color_at(self, elapsed: float):
+        return self.colors[int(elapsed * self.refresh_rate) % len(self.colors)]
+
+
+class PadLed:
+    """
+    Plays an LedTable, returning a colour from update() only at most
+    refresh_rate times a second, and only when it differs from the last one.
+    """
+
+    def __init__(self, table: LedTable):
+        self.table = table
+        self.interval = 1.0 / table.refresh_rate
+        self.start_ts = None
+        self.next_refresh_ts = 0.0
+        self.color = None
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.written = 0
+        self.unchanged = 0
+
+    def update(self, timestamp: float):
+        if timestamp < self.next_refresh_ts:
+            return None
+        if self.start_ts is None:
+            self.start_ts = timestamp
+        self.next_refresh_ts = timestamp + self.interval
+        color = self.table.color_at(timestamp - self.start_ts)
+        if color == self.color:
+            self.unchanged += 1
+            return None
+        self.color = color
+        self.written += 1
+        return color
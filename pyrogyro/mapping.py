@@ -1,11 +1,14 @@
+import collections
 import collections.abc
-import logging
 import sys
 import typing
+from dataclasses import dataclass
 
 from pydantic import BaseModel, Field
 from ruamel.yaml import YAML, CommentedMap, CommentedSeq
 
+from pyrogyro.constants import LAYER_CACHE_SIZE
+from pyrogyro.dispatch import DispatchPlan
 from pyrogyro.gamepad_motion import GyroConfig, GyroMode
 from pyrogyro.io_types import (
     AndTarget,
@@ -87,6 +90,12 @@ class Layer(BaseModel):
             self._stale = False
 
 
+@dataclass
+class ComposedMapping:
+    map: dict
+    dispatch_plan: typing.Optional[DispatchPlan] = None
+
+
 _MAPPING_FIELD_ORDER = (
     "name",
     "autoload",
@@ -109,7 +118,21 @@ class Mapping(Layer):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._loaded_yml_map = None
-        self._active_layers = set()
+        # frozenset of active layer names -> ComposedMapping, least recently
+        # used first; shared by every pad running this mapping
+        self._composition_cache = collections.OrderedDict()
+
+    def __getstate__(self):
+        # composed maps hold compiled handlers, which don't pickle; they're
+        # rebuilt on demand after unpickling
+        state = super().__getstate__()
+        state["__dict__"] = dict(
+            state["__dict__"],
+            _active_mapping={},
+            _composition_cache=collections.OrderedDict(),
+            _stale=True,
+        )
+        return state
 
     def get_in_game_sens(self):
         return self.in_game_sens if self.in_game_sens else 1.0
@@ -122,44 +145,57 @@ class Mapping(Layer):
     def get_os_mouse_speed_correction(self):
         return get_os_mouse_speed() if self.counter_os_mouse_speed else 1.0
 
-    def reset(self):
-        self._active_layers.clear()
-        self._stale = True
-
     @property
     def map(self):
-        self.refresh_active_mapping()
-        return self._active_mapping
-
-    def set_layer_activation(self, layer_name: str, active: bool):
-        if layer_name in self.layers:
-            if active:
-                if layer_name not in self._active_layers:
-                    logging.info(f"Activated layer {layer_name}")
-                    self._active_layers.add(layer_name)
-                    self._stale = True
-            else:
-                if layer_name in self._active_layers:
-                    logging.info(f"Deactivated layer {layer_name}")
-                    self._active_layers.remove(layer_name)
-                    self._stale = True
+        # the map with no layers active; pads track their own active layers
+        return self.composed().map
 
-    def refresh_active_mapping(self):
-        if self._stale:
-            self._active_mapping.clear()
-            if isinstance(self.mapping, typing.Sequence):
-                for entry in self.mapping:
-                    if isinstance(entry, DetailedMapping):
-                        if isinstance(entry, DetailedMapping):
-                            self._active_mapping[entry.input] = entry.output
-                    else:
-                        self._active_mapping.update(entry)
-            else:
-                self._active_mapping.update(self.mapping)
-            for layer in self.layers:
-                if layer in self._active_layers:
-                    self._active_mapping.update(self.layers[layer].map)
-            self._stale = False
+    @property
+    def dispatch_plan(self):
+        return self.dispatch_plan_for(self.composed())
+
+    def dispatch_plan_for(self, composed: ComposedMapping):
+        if composed.dispatch_plan is None:
+            composed.dispatch_plan = DispatchPlan.compile(self, composed.map)
+        return composed.dispatch_plan
+
+    def compose_active_mapping(self, active_layers: typing.AbstractSet[str]):
+        active_mapping = {}
+        if isinstance(self.mapping, typing.Sequence):
+            for entry in self.mapping:
+                if isinstance(entry, DetailedMapping):
+                    active_mapping[entry.input] = entry.output
+                else:
+                    active_mapping.update(entry)
+        else:
+            active_mapping.update(self.mapping)
+        for layer in self.layers:
+            if layer in active_layers:
+                active_mapping.update(self.layers[layer].map)
+        return active_mapping
+
+    def composed(self, active_layers: frozenset = frozenset()) -> ComposedMapping:
+        """
+        Returns the map (and dispatch plan) with active_layers applied, reusing
+        a previously composed one where possible. Pads on other threads may
+        call this concurrently; at worst a map is composed twice.
+        """
+        cache = self._composition_cache
+        composed = cache.get(active_layers)
+        if composed:
+            try:
+                cache.move_to_end(active_layers)
+            except KeyError:
+                pass
+            return composed
+        composed = ComposedMapping(self.compose_active_mapping(active_layers))
+        cache[active_layers] = composed
+        while len(cache) > LAYER_CACHE_SIZE:
+            try:
+                cache.popitem(last=False)
+            except KeyError:
+                break
+        return composed
 
     def count_autoload_specificity(self):
         if self.autoload:
@@ -19,7 +19,7 @@ def sign(input):
 RADIANS_TO_DEGREES = 360 / (2 * math.pi)
 
 
-@dataclass
+@dataclass(slots=True)
 class Vec2:
     x: float = 0
     y: float = 0
@@ -29,6 +29,7 @@ class Vec2:
 
     def set_value(self, x: float, y: float):
         self.x, self.y = x, y
+        return self
 
     def length(self):
         return math.sqrt(self.x**2 + self.y**2)
@@ -67,6 +68,10 @@ class Vec2:
             self.y = self.y + other
         return self
 
+    def __imul__(self, other):
+        self.x, self.y = self.x * other, self.y * other
+        return self
+
     def __itruediv__(self, other):
         self.x, self.y = self.x / other, self.y / other
         return self
@@ -88,7 +93,7 @@ class Vec2:
         return self
 
 
-@dataclass
+@dataclass(slots=True)
 class Vec3:
     x: float = 0
     y: float = 0
@@ -96,6 +101,7 @@ class Vec3:
 
     def set_value(self, x: float, y: float, z: float):
         self.x, self.y, self.z = x, y, z
+        return self
 
     def is_zero_vector(self):
         return self.x == 0 and self.y == 0 and self.z == 0
@@ -137,29 +143,47 @@ class Vec3:
         return self
 
     def cross(self, other):
-        return Vec3(
-            self.y * other.z - other.y * self.z,
-            self.z * other.x - other.z * self.x,
-            self.x * other.y - other.x * self.y,
+        return Vec3().set_cross(self, other)
+
+    def set_cross(self, start: "Vec3", end: "Vec3"):
+        self.x, self.y, self.z = (
+            start.y * end.z - end.y * start.z,
+            start.z * end.x - end.z * start.x,
+            start.x * end.y - end.x * start.y,
         )
+        return self
 
     def dot(self, other):
         return self.x * other.x + self.y * other.y + self.z * other.z
 
     def mul(self, other):
         if isinstance(other, Vec3):
-            cross = self.cross(other)
-            self.x = cross.x
-            self.y = cross.y
-            self.z = cross.z
+            self.set_cross(self, other)
         elif isinstance(other, Quat):
-            temp = other * Quat(0.0, self.x, self.y, self.z) * other.inverse()
-            self.x, self.y, self.z = temp.x, temp.y, temp.z
+            self.rotate(other)
         else:
             self.x = self.x * other
             self.y = self.y * other
             self.z = self.z * other
 
+    def rotate(self, rotation: "Quat"):
+        """
+        rotation * Quat(0, self) * rotation.inverse(), written out so no
+        intermediate quaternions are made
+        """
+        w, x, y, z = rotation.w, rotation.x, rotation.y, rotation.z
+        vx, vy, vz = self.x, self.y, self.z
+        pw = -x * vx - y * vy - z * vz
+        px = w * vx + y * vz - z * vy
+        py = w * vy - x * vz + z * vx
+        pz = w * vz + x * vy - y * vx
+        self.x, self.y, self.z = (
+            -pw * x + px * w - py * z + pz * y,
+            -pw * y + px * z + py * w - pz * x,
+            -pw * z - px * y + py * x + pz * w,
+        )
+        return self
+
     def __iadd__(self, other):
         if isinstance(other, Vec3):
             self.x = self.x + other.x
@@ -171,12 +195,31 @@ class Vec3:
             self.z = self.z + other
         return self
 
+    def __isub__(self, other):
+        if isinstance(other, Vec3):
+            self.x = self.x - other.x
+            self.y = self.y - other.y
+            self.z = self.z - other.z
+        else:
+            self.x = self.x - other
+            self.y = self.y - other
+            self.z = self.z - other
+        return self
+
+    def __imul__(self, other):
+        self.x, self.y, self.z = self.x * other, self.y * other, self.z * other
+        return self
+
     def length(self):
         return math.sqrt(self.x**2 + self.y**2 + self.z**2)
 
     def normalized(self):
         return Vec3(self.x, self.y, self.z).normalize()
 
+    def set_normalized(self, other: "Vec3"):
+        self.x, self.y, self.z = other.x, other.y, other.z
+        return self.normalize()
+
     def normalize(self):
         current_len = self.length()
         if current_len != 0:
@@ -186,7 +229,7 @@ class Vec3:
         return self
 
 
-@dataclass
+@dataclass(slots=True)
 class Quat:
     w: float
     x: float
@@ -221,9 +264,21 @@ class Quat:
 
     @classmethod
     def angle_axis(cls, in_angle: float, in_x: float, in_y: float, in_z: float):
+        return cls(1.0, 0.0, 0.0, 0.0).set_angle_axis(in_angle, in_x, in_y, in_z)
+
+    def set_angle_axis(self, in_angle: float, in_x: float, in_y: float, in_z: float):
         sin_half_angle = math.sin(in_angle * 0.5)
-        in_axis = Vec3(in_x, in_y, in_z)
-        in_axis.normalize()
-        in_axis.mul(in_axis * sin_half_angle)
-        result = cls(math.cos(in_angle * 0.5), in_axis.x, in_axis.y, in_axis.z)
-        return result
+        axis_len = math.sqrt(in_x**2 + in_y**2 + in_z**2)
+        if axis_len != 0:
+            in_x, in_y, in_z = in_x / axis_len, in_y / axis_len, in_z / axis_len
+        # in_axis.mul(in_axis * sin_half_angle), without the temporaries
+        sin_x, sin_y, sin_z = (
+            in_x * sin_half_angle,
+            in_y * sin_half_angle,
+            in_z * sin_half_angle,
+        )
+        self.w = math.cos(in_angle * 0.5)
+        self.x = in_y * sin_z - sin_y * in_z
+        self.y = in_z * sin_x - sin_z * in_x
+        self.z = in_x * sin_y - sin_x * in_y
+        return self
@@ -0,0 +1,219 @@
+"""
+Sending pad outputs from a thread of their own.
+
+Every output a frame produces ends in an OS or device call: vpad reports,
+mouse motion, key presses, LED and rumble writes. In THREADED output dispatch
+a pad records its frame's calls into an OutputFrame instead, and hands it to
+the OutputDispatcher, whose thread makes them; a slow call then delays other
+outputs, not the processing of the next input frame.
+
+The dispatcher holds a bounded ring of frames. When it's full, the frame
+being submitted is either merged into the newest one waiting (MERGE) or the
+oldest waiting frame is dropped to make room (DROP). MERGE loses nothing a
+frame asked for: key and button transitions are carried over in order, mouse
+motion is added up, and latest calls are kept unless a newer frame replaces
+them. DROP only carries the dropped frame's key and button transitions (and
+the mkb flush that sends them) over to the next frame; its mouse motion and
+other latest calls are discarded, and counted in dropped_outputs. A
+discarded vpad report, LED or rumble write is only made up for by the pad's
+next change, keepalive or refresh of it.
+"""
+
+import collections
+import enum
+import logging
+import threading
+import time
+
+import sdl3
+
+from pyrogyro.constants import OUTPUT_QUEUE_SIZE
+from pyrogyro.latency import LatencyHistogram
+from pyrogyro.platform import move_mouse
+
+# the latest-call key of the flush that sends a frame's key and mouse output
+MKB_FLUSH_KEY = "mkb"
+
+
+class OutputDispatchMode(enum.Enum):
+    # outputs are sent from the thread computing them, as they're produced
+    INLINE = "INLINE"
+    # outputs are sent from the output dispatcher's thread
+    THREADED = "THREADED"
+
+
+class OutputQueuePolicy(enum.Enum):
+    # a frame submitted to a full queue is merged into the newest queued frame
+    MERGE = "MERGE"
+    # the oldest queued frame is dropped to make room; only its key and button
+    # transitions are kept
+    DROP = "DROP"
+
+
+class OutputFrame:
+    """
+    One frame's output calls: key and button transitions in order, relative
+    mouse motion, and "latest" calls (vpad reports, LED, rumble) where only
+    the newest call per key matters. input_timestamps holds the (latency
+    tracker, source, SDL timestamp) of the inputs behind the outputs, which
+    are recorded once the calls have been made.
+    """
+
+    __slots__ = (
+        "events",
+        "mouse_x",
+        "mouse_y",
+        "latest",
+        "input_timestamps",
+        "submitted_ns",
+    )
+
+    def __init__(self):
+        self.events = []
+        self.mouse_x = 0
+        self.mouse_y = 0
+        self.latest = {}
+        self.input_timestamps = []
+        self.submitted_ns = 0
+
+    def __bool__(self):
+        return bool(self.events or self.mouse_x or self.mouse_y or self.latest)
+
+    def has_mkb_output(self):
+        # key and mouse button transitions are the only ordered events
+        return bool(self.events or self.mouse_x or self.mouse_y)
+
+    def merge(self, newer: "OutputFrame"):
+        self.events.extend(newer.events)
+        self.mouse_x += newer.mouse_x
+        self.mouse_y += newer.mouse_y
+        self.latest.update(newer.latest)
+        self.input_timestamps.extend(newer.input_timestamps)
+
+    def keep_events(self, older: "OutputFrame") -> int:
+        """
+        Carries a dropped older frame's key and button transitions, and the
+        flush they need, over ahead of this frame's own. Returns how many of
+        its other outputs (mouse motion and latest calls) are discarded.
+        """
+        self.events[:0] = older.events
+        self.input_timestamps[:0] = older.input_timestamps
+        discarded = len(older.latest)
+        if older.events and MKB_FLUSH_KEY in older.latest:
+            self.latest.setdefault(MKB_FLUSH_KEY, older.latest[MKB_FLUSH_KEY])
+            discarded -= 1
+        if older.mouse_x or older.mouse_y:
+            discarded += 1
+        return discarded
+
+    def run(self):
+        for func, args in self.events:
+            func(*args)
+        if self.mouse_x or self.mouse_y:
+            move_mouse(self.mouse_x, self.mouse_y)
+        for func, args in self.latest.values():
+            func(*args)
+
+    def record_latency(self):
+        if self.input_timestamps:
+            # SDL event timestamps are on the SDL_GetTicksNS clock
+            now_ns = sdl3.SDL_GetTicksNS()
+            for latency, source, timestamp in self.input_timestamps:
+                latency.record(source, now_ns - timestamp)
+
+
+class OutputDispatcher:
+    def __init__(
+        self,
+        capacity: int = OUTPUT_QUEUE_SIZE,
+        policy: OutputQueuePolicy = OutputQueuePolicy.MERGE,
+    ):
+        self.logger = logging.getLogger("OutputDispatcher")
+        self.capacity = max(capacity, 1)
+        self.policy = policy
+        self.frames = collections.deque()
+        self.condition = threading.Condition()
+        self.running = False
+        # submit -> calls made, for every frame dispatched
+        self.latency = LatencyHistogram()
+        self.reset_counters()
+        self.thread = threading.Thread(
+            target=self.run, daemon=True, name=type(self).__name__
+        )
+
+    def reset_counters(self):
+        self.submitted = 0
+        self.dispatched = 0
+        self.merged = 0
+        self.dropped = 0
+        self.dropped_outputs = 0
+        self.depth_total = 0
+        self.depth_max = 0
+        self.latency.reset()
+
+    def start(self):
+        self.running = True
+        self.thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join(timeout)
+
+    def submit(self, frame: OutputFrame):
+        """
+        Queues a frame's outputs; safe to call from any thread.
+        """
+        frame.submitted_ns = time.perf_counter_ns()
+        with self.condition:
+            frames = self.frames
+            if len(frames) >= self.capacity:
+                if self.policy == OutputQueuePolicy.MERGE:
+                    frames[-1].merge(frame)
+                    self.merged += 1
+                else:
+                    stale = frames.popleft()
+                    frames.append(frame)
+                    self.dropped_outputs += frames[0].keep_events(stale)
+                    self.dropped += 1
+            else:
+                frames.append(frame)
+            self.submitted += 1
+            depth = len(frames)
+            self.depth_total += depth
+            if depth > self.depth_max:
+                self.depth_max = depth
+            self.condition.notify()
+
+    def run(self):
+        frames = self.frames
+        while True:
+            with self.condition:
+                while not frames and self.running:
+                    self.condition.wait()
+                if not frames:
+                    break
+                frame = frames.popleft()
+            try:
+                frame.run()
+                frame.record_latency()
+            except Exception:
+                self.logger.exception("Unhandled error sending outputs")
+            self.latency.record(time.perf_counter_ns() - frame.submitted_ns)
+            self.dispatched += 1
+
+    def summary(self):
+        return {
+            "policy": self.policy.value,
+            "submitted": self.submitted,
+            "dispatched": self.dispatched,
+            "merged": self.merged,
+            "dropped": self.dropped,
+            "dropped_outputs": self.dropped_outputs,
+            "depth": len(self.frames),
+            "depth_mean": self.depth_total / self.submitted if self.submitted else 0.0,
+            "depth_max": self.depth_max,
+            "latency": self.latency.summary(),
+        }
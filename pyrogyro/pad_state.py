@@ -0,0 +1,198 @@
+"""
+Per-pad runtime state for a Mapping.
+
+Mappings and their targets are treated as immutable definitions, so one
+Mapping (and its composed maps and dispatch plans) can be shared by every pad
+it's applied to, including pads processed on their own threads. Everything a
+mapping accumulates while it runs (active layers, aim acceleration, touch
+start points, gyro smoothing, sub-pixel mouse movement) lives in the PadState
+of the pad running it instead.
+"""
+
+import collections
+import collections.abc
+import logging
+import typing
+
+from pyrogyro.io_types import AndTarget, AsAim, AsDpad, AsGridSticks, DetailedMapping
+from pyrogyro.mapping import ComposedMapping, Mapping
+from pyrogyro.math import Vec2
+
+STATEFUL_TARGET_TYPES = (AsAim, AsGridSticks)
+
+
+def iter_target_paths(target_raw, path=()):
+    """
+    Yields (path, target) for every target in a map entry, including ones
+    nested in complex targets. A path names where a target sits (map key,
+    list index or complex target field, outermost first), so the same slot
+    can be found in another version of the mapping.
+    """
+    match target_raw:
+        case None:
+            return
+        case DetailedMapping():
+            yield from iter_target_paths(target_raw.output, path + (target_raw.input,))
+        case collections.abc.Mapping():
+            for key, target in target_raw.items():
+                yield from iter_target_paths(target, path + (key,))
+        case str():
+            return
+        case collections.abc.Sequence():
+            for index, target in enumerate(target_raw):
+                yield from iter_target_paths(target, path + (index,))
+        case AsAim():
+            yield path, target_raw
+            yield from iter_target_paths(target_raw.o, path + ("o",))
+        case AsDpad():
+            yield path, target_raw
+            for direction in ("UP", "RIGHT", "DOWN", "LEFT"):
+                yield from iter_target_paths(
+                    getattr(target_raw, direction), path + (direction,)
+                )
+        case AsGridSticks():
+            yield path, target_raw
+            yield from iter_target_paths(target_raw.pad_fingers or {}, path)
+        case AndTarget():
+            yield path, target_raw
+            yield from iter_target_paths(target_raw.AND, path + ("AND",))
+        case _:
+            yield path, target_raw
+
+
+def iter_stateful_targets(mapping: Mapping):
+    """
+    Yields (path, target) for every stateful target the mapping or its layers
+    can reach; paths start with the layer name (None for the base mapping).
+    """
+    for layer_name, layer in ((None, mapping), *mapping.layers.items()):
+        layer_map = layer.map
+        for path, target in iter_target_paths(layer_map, (layer_name,)):
+            if isinstance(target, STATEFUL_TARGET_TYPES):
+                yield path, target
+
+
+class MappingDiff:
+    """
+    A structural diff between a mapping and a reloaded version of it. Every
+    map entry is compared by its layer and source; stateful targets are
+    matched by path, and one found unchanged in the new mapping is "kept":
+    a pad reloading onto the new mapping carries its state over.
+    """
+
+    def __init__(self, old_mapping: Mapping, new_mapping: Mapping):
+        self.old_mapping = old_mapping
+        self.new_mapping = new_mapping
+        old_entries = self.map_entries(old_mapping)
+        new_entries = self.map_entries(new_mapping)
+        self.changed_entries = [
+            key
+            for key in old_entries.keys() | new_entries.keys()
+            if old_entries.get(key) != new_entries.get(key)
+        ]
+        old_targets = dict(iter_stateful_targets(old_mapping))
+        # id(new target) -> the unchanged old target it replaces
+        self.kept_targets = {}
+        self.stateful_count = 0
+        for path, target in iter_stateful_targets(new_mapping):
+            self.stateful_count += 1
+            old_target = old_targets.get(path)
+            if old_target is not None and old_target == target:
+                self.kept_targets[id(target)] = old_target
+        self.gyro_changed = old_mapping.gyro != new_mapping.gyro
+        self.settings_changed = any(
+            getattr(old_mapping, field) != getattr(new_mapping, field)
+            for field in (
+                "real_world_calibration",
+                "in_game_sens",
+                "counter_os_mouse_speed",
+            )
+        )
+
+    @staticmethod
+    def map_entries(mapping: Mapping):
+        entries = {(None, source): target for source, target in mapping.map.items()}
+        for layer_name, layer in mapping.layers.items():
+            entries.update(
+                ((layer_name, source), target) for source, target in layer.map.items()
+            )
+        return entries
+
+    def describe(self):
+        changes = [f"{len(self.changed_entries)} map entries"]
+        if self.gyro_changed:
+            changes.append("gyro")
+        if self.settings_changed:
+            changes.append("sensitivity settings")
+        return (
+            f"changed {', '.join(changes)}; kept state for "
+            f"{len(self.kept_targets)}/{self.stateful_count} stateful targets"
+        )
+
+
+class PadState:
+    """
+    The runtime state of one pad running one Mapping. A new PadState is made
+    whenever a pad switches mappings; when it reloads one, the new state
+    carries over whatever the reload didn't change (see MappingDiff).
+    """
+
+    def __init__(
+        self,
+        mapping: Mapping,
+        previous: typing.Optional["PadState"] = None,
+        diff: MappingDiff | None = None,
+    ):
+        self.mapping = mapping
+        if previous:
+            self.active_layers = previous.active_layers & mapping.layers.keys()
+            self.mouse_leftover = previous.mouse_leftover
+            self.gyro_smooth_buffer = collections.deque(
+                previous.gyro_smooth_buffer, maxlen=mapping.gyro.mode.smooth_window
+            )
+        else:
+            self.active_layers = set()
+            self.mouse_leftover = Vec2()
+            self.gyro_smooth_buffer = mapping.gyro.mode.new_smooth_buffer()
+        # id(target) -> that target's state, for every stateful target the
+        # mapping or its layers can reach
+        self.target_states = {}
+        for _, target in iter_stateful_targets(mapping):
+            target_state = None
+            if previous and diff:
+                old_target = diff.kept_targets.get(id(target))
+                if old_target is not None:
+                    target_state = previous.target_states.get(id(old_target))
+            if target_state is None:
+                target_state = target.new_state()
+            self.target_states.setdefault(id(target), target_state)
+        self.composed: ComposedMapping = None
+        self.handlers = None
+        self.compose()
+
+    def compose(self):
+        self.composed = self.mapping.composed(frozenset(self.active_layers))
+        self.handlers = self.mapping.dispatch_plan_for(self.composed).handlers
+
+    @property
+    def map(self):
+        return self.composed.map
+
+    def target_state(self, target):
+        target_state = self.target_states.get(id(target))
+        if target_state is None:
+            target_state = self.target_states[id(target)] = target.new_state()
+        return target_state
+
+    def set_layer_activation(self, layer_name: str, active: bool):
+        if layer_name in self.mapping.layers:
+            if active:
+                if layer_name not in self.active_layers:
+                    logging.info(f"Activated layer {layer_name}")
+                    self.active_layers.add(layer_name)
+                    self.compose()
+            else:
+                if layer_name in self.active_layers:
+                    logging.info(f"Deactivated layer {layer_name}")
+                    self.active_layers.remove(layer_name)
+                    self.compose()
@@ -0,0 +1,103 @@
+import enum
+import logging
+import queue
+import sys
+import threading
+import time
+
+
+class PadExecutionMode(enum.Enum):
+    # every pad is processed in turn on the input poll thread
+    INLINE = "INLINE"
+    # each pad runs its pipeline on a dedicated worker thread
+    THREADED = "THREADED"
+    # THREADED on free-threaded builds, INLINE when the GIL would serialise the workers
+    AUTO = "AUTO"
+
+    def resolve(self):
+        if self == PadExecutionMode.AUTO:
+            return (
+                PadExecutionMode.INLINE if gil_enabled() else PadExecutionMode.THREADED
+            )
+        return self
+
+
+def gil_enabled():
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return is_gil_enabled() if is_gil_enabled else True
+
+
+class PadWorker:
+    """
+    Runs one PyroGyroPad's on_poll_start/handle_event/update on its own thread.
+
+    Stands in for the pad in the poll loop: events routed to it are buffered
+    for the current frame, and update() hands the frame to the worker. A worker
+    that falls behind merges every frame queued since into one, so a slow pad
+    never accumulates a backlog or holds up the others.
+    """
+
+    def __init__(self, pad):
+        self.logger = logging.getLogger("PadWorker")
+        self.pad = pad
+        self.frames = queue.SimpleQueue()
+        self.pending_events = []
+        self.frame_count = 0
+        self.merged_frames = 0
+        self.latency_total_ns = 0
+        self.latency_max_ns = 0
+        self.thread = threading.Thread(
+            target=self.run, daemon=True, name=f"PadWorker-{pad.sdl_joystick_id}"
+        )
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self, timeout: float = 1.0):
+        self.frames.put(None)
+        self.thread.join(timeout)
+
+    def on_poll_start(self):
+        self.pending_events = []
+
+    def handle_event(self, event):
+        self.pending_events.append(event)
+
+    def update(self, time_now: float):
+        self.frames.put((self.pending_events, time_now, time.perf_counter_ns()))
+
+    def run(self):
+        running = True
+        while running:
+            frame = self.frames.get()
+            if frame is None:
+                break
+            events, time_now, submitted_ns = frame
+            while True:
+                try:
+                    next_frame = self.frames.get_nowait()
+                except queue.Empty:
+                    break
+                if next_frame is None:
+                    running = False
+                    break
+                events = events + next_frame[0]
+                time_now = next_frame[1]
+                self.merged_frames += 1
+            try:
+                self.process_frame(events, time_now)
+            except Exception:
+                self.logger.exception("Unhandled error in pad worker; frame dropped")
+            latency_ns = time.perf_counter_ns() - submitted_ns
+            self.frame_count += 1
+            self.latency_total_ns += latency_ns
+            if latency_ns > self.latency_max_ns:
+                self.latency_max_ns = latency_ns
+
+    def process_frame(self, events, time_now: float):
+        pad = self.pad
+        pad.on_poll_start()
+        for event in events:
+            pad.handle_event(event)
+        pad.update(time_now)
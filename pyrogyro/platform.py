@@ -1,16 +1,22 @@
 import ctypes
+import logging
 import platform
 
 import sdl3
 
+from pyrogyro.constants import DEFAULT_MKB_BACKEND
 from pyrogyro.math import *
+from pyrogyro.uinput import MkbBackend, UInputMkb
 
 SYSTEM = platform.system()
 
 match SYSTEM:
     case "Windows":
         import pydirectinput
-        from pydirectinput import keyDown, keyUp, mouseDown, mouseUp
+        from pydirectinput import keyDown as _key_down
+        from pydirectinput import keyUp as _key_up
+        from pydirectinput import mouseDown as _mouse_down
+        from pydirectinput import mouseUp as _mouse_up
         from pydirectinput import moveRel as _movemouse
 
         from pyrogyro.monitor_focus import WindowChangeEventListener
@@ -21,7 +27,7 @@ match SYSTEM:
         kernel32 = ctypes.WinDLL("kernel32")
         user32 = ctypes.WinDLL("user32")
 
-        def move_mouse(
+        def _os_move_mouse(
             x: float,
             y: float,
             extra_x: float = 0.0,
@@ -29,7 +35,8 @@ match SYSTEM:
         ):
             vel_x = x + extra_x
             vel_y = y + extra_y
-            _movemouse(int(vel_x), int(vel_y), relative=True)
+            if int(vel_x) or int(vel_y):
+                _movemouse(int(vel_x), int(vel_y), relative=True)
             leftover_x = vel_x % sign(vel_x)
             leftover_y = vel_y % sign(vel_y)
             return leftover_x, leftover_y
@@ -54,13 +61,16 @@ match SYSTEM:
 
     case _:
         import pyautogui
-        from pyautogui import keyDown, keyUp, mouseDown, mouseUp
+        from pyautogui import keyDown as _key_down
+        from pyautogui import keyUp as _key_up
+        from pyautogui import mouseDown as _mouse_down
+        from pyautogui import mouseUp as _mouse_up
         from pyautogui import moveRel as _movemouse
 
         pyautogui.FAILSAFE = False
         pyautogui.PAUSE = 0
 
-        def move_mouse(
+        def _os_move_mouse(
             x: float,
             y: float,
             extra_x: float = 0.0,
@@ -68,7 +78,8 @@ match SYSTEM:
         ):
             vel_x = x + extra_x
             vel_y = y + extra_y
-            _movemouse(int(vel_x), int(vel_y))
+            if int(vel_x) or int(vel_y):
+                _movemouse(int(vel_x), int(vel_y))
             leftover_x = vel_x % sign(vel_x)
             leftover_y = vel_y % sign(vel_y)
             return leftover_x, leftover_y
@@ -89,3 +100,87 @@ match SYSTEM:
 
         def get_os_mouse_speed():
             return 1.0
+
+
+logger = logging.getLogger("Platform")
+
+# the uinput keyboard/mouse, while open_mkb_backend has one open; importing
+# this module opens nothing, so config workers, replays and benchmarks don't
+uinput_mkb = None
+
+
+def open_mkb_backend(backend: MkbBackend = MkbBackend(DEFAULT_MKB_BACKEND)):
+    """
+    Opens the keyboard/mouse backend outputs go through, returning the one in
+    use: UINPUT falls back to PYAUTOGUI if the device can't be created.
+    """
+    global uinput_mkb
+    backend = backend.resolve(SYSTEM)
+    if backend == MkbBackend.UINPUT and uinput_mkb is None:
+        try:
+            uinput_mkb = UInputMkb.open()
+        except OSError as error:
+            logger.info(
+                f"uinput unavailable ({error}); using pyautogui for keyboard and mouse"
+            )
+            backend = MkbBackend.PYAUTOGUI
+    elif backend == MkbBackend.PYAUTOGUI:
+        close_mkb_backend()
+    return backend
+
+
+def close_mkb_backend():
+    global uinput_mkb
+    if uinput_mkb is not None:
+        uinput_mkb.close()
+        uinput_mkb = None
+
+
+def keyDown(key: str):
+    if uinput_mkb is not None:
+        uinput_mkb.key_down(key)
+    else:
+        _key_down(key)
+
+
+def keyUp(key: str):
+    if uinput_mkb is not None:
+        uinput_mkb.key_up(key)
+    else:
+        _key_up(key)
+
+
+def mouseDown(button: str = "left"):
+    if uinput_mkb is not None:
+        uinput_mkb.mouse_down(button=button)
+    else:
+        _mouse_down(button=button)
+
+
+def mouseUp(button: str = "left"):
+    if uinput_mkb is not None:
+        uinput_mkb.mouse_up(button=button)
+    else:
+        _mouse_up(button=button)
+
+
+def move_mouse(
+    x: float,
+    y: float,
+    extra_x: float = 0.0,
+    extra_y: float = 0.0,
+):
+    if uinput_mkb is None:
+        return _os_move_mouse(x, y, extra_x, extra_y)
+    vel_x = x + extra_x
+    vel_y = y + extra_y
+    uinput_mkb.move_relative(int(vel_x), int(vel_y))
+    leftover_x = vel_x % sign(vel_x)
+    leftover_y = vel_y % sign(vel_y)
+    return leftover_x, leftover_y
+
+
+def flush_mkb():
+    # everything queued this frame goes out behind one SYN_REPORT
+    if uinput_mkb is not None:
+        uinput_mkb.flush()
@@ -1,9 +1,12 @@
+import collections
 import colorsys
 import ctypes
 import dataclasses
 import enum
+import functools
 import importlib.metadata
 import logging
+import multiprocessing
 import os.path
 import re
 import sys
@@ -15,29 +18,57 @@ from pathlib import Path
 
 import sdl3
 import vgamepad as vg
-from pydantic import ValidationError
-from ruamel.yaml.scanner import ScannerError
 
 import pyrogyro.io_types
+from pyrogyro.autoload import AutoloadIndex
+from pyrogyro.capture import CaptureWriter
+from pyrogyro.config_loader import ConfigCache, ConfigLoadMode
+from pyrogyro.config_watcher import create_config_watcher
 from pyrogyro.constants import (
     DEBUG,
+    DEFAULT_CONFIG_LOAD_MODE,
+    DEFAULT_MKB_BACKEND,
+    DEFAULT_OUTPUT_DISPATCH_MODE,
+    DEFAULT_OUTPUT_QUEUE_POLICY,
+    DEFAULT_PAD_EXECUTION_MODE,
     DEFAULT_POLL_RATE,
+    DEFAULT_SCHEDULER_MODE,
+    DEFAULT_SENSOR_PIPELINE_MODE,
+    DEFAULT_VPAD_BACKEND,
     LOG_FORMAT,
     LOG_FORMAT_DEBUG,
     LOG_LEVEL,
+    RELOAD_HISTORY_SIZE,
     SHOW_STARTUP_VERSION_MODULES,
+    TRAY_UPDATE_RATE,
     VID_PID_IGNORE_LIST,
     icon_location,
 )
+from pyrogyro.housekeeping import Housekeeper
 from pyrogyro.mapping import Mapping
 from pyrogyro.math import *
+from pyrogyro.output_dispatch import (
+    OutputDispatcher,
+    OutputDispatchMode,
+    OutputQueuePolicy,
+)
+from pyrogyro.pad_state import MappingDiff
+from pyrogyro.pad_worker import PadExecutionMode, PadWorker
 from pyrogyro.platform import (
+    SYSTEM,
+    close_mkb_backend,
     init_window_listener,
+    open_mkb_backend,
     set_console_title,
     set_console_visibility,
 )
 from pyrogyro.pyrogyro_pad import PyroGyroPad
+from pyrogyro.scheduler import PollScheduler, SchedulerMode
+from pyrogyro.sdl_events import EVENT_TYPE, EVENT_WHICH, EventBatch
+from pyrogyro.sensor_pipeline import SensorPipelineMode
 from pyrogyro.system_tray import SystemTray
+from pyrogyro.uinput import MkbBackend
+from pyrogyro.virtual_pad import VpadBackend
 from pyrogyro.web import WebServer
 
 EVENT_TYPES_FILTER = set()
@@ -79,87 +110,229 @@ def event_filter(userdata, event):
 
 
 class PyroGyroMapper:
-    def __init__(self, poll_rate=DEFAULT_POLL_RATE):
+    def __init__(
+        self,
+        poll_rate=DEFAULT_POLL_RATE,
+        scheduler_mode=SchedulerMode(DEFAULT_SCHEDULER_MODE),
+        pad_execution_mode=PadExecutionMode(DEFAULT_PAD_EXECUTION_MODE),
+        pad_factory=PyroGyroPad,
+        config_load_mode=ConfigLoadMode(DEFAULT_CONFIG_LOAD_MODE),
+        vpad_backend=VpadBackend(DEFAULT_VPAD_BACKEND),
+        mkb_backend=MkbBackend(DEFAULT_MKB_BACKEND),
+        output_dispatch_mode=OutputDispatchMode(DEFAULT_OUTPUT_DISPATCH_MODE),
+        output_queue_policy=OutputQueuePolicy(DEFAULT_OUTPUT_QUEUE_POLICY),
+        sensor_pipeline_mode=SensorPipelineMode(DEFAULT_SENSOR_PIPELINE_MODE),
+    ):
         self.logger = logging.getLogger("PyroGyroMapper")
         self.visible = True
         self.running = True
-        self.poll_rate = poll_rate
+        self.scheduler = PollScheduler(poll_rate, mode=scheduler_mode)
+        self.event_batch = EventBatch()
         self.systray = None
+        # SDL's tray is main thread only; the poll loop pumps it at this rate
+        self.tray_interval = 1.0 / TRAY_UPDATE_RATE
+        self.next_tray_update = 0.0
         self.window_listener = None
         self.do_platform_setup()
         self.calibrating = False
         self.web_server = WebServer()
         self.config_lock = threading.Lock()
-
+        self.housekeeper = Housekeeper()
+        self.device_refresh_pending = False
+        self.device_refresh_queued = False
+        self.capture = None
+
+        self.pad_execution_mode = pad_execution_mode.resolve()
+        self.logger.info(f"Pad execution mode: {self.pad_execution_mode.value}")
+        self.vpad_backend = vpad_backend.resolve(SYSTEM)
+        self.logger.info(f"Virtual pad backend: {self.vpad_backend.value}")
+        self.mkb_backend = open_mkb_backend(mkb_backend)
+        self.logger.info(f"Keyboard/mouse backend: {self.mkb_backend.value}")
+        self.output_dispatcher = None
+        if output_dispatch_mode == OutputDispatchMode.THREADED:
+            self.output_dispatcher = OutputDispatcher(
+                policy=output_queue_policy
+            ).start()
+        self.logger.info(f"Output dispatch mode: {output_dispatch_mode.value}")
+        self.sensor_pipeline_mode = sensor_pipeline_mode
+        self.logger.info(f"Sensor pipeline mode: {sensor_pipeline_mode.value}")
+        self.pad_factory = pad_factory
         self.pyropads = {}
+        self.pad_workers = {}
+        # SDL instance ID -> pad (or its worker, in threaded mode), so gamepad
+        # events can be routed without a GUID lookup
+        self.pad_routes = {}
         self.autoload_configs = {}
+        self.autoload_index = AutoloadIndex(())
+        self.config_cache = ConfigCache()
+        self.config_load_mode = config_load_mode
+        self.config_watcher = None
+        self.current_focus = None
         self.sdl_joysticks = {}
+        self.reload_timings = collections.deque(maxlen=RELOAD_HISTORY_SIZE)
+        self.web_server.add_stats_provider("latency", self.latency_summary)
+        self.web_server.add_stats_provider("reloads", self.reload_summary)
+        self.web_server.add_stats_provider("vpad", self.vpad_report_summary)
+        self.web_server.add_stats_provider("rumble", self.rumble_summary)
+        self.web_server.add_stats_provider("sensors", self.sensor_summary)
+        self.web_server.add_stats_provider("output", self.output_summary)
+
+    @property
+    def poll_rate(self):
+        return self.scheduler.poll_rate
+
+    @poll_rate.setter
+    def poll_rate(self, poll_rate):
+        self.scheduler.poll_rate = poll_rate
+
+    def load_autoload_configs(self, config_paths):
+        for config_path, mapping, errors in self.config_cache.load_many(
+            config_paths, mode=self.config_load_mode
+        ):
+            for level, message in errors:
+                self.logger.log(level, message)
+            if mapping is None:
+                continue
+            if mapping.autoload != None:
+                self.logger.debug(f"Pushed autoload mapping for file {config_path}")
+                self.autoload_configs[config_path] = (
+                    mapping,
+                    os.path.getmtime(config_path),
+                )
+            else:
+                self.autoload_configs.pop(config_path, None)
 
     def refresh_autoload_mappings(self):
         config_path_list = set(Path("configs").rglob("*.yml"))
-        for config_path in config_path_list:
-            mod_time = os.path.getmtime(config_path)
-            if (
-                config_path not in self.autoload_configs
-                or self.autoload_configs[config_path][1] != mod_time
-            ):
-                with open(config_path) as config_handle:
-                    try:
-                        mapping: Mapping = Mapping.load_from_file(
-                            file_handle=config_path
-                        )
-                        if mapping.autoload != None:
-                            self.logger.debug(
-                                f"Pushed autoload mapping for file {config_path}"
-                            )
-                            self.autoload_configs[config_path] = (
-                                mapping,
-                                os.path.getmtime(config_path),
-                            )
-                    except ValidationError as validation_error:
-                        self.logger.info(
-                            f"Error loading config {config_path}; skipping"
-                        )
-                        self.logger.debug(f"== VALIDATION ERRORS ==")
-                        err_count = 1
-                        for error in validation_error.errors():
-                            self.logger.debug(
-                                f"{err_count}: {error.get('type')} AT {error.get('loc')}: {error.get('msg')}"
-                            )
-                            err_count += 1
-                    except ScannerError as scanner_error:
-                        self.logger.info(
-                            f"Error parsing config {config_path}; skipping"
-                        )
-                        self.logger.debug(f"{scanner_error}")
-                    except Exception as other_error:
-                        self.logger.info(
-                            f"Unknown error loading config {config_path}; skipping"
-                        )
-                        self.logger.debug(f"{type(other_error)}: {other_error}")
-        to_remove = []
-        for config_path in self.autoload_configs:
-            if config_path not in config_path_list:
-                to_remove.append(config_path)
-                self.logger.debug(f"Removed autoload mapping for file {config_path}")
-        for config_path in to_remove:
-            self.autoload_configs.pop(config_path)
-
-    def autoload_refresh_and_evaluate(self, exe_name, window_title):
         with self.config_lock:
-            self.refresh_autoload_mappings()
-            configs_to_check = [
-                mapping_tuple[0] for mapping_tuple in self.autoload_configs.values()
-            ]
-            self.logger.debug(f"checking {len(configs_to_check)} config(s)")
-            for pyropad in self.pyropads.values():
-                pyropad.evaluate_autoload_mappings(
-                    configs_to_check, exe_name, window_title
+            self.load_autoload_configs(
+                config_path
+                for config_path in config_path_list
+                if config_path not in self.autoload_configs
+                or self.autoload_configs[config_path][1]
+                != os.path.getmtime(config_path)
+            )
+            to_remove = []
+            for config_path in self.autoload_configs:
+                if config_path not in config_path_list:
+                    to_remove.append(config_path)
+                    self.logger.debug(
+                        f"Removed autoload mapping for file {config_path}"
+                    )
+            for config_path in to_remove:
+                self.autoload_configs.pop(config_path)
+            self.rebuild_autoload_index()
+        self.config_cache.save()
+
+    def apply_config_changes(self, changed, removed):
+        # runs on the housekeeping thread, fed by the config watcher
+        with self.config_lock:
+            for config_path in removed:
+                if self.autoload_configs.pop(config_path, None):
+                    self.logger.debug(
+                        f"Removed autoload mapping for file {config_path}"
+                    )
+            previous_mappings = {
+                config_path: self.autoload_configs[config_path][0]
+                for config_path in changed
+                if config_path in self.autoload_configs
+            }
+            self.load_autoload_configs(changed)
+            self.rebuild_autoload_index()
+            reloads = {}
+            for config_path, old_mapping in previous_mappings.items():
+                new_entry = self.autoload_configs.get(config_path)
+                if new_entry and new_entry[0] is not old_mapping:
+                    reloads[id(old_mapping)] = (config_path, new_entry[0])
+        self.config_cache.save()
+        if reloads:
+            self.hot_reload(reloads)
+        exe_name, window_title = self.current_focus or self.get_current_focus()
+        self.autoload_evaluate(exe_name, window_title)
+
+    def hot_reload(self, reloads):
+        """
+        Moves every pad running (or about to run) a reloaded mapping onto its
+        new version, keeping the runtime state of whatever didn't change.
+        reloads maps id(old mapping) -> (config path, new mapping).
+        """
+        diffs = {}
+        for pyropad in list(self.pyropads.values()):
+            pending_reload = pyropad.pending_reload
+            current_mapping = (
+                pending_reload[0].new_mapping if pending_reload else pyropad.mapping
+            )
+            reload = reloads.get(id(current_mapping))
+            if not reload:
+                continue
+            config_path, new_mapping = reload
+            diff_key = (id(pyropad.mapping), id(new_mapping))
+            diff = diffs.get(diff_key)
+            if not diff:
+                diff = diffs[diff_key] = MappingDiff(pyropad.mapping, new_mapping)
+                # compile ahead, so the swap itself is cheap
+                new_mapping.dispatch_plan
+            try:
+                saved_ns = os.stat(config_path).st_mtime_ns
+            except OSError:
+                saved_ns = time.time_ns()
+            pyropad.reload_mapping(
+                diff,
+                on_applied=functools.partial(self.record_reload, config_path, saved_ns),
+            )
+
+    def record_reload(self, config_path, saved_ns, pyropad):
+        # runs on the thread that processes the pad, right after the swap
+        applied_ms = (time.time_ns() - saved_ns) / 1000000
+        self.reload_timings.append(
+            {
+                "config": str(config_path),
+                "pad": pyropad.sdl_joystick_id,
+                "save_to_applied_ms": applied_ms,
+            }
+        )
+        self.logger.info(f"Applied {config_path} {applied_ms:.1f} ms after save")
+
+    def reload_summary(self):
+        return list(self.reload_timings)
+
+    def rebuild_autoload_index(self):
+        self.autoload_index = AutoloadIndex(
+            mapping_tuple[0] for mapping_tuple in self.autoload_configs.values()
+        )
+
+    def on_config_change(self, changed, removed):
+        self.housekeeper.submit(
+            functools.partial(self.apply_config_changes, changed, removed)
+        )
+
+    def autoload_evaluate(self, exe_name, window_title, pyropads=None):
+        # runs on the housekeeping thread; chosen mappings are applied at the
+        # start of each pad's next frame. The autoload set is kept current by
+        # the config watcher.
+        if pyropads is None:
+            pyropads = list(self.pyropads.values())
+        with self.config_lock:
+            autoload_index = self.autoload_index
+            self.logger.debug(f"checking {len(autoload_index)} config(s)")
+            for pyropad in pyropads:
+                new_mapping = autoload_index.choose(
+                    pyropad.real_controller_name, exe_name, window_title
                 )
+                if new_mapping:
+                    pyropad.apply_mapping(new_mapping)
+
+    def get_current_focus(self):
+        if self.window_listener:
+            return self.window_listener.get_current_focus()
+        return "pyrogyro.exe", "PyroGyro Console"
 
     def on_focus_change(self, exe_name, window_title):
         self.logger.debug(f"window changed to: {window_title} ({exe_name})")
-        self.autoload_refresh_and_evaluate(exe_name, window_title)
+        self.current_focus = (exe_name, window_title)
+        self.housekeeper.submit(
+            functools.partial(self.autoload_evaluate, exe_name, window_title)
+        )
 
     def do_platform_setup(self):
         set_console_title("PyroGyro Console")
@@ -176,6 +349,7 @@ class PyroGyroMapper:
             self.systray.add_menu_option(
                 "Open Web Console", callback=self.web_server.open_web_ui
             )
+        return self.systray
 
     def init_window_listener(self):
         self.logger.info("Starting Window Listener")
@@ -194,14 +368,144 @@ class PyroGyroMapper:
             pyropad.set_gyro_calibrating(False)
 
     def handle_console_input(self, console_input: str):
-        if console_input:
-            match console_input:
+        if console_input.strip():
+            command, *args = console_input.split()
+            match command:
                 case com if "calibrate".startswith(com.lower()):
                     self.calibrating = not self.calibrating
                     if self.calibrating:
                         self.start_calibration()
                     else:
                         self.end_calibration()
+                case com if "stats".startswith(com.lower()):
+                    self.log_poll_stats()
+                case com if "latency".startswith(com.lower()):
+                    if args and "reset".startswith(args[0].lower()):
+                        self.reset_latency()
+                    else:
+                        self.log_latency()
+                case com if "capture".startswith(com.lower()):
+                    # capture changes are applied by the poll thread between frames
+                    if args:
+                        self.housekeeper.hand_off(
+                            functools.partial(self.start_capture, " ".join(args))
+                        )
+                    else:
+                        self.housekeeper.hand_off(self.stop_capture)
+
+    def start_capture(self, capture_path):
+        self.stop_capture()
+        self.logger.info(f"Capturing input to {capture_path}")
+        self.capture = CaptureWriter(capture_path)
+        for pyropad in self.pyropads.values():
+            self.capture.add_device(
+                pyropad.sdl_joystick_id, pyropad.real_controller_name
+            )
+
+    def stop_capture(self):
+        if self.capture:
+            self.logger.info(
+                f"Captured {self.capture.frame_count} frames to {self.capture.path}"
+            )
+            self.capture.close()
+            self.capture = None
+
+    def log_poll_stats(self):
+        summary = self.scheduler.summary(reset=True)
+        self.logger.info(
+            f"{summary['frames']} frames at {summary['achieved_rate']:.1f}Hz "
+            f"(target {self.poll_rate}Hz, {self.scheduler.mode.value}); "
+            f"{summary['overruns']} overruns, {summary['early_wakes']} early wakes; "
+            f"jitter mean {summary['jitter_mean_us']:.1f}us max {summary['jitter_max_us']:.1f}us; "
+            f"busy mean {summary['busy_mean_us']:.1f}us max {summary['busy_max_us']:.1f}us"
+        )
+        for pad_id, report_summary in self.vpad_report_summary().items():
+            self.logger.info(
+                f"pad {pad_id}: {report_summary['submitted']} vpad reports sent "
+                f"({report_summary['keepalives']} keepalives), "
+                f"{report_summary['suppressed']} unchanged suppressed "
+                f"({report_summary['suppressed_pct']:.1f}%), "
+                f"{report_summary['values_skipped']} repeated values skipped"
+            )
+        for pad_id, rumble_summary in self.rumble_summary().items():
+            if rumble_summary["requests"]:
+                self.logger.info(
+                    f"pad {pad_id}: {rumble_summary['requests']} rumble requests, "
+                    f"{rumble_summary['written']} written, "
+                    f"{rumble_summary['coalesced']} coalesced, "
+                    f"{rumble_summary['unchanged']} unchanged skipped, "
+                    f"{rumble_summary['refreshed']} refreshed"
+                )
+        for pad_id, sensor_summary in self.sensor_summary().items():
+            if sensor_summary["frames"]:
+                self.logger.info(
+                    f"pad {pad_id}: {sensor_summary['samples']} gyro samples over "
+                    f"{sensor_summary['frames']} frames "
+                    f"({sensor_summary['samples_per_frame']:.2f} per frame), "
+                    f"{sensor_summary['folded']} folded into a full buffer"
+                )
+        if self.output_dispatcher:
+            output_summary = self.output_summary()
+            self.logger.info(
+                f"{output_summary['dispatched']} output frames sent "
+                f"({output_summary['merged']} merged, {output_summary['dropped']} dropped, "
+                f"{output_summary['dropped_outputs']} outputs discarded); "
+                f"queue depth mean {output_summary['depth_mean']:.2f} max {output_summary['depth_max']}; "
+                f"latency mean {output_summary['latency']['mean_us']:.1f}us "
+                f"p99 {output_summary['latency']['p99_us']:.1f}us"
+            )
+            self.output_dispatcher.reset_counters()
+        for pyropad in list(self.pyropads.values()):
+            if pyropad.vpad_report:
+                pyropad.vpad_report.reset_counters()
+            pyropad.rumble.reset_counters()
+            pyropad.sensor_pipeline.reset_counters()
+
+    def latency_summary(self):
+        return {
+            str(pyropad.sdl_joystick_id): pyropad.latency.summary()
+            for pyropad in list(self.pyropads.values())
+            if pyropad.latency
+        }
+
+    def vpad_report_summary(self):
+        return {
+            str(pyropad.sdl_joystick_id): pyropad.vpad_report.summary()
+            for pyropad in list(self.pyropads.values())
+            if pyropad.vpad_report
+        }
+
+    def rumble_summary(self):
+        return {
+            str(pyropad.sdl_joystick_id): pyropad.rumble.summary()
+            for pyropad in list(self.pyropads.values())
+        }
+
+    def sensor_summary(self):
+        return {
+            str(pyropad.sdl_joystick_id): pyropad.sensor_pipeline.summary()
+            for pyropad in list(self.pyropads.values())
+        }
+
+    def output_summary(self):
+        return self.output_dispatcher.summary() if self.output_dispatcher else {}
+
+    def log_latency(self):
+        for pad_id, pad_summary in self.latency_summary().items():
+            self.logger.info(f"== Input to output latency, pad {pad_id} ==")
+            for source_type, summary in pad_summary.items():
+                self.logger.info(
+                    f"{source_type}: {summary['count']} outputs; "
+                    f"mean {summary['mean_us']:.0f}us p50 {summary['p50_us']:.0f}us "
+                    f"p90 {summary['p90_us']:.0f}us p99 {summary['p99_us']:.0f}us "
+                    f"max {summary['max_us']:.0f}us"
+                )
+
+    def reset_latency(self):
+        self.logger.info("Resetting latency histograms")
+        for pyropad in list(self.pyropads.values()):
+            if pyropad.latency:
+                pyropad.latency.reset()
 
     def console_input_loop(self):
         try:
@@ -233,8 +537,9 @@ class PyroGyroMapper:
         self.logger.info("== Gamepads currently connected: ==")
         ignore_list = set(
             (
-                (pypad.vpad.get_vid(), pypad.vpad.get_pid())
+                pypad.vpad.vid_pid()
                 for pypad in self.pyropads.values()
+                if pypad.vpad and pypad.vpad.vid_pid()
             )
         ).union(set(VID_PID_IGNORE_LIST))
         joystick_ids = sdl3.SDL_GetGamepads(None)
@@ -267,65 +572,112 @@ class PyroGyroMapper:
         self.sdl_joysticks = joysticks
 
     def create_device_map(self):
-        for joy_uuid in self.sdl_joysticks:
-            if joy_uuid not in self.pyropads:
-                joystick_id = self.sdl_joysticks[joy_uuid]
-                self.logger.info(f"Registering pad for new device {joy_uuid}")
-                self.pyropads[joy_uuid] = PyroGyroPad(
-                    self.sdl_joysticks[joy_uuid],
-                    web_server=self.web_server,
-                    parent=self,
-                )
+        """
+        Works out which pads to remove and creates pads for new devices. Runs on
+        the housekeeping thread; apply_device_map swaps the result in.
+        """
         to_remove = []
-        for joy_uuid in self.pyropads:
+        for joy_uuid, pyropad in list(self.pyropads.items()):
             if joy_uuid not in self.sdl_joysticks:
                 self.logger.info(f"Removing pad for removed device {joy_uuid}")
                 to_remove.append(joy_uuid)
+            elif pyropad.sdl_joystick_id != self.sdl_joysticks[joy_uuid]:
+                # device was reconnected between polls and got a new instance ID
+                self.logger.info(
+                    f"Re-registering pad for reconnected device {joy_uuid}"
+                )
+                to_remove.append(joy_uuid)
+        new_pads = {}
+        for joy_uuid, joystick_id in self.sdl_joysticks.items():
+            if joy_uuid not in self.pyropads or joy_uuid in to_remove:
+                self.logger.info(f"Registering pad for new device {joy_uuid}")
+                new_pads[joy_uuid] = self.pad_factory(
+                    joystick_id,
+                    web_server=self.web_server,
+                    parent=self,
+                    vpad_backend=self.vpad_backend,
+                    sensor_pipeline_mode=self.sensor_pipeline_mode,
+                )
+        return new_pads, to_remove
+
+    def apply_device_map(self, new_pads, to_remove):
         for joy_uuid in to_remove:
             pyropad = self.pyropads.pop(joy_uuid)
+            pad_worker = self.pad_workers.pop(joy_uuid, None)
+            if pad_worker:
+                pad_worker.stop()
             pyropad.cleanup()
+        for joy_uuid, pyropad in new_pads.items():
+            self.pyropads[joy_uuid] = pyropad
+            if self.capture:
+                self.capture.add_device(
+                    pyropad.sdl_joystick_id, pyropad.real_controller_name
+                )
+            if self.pad_execution_mode == PadExecutionMode.THREADED:
+                self.pad_workers[joy_uuid] = PadWorker(pyropad).start()
+        self.pad_routes = {
+            pyropad.sdl_joystick_id: self.pad_workers.get(joy_uuid, pyropad)
+            for joy_uuid, pyropad in self.pyropads.items()
+        }
+        self.device_refresh_pending = False
+        if self.device_refresh_queued:
+            self.device_refresh_queued = False
+            self.request_device_refresh()
+
+    def refresh_devices(self):
+        self.populate_joystick_list()
+        new_pads, to_remove = self.create_device_map()
+        self.housekeeper.hand_off(
+            functools.partial(self.apply_device_map, new_pads, to_remove)
+        )
+        if new_pads:
+            exe_name, window_title = self.get_current_focus()
+            self.autoload_evaluate(exe_name, window_title, pyropads=new_pads.values())
+
+    def request_device_refresh(self):
+        # only one refresh is in flight at a time, so pads are never created twice
+        if self.device_refresh_pending:
+            self.device_refresh_queued = True
+        else:
+            self.device_refresh_pending = True
+            self.housekeeper.submit(self.refresh_devices)
 
     def input_poll(self):
         while self.running:
-            start_time = time.time_ns()
-            ns_per_poll = int(1000000000 / self.poll_rate)
+            self.scheduler.begin_frame()
+            self.housekeeper.apply_handoffs()
+            capture = self.capture
+            captured_events = []
             populate_pads = False
-            event = sdl3.SDL_Event()
-            for pypad in self.pyropads.values():
+            for pypad in self.pad_routes.values():
                 pypad.on_poll_start()
-            while sdl3.SDL_PollEvent(event):
-                match event.type:
+            for event in self.event_batch.drain():
+                match event[EVENT_TYPE]:
                     case evt_type if evt_type in EVENT_TYPES_PASS_TO_PAD:
-                        gamepad_event = event.gdevice
-                        joystick_uuid_bytes = sdl3.SDL_GetGamepadGUIDForID(
-                            gamepad_event.which
-                        ).data[0:16]
-                        joystick_uuid = uuid.UUID(bytes=bytes(joystick_uuid_bytes))
-                        pypad = self.pyropads.get(joystick_uuid)
+                        pypad = self.pad_routes.get(event[EVENT_WHICH])
                         if pypad:
                             pypad.handle_event(event)
+                            if capture:
+                                captured_events.append(event)
                     case sdl3.SDL_EVENT_GAMEPAD_ADDED | sdl3.SDL_EVENT_GAMEPAD_REMOVED:
                         populate_pads = True
                     case evt_type if evt_type in EVENT_TYPES_IGNORE:
                         pass
                     case _:
                         self.logger.debug(
-                            f"fallthrough, ignoring gamepad event of type {hex(event.type)}"
+                            f"fallthrough, ignoring gamepad event of type {hex(event[EVENT_TYPE])}"
                         )
             if populate_pads:
-                self.populate_joystick_list()
-                self.create_device_map()
-                if self.window_listener:
-                    exe_name, window_title = self.window_listener.get_current_focus()
-                else:
-                    exe_name, window_title = "pyrogyro.exe", "PyroGyro Console"
-                self.autoload_refresh_and_evaluate(exe_name, window_title)
-            if self.systray:
+                self.request_device_refresh()
+            time_now = time.time()
+            for pypad in self.pad_routes.values():
+                pypad.update(time_now)
+            if capture:
+                capture.write_frame(time_now, captured_events)
+            if self.systray and time_now >= self.next_tray_update:
+                self.next_tray_update = time_now + self.tray_interval
                 self.systray.update()
-            for pypad in self.pyropads.values():
-                pypad.update(time.time())
-            poll_ns = time.time_ns() - start_time
-            sdl3.SDL_DelayNS(ns_per_poll - poll_ns)
+            self.scheduler.end_frame()
 
     def run(self):
         self.logger.info("PyroGyro Starting")
@@ -334,14 +686,18 @@ class PyroGyroMapper:
                 f"{module_name} version {importlib.metadata.version(module_name)}"
             )
         self.init_systray()
+        self.housekeeper.start()
         self.init_window_listener()
         self.start_console_input_thread()
         self.web_server.run_in_thread()
         sdl3.SDL_SetEventFilter(event_filter, None)
 
+        self.config_watcher = create_config_watcher(
+            "configs", on_change=self.on_config_change
+        ).start()
+        self.housekeeper.submit(self.refresh_autoload_mappings)
         if self.window_listener:
             self.window_listener.process_current_window()
-        self.refresh_autoload_mappings()
 
         try:
             self.input_poll()
@@ -351,6 +707,15 @@ class PyroGyroMapper:
             self.logger.exception("Unhandled Error; Exiting")
         finally:
             self.running = False
+            for pad_worker in self.pad_workers.values():
+                pad_worker.stop()
+            if self.config_watcher:
+                self.config_watcher.stop()
+            self.housekeeper.stop()
+            if self.output_dispatcher:
+                self.output_dispatcher.stop()
+            close_mkb_backend()
+            self.stop_capture()
             if self.systray:
                 self.systray.shutdown()
             if self.window_listener:
@@ -358,6 +723,13 @@ class PyroGyroMapper:
 
 
 def appmain(*args, **kwargs):
+    if sys.argv[1:2] == ["bench"]:
+        from pyrogyro.headless_bench import headless_bench_main
+
+        headless_bench_main(sys.argv[2:])
+        return
+    # config loading spawns worker processes, which must not rerun the app
+    multiprocessing.freeze_support()
     logging.basicConfig(
         level=LOG_LEVEL, format=LOG_FORMAT_DEBUG if DEBUG else LOG_FORMAT
     )
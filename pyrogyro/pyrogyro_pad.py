@@ -1,16 +1,20 @@
-import colorsys
-import enum
 import logging
-import re
+import threading
+import time
 import typing
 import uuid
 from dataclasses import dataclass, field
 
 import sdl3
-import vgamepad as vg
 
 import pyrogyro
-from pyrogyro.constants import DEFAULT_POLL_RATE
+from pyrogyro.constants import (
+    DEFAULT_DISPATCH_MODE,
+    DEFAULT_POLL_RATE,
+    DEFAULT_SENSOR_PIPELINE_MODE,
+    DEFAULT_VPAD_BACKEND,
+)
+from pyrogyro.dispatch import DispatchMode
 from pyrogyro.gamepad_motion import (
     GyroCalibration,
     gyro_camera_local,
@@ -21,43 +25,46 @@ from pyrogyro.gamepad_motion import (
     sensor_fusion_gravity,
 )
 from pyrogyro.io_types import *
+from pyrogyro.latency import LatencyTracker
+from pyrogyro.led import ROYGBIV, ColorSpace, LedTable, LerpableLED, PadLed
 from pyrogyro.mapping import AutoloadConfig, Mapping
 from pyrogyro.math import *
+from pyrogyro.output_dispatch import MKB_FLUSH_KEY, OutputFrame
+from pyrogyro.pad_state import MappingDiff, PadState
+from pyrogyro.platform import SYSTEM, flush_mkb
+from pyrogyro.rumble import RumbleSlot
+from pyrogyro.sensor_pipeline import SensorPipeline, SensorPipelineMode
+from pyrogyro.virtual_pad import VpadBackend, create_virtual_pad
+from pyrogyro.vpad_report import VirtualPadReport
 from pyrogyro.web import WebServer
 
-ROYGBIV = (
-    Vec3(x=0, y=1, z=1),
-    Vec3(x=1, y=1, z=1),
-)
-
-
-class ColorSpace(enum.Enum):
-    RGB = "RGB"
-    HSV = "HSV"
-
-    def to_rgb(self, in_color: Vec3):
-        match self.value:
-            case self.HSV.value:
-                rgb = colorsys.hsv_to_rgb(in_color.x, in_color.y, in_color.z)
-                return Vec3(x=rgb[0], y=rgb[1], z=rgb[2])
-            case self.RGB.value:
-                return in_color
-        return in_color
-
 
 @dataclass
 class InputStore:
     _inputs: typing.Mapping[BinarySource, typing.Union[Vec2, float, bool]] = field(
         default_factory=dict
     )
-    _changed: typing.Set[MapDirectSource] = field(default_factory=set)
-    _preserved: typing.Set[MapDirectSource] = field(default_factory=set)
+    # dicts used as insertion-ordered sets, so outputs go out in a stable order
+    _changed: typing.Dict[MapDirectSource, None] = field(default_factory=dict)
+    _preserved: typing.Dict[MapDirectSource, None] = field(default_factory=dict)
+    # SDL timestamp of the oldest event behind each input changed this frame
+    _timestamps: typing.Dict[MapDirectSource, int] = field(default_factory=dict)
 
     def put_input(
-        self, source: MapDirectSource, value: typing.Union[Vec2, float, bool]
+        self,
+        source: MapDirectSource,
+        value: typing.Union[Vec2, float, bool],
+        timestamp: typing.Optional[int] = None,
     ):
         self._inputs[source] = value
-        self._changed.add(source)
+        self._changed[source] = None
+        if timestamp is not None:
+            oldest = self._timestamps.get(source)
+            if oldest is None or timestamp < oldest:
+                self._timestamps[source] = timestamp
+
+    def get_timestamp(self, source: MapDirectSource):
+        return self._timestamps.get(source)
 
     def get_inputs(self):
         out = {}
@@ -69,106 +76,66 @@ class InputStore:
     def set_preserved(self, source: MapDirectSource, preserved: bool):
         if preserved:
             if source not in self._preserved:
-                self._preserved.add(source)
+                self._preserved[source] = None
         else:
             if source in self._preserved:
-                self._preserved.remove(source)
+                self._preserved.pop(source)
 
     def clear(self):
         self._changed.clear()
-        self._changed |= self._preserved
-
-
-@dataclass
-class LerpableLED:
-    current_color: Vec3 = field(default_factory=Vec3)
-    color_sequence: typing.Sequence[Vec3] = field(default_factory=list)
-    index_start: int = 0
-    index_end: int = 0
-    start_ts: typing.Optional[int] = None
-    duration_per_color: float = 1
-    color_space: ColorSpace = ColorSpace.RGB
-    instant_loop: bool = False
-
-    def set_sequence(
-        self,
-        color_sequence: typing.Sequence[Vec3],
-        color_space=ColorSpace.RGB,
-        duration_per_color=1,
-        instant_loop=False,
-    ):
-        self.instant_loop = instant_loop
-        self.color_sequence = color_sequence
-        self.color_space = color_space
-        self.index_start = 0
-        self.duration_per_color = duration_per_color
-        if len(self.color_sequence) > 1:
-            self.index_end = 1
-        else:
-            self.index_end = 0
-        return self
-
-    def update(self, timestamp):
-        if self.start_ts == None:
-            self.start_ts = timestamp
-        time_delta = timestamp - self.start_ts
-        if self.duration_per_color == 0:
-            delta = 0
-        else:
-            delta = time_delta / self.duration_per_color
-        start, end = (
-            self.color_sequence[self.index_start],
-            self.color_sequence[self.index_end],
-        )
-        self.current_color.set_lerp(start, end, delta)
-        if delta >= 1.0:
-            self.index_start = self.index_start + 1
-            self.index_end = self.index_end + 1
-            len_seq = len(self.color_sequence)
-            if self.index_start == len_seq - 1 and self.instant_loop:
-                self.index_start = 0
-                self.index_end = 1 if len_seq > 1 else 0
-            else:
-                self.index_start = self.index_start % len_seq
-                self.index_end = self.index_end % len_seq
-            self.start_ts = timestamp
-
-    def get_rgb_color(self):
-        return self.color_space.to_rgb(self.current_color)
+        self._changed.update(self._preserved)
+        self._timestamps.clear()
 
 
 class PyroGyroPad:
+    track_latency = True
+
     def __init__(
         self,
         sdl_joystick,
         mapping: Mapping | None = None,
         web_server: WebServer | None = None,
         parent: typing.Union["PyroGyroMapper", None] = None,
+        dispatch_mode: DispatchMode = DispatchMode(DEFAULT_DISPATCH_MODE),
+        vpad_backend: VpadBackend = VpadBackend(DEFAULT_VPAD_BACKEND),
+        sensor_pipeline_mode: SensorPipelineMode = SensorPipelineMode(
+            DEFAULT_SENSOR_PIPELINE_MODE
+        ),
     ):
         self.parent = parent
+        self.dispatch_mode = dispatch_mode
+        self.sensor_pipeline_mode = sensor_pipeline_mode
+        self.vpad_backend = vpad_backend.resolve(SYSTEM)
         self.logger = logging.getLogger("PyroGyroPad")
         if not mapping:
             mapping = Mapping()
         self.mapping = mapping
+        self.state = PadState(mapping)
+        # (MappingDiff, on_applied) for a reload waiting for the next frame
+        self.pending_reload = None
+        # mapping switch and calibration toggle waiting for the next frame
+        self.pending_mapping = None
+        self.pending_calibrating = None
+        # held to set a pending change, and to take one and clear it
+        self.pending_lock = threading.Lock()
         self.web_server = web_server
-        self.vpad = vg.VX360Gamepad()
-        self.sdl_pad = sdl3.SDL_OpenGamepad(sdl_joystick)
-        self.vpad.register_notification(callback_function=self.virtual_pad_callback)
-        self.led = LerpableLED().set_sequence(
-            ROYGBIV,
-            color_space=ColorSpace.HSV,
-            duration_per_color=10,
-            instant_loop=True,
+        self.sdl_joystick_id = sdl_joystick
+        self.led = PadLed(
+            LedTable(
+                LerpableLED().set_sequence(
+                    ROYGBIV,
+                    color_space=ColorSpace.HSV,
+                    duration_per_color=10,
+                    instant_loop=True,
+                )
+            )
         )
         self.gyro_calibrating = False
         self.gyro_calibration = GyroCalibration()
         self.last_timestamp = None
-        if sdl3.SDL_GamepadHasSensor(self.sdl_pad, sdl3.SDL_SENSOR_GYRO):
-            self.logger.info("Gyro Sensor Detected")
-            sdl3.SDL_SetGamepadSensorEnabled(self.sdl_pad, sdl3.SDL_SENSOR_GYRO, True)
-        if sdl3.SDL_GamepadHasSensor(self.sdl_pad, sdl3.SDL_SENSOR_ACCEL):
-            self.logger.info("Accel Sensor Detected")
-            sdl3.SDL_SetGamepadSensorEnabled(self.sdl_pad, sdl3.SDL_SENSOR_ACCEL, True)
+        # written by the virtual pad's callback, applied from flush_outputs
+        self.rumble = RumbleSlot()
+        self.open_devices(sdl_joystick)
 
         self.input_store = InputStore()
         self.mkb_state = {}
@@ -182,56 +149,111 @@ class PyroGyroPad:
         self.gravity = Vec3()
         self.gyro_vec = Vec3()
         self.accel_vec = Vec3()
-        self.leftover_vel = Vec2()
+        # scratch for the gyro path, reused every frame rather than allocated
+        self.gyro_sample = Vec3()
+        self.accel_sample = Vec3()
+        self.fusion_rotation = Quat(1.0, 0.0, 0.0, 0.0)
+        self.grav_norm = Vec3()
+        self.gyro_pixel_vel = Vec2()
+        # this frame's gyro samples, in PER_SAMPLE sensor pipeline mode
+        self.sensor_pipeline = SensorPipeline()
+        # relative mouse motion from every source this frame, moved once
+        self.mouse_motion = Vec2()
+        self.mouse_moved = False
+        # with THREADED output dispatch, this frame's output calls are queued
+        # here and handed to the dispatcher by flush_outputs
+        self.output_dispatcher = parent.output_dispatcher if parent else None
+        self.output_frame = OutputFrame() if self.output_dispatcher else None
         self.paired_axis_event_sink = {}
 
         self.touchpad_state = {}
         self.touchpad_update = False
 
+        self.latency = LatencyTracker() if self.track_latency else None
+        self.latency_pending = []
+        self.gyro_input_ts = None
+        self.touchpad_input_ts = None
+
+    def open_devices(self, sdl_joystick):
+        self.open_vpad()
+        self.open_sdl_pad(sdl_joystick)
+        self.vpad.set_rumble_callback(self.virtual_pad_callback)
+
+    def open_vpad(self):
+        self.vpad = create_virtual_pad(self.vpad_backend)
+        self.vpad_report = VirtualPadReport(self.vpad)
+
+    def open_sdl_pad(self, sdl_joystick):
+        self.sdl_pad = sdl3.SDL_OpenGamepad(sdl_joystick)
+        if sdl3.SDL_GamepadHasSensor(self.sdl_pad, sdl3.SDL_SENSOR_GYRO):
+            self.logger.info("Gyro Sensor Detected")
+            sdl3.SDL_SetGamepadSensorEnabled(self.sdl_pad, sdl3.SDL_SENSOR_GYRO, True)
+        if sdl3.SDL_GamepadHasSensor(self.sdl_pad, sdl3.SDL_SENSOR_ACCEL):
+            self.logger.info("Accel Sensor Detected")
+            sdl3.SDL_SetGamepadSensorEnabled(self.sdl_pad, sdl3.SDL_SENSOR_ACCEL, True)
+
     @property
     def poll_rate(self):
         return self.parent.poll_rate if self.parent else DEFAULT_POLL_RATE
 
     def cleanup(self):
         if self.vpad:
-            self.vpad.unregister_notification()
-            del self.vpad
+            self.vpad.close()
+            self.vpad = None
 
-    def virtual_pad_callback(
-        self, client, target, large_motor, small_motor, led_number, user_data
-    ):
+    def virtual_pad_callback(self, large_motor: int, small_motor: int):
         """
-        Callback function triggered at each received state change
-
-        :param client: vigem bus ID
-        :param target: vigem device ID
-        :param large_motor: integer in [0, 255] representing the state of the large motor
-        :param small_motor: integer in [0, 255] representing the state of the small motor
-        :param led_number: integer in [0, 255] representing the state of the LED ring
-        :param user_data: placeholder, do not use
+        Called by the virtual pad (on its own thread, for ViGEm) when the game
+        changes rumble; both motors are integers in [0, 255]. Only the latest
+        request is kept, for flush_outputs to apply.
         """
+        self.rumble.request(large_motor, small_motor)
+
+    def write_rumble(self, large_motor: int, small_motor: int):
         low_frequency_rumble = int(large_motor / 255 * 0xFFFF)
         high_frequency_rumble = int(small_motor / 255 * 0xFFFF)
-        # we get updates as rumble changes changes, so just set duration to a second
-        # and have later updates overwrite that
+        # later writes overwrite this one; RumbleSlot rewrites running motors
+        # before the duration runs out
         sdl3.SDL_RumbleGamepad(
-            self.sdl_pad, low_frequency_rumble, high_frequency_rumble, 1000
+            self.sdl_pad,
+            low_frequency_rumble,
+            high_frequency_rumble,
+            self.rumble.duration_ms,
         )
 
     def set_mkb_bool_state(self, target_enum, target_value):
         old_value = self.mkb_state.get(target_enum, False)
         if isinstance(target_enum, MouseButtonTarget) and old_value != target_value:
             if target_value:
-                target_enum.down()
+                self.send_output(target_enum.down)
             else:
-                target_enum.up()
+                self.send_output(target_enum.up)
         elif isinstance(target_enum, KeyboardKeyTarget) and old_value != target_value:
             if target_value:
-                target_enum.down()
+                self.send_output(target_enum.down)
             else:
-                target_enum.up()
+                self.send_output(target_enum.up)
         self.mkb_state[target_enum] = target_value
 
+    def send_output(self, func, *args):
+        """
+        Makes an output call now, or queues it with this frame's outputs.
+        """
+        if self.output_frame is None:
+            func(*args)
+        else:
+            self.output_frame.events.append((func, args))
+
+    def send_latest_output(self, key, func, *args):
+        """
+        Like send_output, for calls where only the latest one per key matters
+        when queued frames are merged.
+        """
+        if self.output_frame is None:
+            func(*args)
+        else:
+            self.output_frame.latest[key] = (func, args)
+
     @property
     def real_controller_name(self):
         return sdl3.SDL_GetGamepadName(self.sdl_pad).decode()
@@ -242,45 +264,61 @@ class PyroGyroPad:
         joystick_uuid = uuid.UUID(bytes=bytes(joystick_uuid_bytes))
         return joystick_uuid
 
-    def evaluate_autoload_mappings(self, mappings, exe_name, window_title):
-        potential_mappings = []
-        controller_name = self.real_controller_name
-        new_mapping = None
-        for mapping in mappings:
-            if all(
-                (
-                    re.fullmatch(
-                        mapping.autoload.match_controller_name, controller_name
-                    ),
-                    re.fullmatch(mapping.autoload.match_window_name, window_title),
-                    re.fullmatch(mapping.autoload.match_exe_name, exe_name),
-                )
-            ):
-                potential_mappings.append(mapping)
-        if potential_mappings:
-            if len(potential_mappings) == 1:
-                new_mapping = potential_mappings[0]
-            else:
-                potential_mappings.sort(key=Mapping.count_autoload_specificity)
-                best_match = potential_mappings[-1]
-                final_value = best_match.autoload.count_specificity()
-                remaining_mappings = len(
-                    [
-                        mapping
-                        for mapping in potential_mappings
-                        if mapping.autoload.count_specificity() == final_value
-                    ]
-                )
-                if remaining_mappings == 1:
-                    new_mapping = best_match
-        if new_mapping and (new_mapping != self.mapping):
+    def apply_mapping(self, new_mapping: Mapping | None):
+        """
+        Switches to new_mapping at the start of this pad's next frame, with a
+        fresh state. Safe to call from any thread.
+        """
+        if new_mapping:
+            with self.pending_lock:
+                self.pending_mapping = new_mapping
+
+    def apply_pending_mapping(self):
+        with self.pending_lock:
+            new_mapping, self.pending_mapping = self.pending_mapping, None
+        if new_mapping and new_mapping != self.mapping:
             self.logger.info(
-                f"Applying mapping '{new_mapping.name}' to PyroGyro pad for controller '{controller_name}'"
+                f"Applying mapping '{new_mapping.name}' to PyroGyro pad for controller '{self.real_controller_name}'"
             )
             self.mapping = new_mapping
-            self.mapping.reset()
+            self.state = PadState(new_mapping)
+
+    def reload_mapping(self, diff: MappingDiff, on_applied=None):
+        """
+        Swaps in diff's reloaded mapping at the start of this pad's next frame,
+        carrying over the runtime state of whatever the reload didn't change.
+        Safe to call from any thread; on_applied(pad) is called once it's in.
+        """
+        with self.pending_lock:
+            self.pending_reload = (diff, on_applied)
+
+    def apply_pending_reload(self):
+        with self.pending_lock:
+            pending_reload, self.pending_reload = self.pending_reload, None
+        if not pending_reload:
+            return
+        diff, on_applied = pending_reload
+        if self.mapping is not diff.old_mapping:
+            # switched to another mapping since the reload was requested
+            return
+        self.logger.info(
+            f"Reloaded mapping '{diff.new_mapping.name}' for controller '{self.real_controller_name}': {diff.describe()}"
+        )
+        self.state = PadState(diff.new_mapping, previous=self.state, diff=diff)
+        self.mapping = diff.new_mapping
+        if on_applied:
+            on_applied(self)
 
     def set_gyro_calibrating(self, calibrating: bool):
+        # applied at the start of the next frame; safe to call from any thread
+        with self.pending_lock:
+            self.pending_calibrating = calibrating
+
+    def apply_pending_calibrating(self):
+        with self.pending_lock:
+            calibrating, self.pending_calibrating = self.pending_calibrating, None
+        if calibrating is None:
+            return
         self.gyro_calibrating = calibrating
         if calibrating:
             self.gyro_calibration.reset()
@@ -291,44 +329,48 @@ class PyroGyroPad:
                 if isinstance(source_value, Vec2):
                     match target:
                         case DoubleAxisTarget.X_LSTICK:
-                            self.vpad.left_joystick_float(
+                            self.vpad_report.set_left_stick(
                                 source_value.x, -source_value.y
                             )
                         case DoubleAxisTarget.X_RSTICK:
-                            self.vpad.right_joystick_float(
+                            self.vpad_report.set_right_stick(
                                 source_value.x, -source_value.y
                             )
             case pyrogyro.io_types.SingleAxisTarget:
                 float_val = to_float(source_value)
                 match target:
                     case SingleAxisTarget.X_L2:
-                        self.vpad.left_trigger_float(float_val)
+                        self.vpad_report.set_left_trigger(float_val)
                     case SingleAxisTarget.X_R2:
-                        self.vpad.right_trigger_float(float_val)
+                        self.vpad_report.set_right_trigger(float_val)
             case pyrogyro.io_types.ButtonTarget:
-                if to_bool(source_value):
-                    self.vpad.press_button(target.value)
-                else:
-                    self.vpad.release_button(target.value)
+                self.vpad_report.set_button(target.value, to_bool(source_value))
             case pyrogyro.io_types.KeyboardKeyTarget:
                 self.set_mkb_bool_state(target, to_bool(source_value))
             case pyrogyro.io_types.MouseButtonTarget:
                 self.set_mkb_bool_state(target, to_bool(source_value))
             case pyrogyro.io_types.MouseTarget:
                 if isinstance(source_value, Vec2):
-                    target.move_mouse(
-                        source_value.x,
-                        source_value.y,
-                    )
+                    self.mouse_motion += source_value
+                    self.mouse_moved = True
             case pyrogyro.io_types.LayerTarget:
-                self.mapping.set_layer_activation(target.layer, bool(source_value))
+                self.state.set_layer_activation(target.layer, bool(source_value))
 
     def on_poll_start(self):
+        if self.pending_reload:
+            self.apply_pending_reload()
+        if self.pending_mapping:
+            # after any reload, so a switch to the reloaded mapping keeps state
+            self.apply_pending_mapping()
+        if self.pending_calibrating is not None:
+            self.apply_pending_calibrating()
         self.gyro_vec.set_value(0, 0, 0)
         self.accel_vec.set_value(0, 0, 0)
         self.delta_time = 0.0
         self.gyro_update = False
         self.touchpad_update = False
+        self.gyro_input_ts = None
+        self.touchpad_input_ts = None
 
     def send_to_web_server(self, event, value):
         remap = {"l3": "lstick", "r3": "rstick"}
@@ -351,86 +393,136 @@ class PyroGyroPad:
                         {"source": source, "type": "vec2", "x": value.x, "y": value.y}
                     )
 
-    def handle_event(self, sdl_event):
-        gyro_raw = Vec3()
-        accel = Vec3()
-        match sdl_event.type:
+    def handle_event(self, event):
+        """
+        :param event: a decoded event tuple, as produced by pyrogyro.sdl_events.EventBatch
+        """
+        match event[0]:
             case sdl3.SDL_EVENT_GAMEPAD_BUTTON_DOWN | sdl3.SDL_EVENT_GAMEPAD_BUTTON_UP:
-                button_event = sdl_event.gbutton
-                timestamp = int(button_event.timestamp)
-                enum_val = SDLButtonSource(int(button_event.button))
+                _, timestamp, _, button, down = event
+                enum_val = SDLButtonSource(button)
                 button_name = enum_val.name
-                self.logger.info(
-                    f"{button_name} {'pressed' if button_event.down else 'released'}"
-                )
-                self.input_store.put_input(enum_val, button_event.down)
+                self.logger.info(f"{button_name} {'pressed' if down else 'released'}")
+                self.input_store.put_input(enum_val, down, timestamp)
             case sdl3.SDL_EVENT_GAMEPAD_AXIS_MOTION:
-                axis_event = sdl_event.gaxis
-                axis_id = axis_event.axis
+                _, timestamp, _, axis_id, axis_value = event
                 enum_val = SingleAxisSource(axis_id)
-                self.input_store.put_input(enum_val, axis_event.value / 32768.0)
+                this_value = axis_value / 32768.0
+                self.input_store.put_input(enum_val, this_value, timestamp)
 
                 double_enum = get_double_source_for_axis(enum_val)
                 if double_enum:
                     other_axis = double_enum.get_other_axis(enum_val)
-                    if other_axis not in self.paired_axis_event_sink:
-                        self.paired_axis_event_sink[enum_val] = (
-                            axis_event.value / 32768.0
-                        )
-                    else:
-                        self.paired_axis_event_sink[enum_val] = (
-                            axis_event.value / 32768.0
-                        )
-                        this_value = axis_event.value / 32768.0
+                    self.paired_axis_event_sink[enum_val] = this_value
+                    if other_axis in self.paired_axis_event_sink:
                         other_value = self.paired_axis_event_sink.get(other_axis)
                         if double_enum.value.index(enum_val) == 0:
                             target_value = Vec2(this_value, other_value)
                         else:
                             target_value = Vec2(other_value, this_value)
-                        self.input_store.put_input(double_enum, target_value)
+                        self.input_store.put_input(double_enum, target_value, timestamp)
             case sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE:
-                sensor_event = sdl_event.gsensor
-                sensor_type = sensor_event.sensor
-                timestamp = sensor_event.sensor_timestamp
-                if sensor_type == sdl3.SDL_SENSOR_GYRO:
-                    self.gyro_update = True
-                    gyro_raw.set_value(*sensor_event.data)
-                    # SDL3 outputs gyro in radians per second
-                    gyro_raw *= RADIANS_TO_DEGREES
-                    if self.last_gyro_time == None:
-                        self.last_gyro_time = timestamp
-                    self.delta_time += (timestamp - self.last_gyro_time) / 1000000000.0
-                    self.last_gyro_time = timestamp
-                if sensor_type == sdl3.SDL_SENSOR_ACCEL:
-                    accel.set_value(*sensor_event.data)
-                if self.gyro_calibrating:
-                    self.gyro_calibration.update(gyro_raw)
-                    self.gyro_update = False
+                _, event_ts, _, sensor_type, data_x, data_y, data_z, timestamp = event
+                if self.gyro_input_ts is None:
+                    self.gyro_input_ts = event_ts
+                if self.sensor_pipeline_mode == SensorPipelineMode.PER_SAMPLE:
+                    self.add_sensor_sample(
+                        sensor_type, data_x, data_y, data_z, timestamp
+                    )
                 else:
-                    self.gyro_vec += gyro_raw
-                    self.accel_vec += accel
+                    self.add_summed_sensor_sample(
+                        sensor_type, data_x, data_y, data_z, timestamp
+                    )
             case evt_type if evt_type in (
                 sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_DOWN,
                 sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_MOTION,
                 sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_UP,
             ):
                 self.touchpad_update = True
-                touch_event = sdl_event.gtouchpad
-                pad_id = touch_event.touchpad
-                finger_id = touch_event.finger
+                _, timestamp, _, pad_id, finger_id, x, y, pressure = event
+                if self.touchpad_input_ts is None:
+                    self.touchpad_input_ts = timestamp
                 key_tuple = (pad_id, finger_id)
-                if sdl_event.type == sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_UP:
+                if evt_type == sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_UP:
                     if key_tuple in self.touchpad_state:
                         self.touchpad_state.pop(key_tuple)
                 else:
-                    x, y, pressure = touch_event.x, touch_event.y, touch_event.pressure
                     self.touchpad_state[key_tuple] = Vec2(x, y)
 
+    def add_summed_sensor_sample(
+        self, sensor_type, data_x: float, data_y: float, data_z: float, timestamp: int
+    ):
+        gyro_raw = self.gyro_sample.set_value(0, 0, 0)
+        accel = self.accel_sample.set_value(0, 0, 0)
+        if sensor_type == sdl3.SDL_SENSOR_GYRO:
+            self.gyro_update = True
+            gyro_raw.set_value(data_x, data_y, data_z)
+            # SDL3 outputs gyro in radians per second
+            gyro_raw *= RADIANS_TO_DEGREES
+            if self.last_gyro_time == None:
+                self.last_gyro_time = timestamp
+            self.delta_time += (timestamp - self.last_gyro_time) / 1000000000.0
+            self.last_gyro_time = timestamp
+        if sensor_type == sdl3.SDL_SENSOR_ACCEL:
+            accel.set_value(data_x, data_y, data_z)
+        if self.gyro_calibrating:
+            self.gyro_calibration.update(gyro_raw)
+            self.gyro_update = False
+        else:
+            self.gyro_vec += gyro_raw
+            self.accel_vec += accel
+
+    def add_sensor_sample(
+        self, sensor_type, data_x: float, data_y: float, data_z: float, timestamp: int
+    ):
+        if sensor_type == sdl3.SDL_SENSOR_GYRO:
+            # SDL3 outputs gyro in radians per second
+            if self.gyro_calibrating:
+                self.gyro_calibration.update(
+                    self.gyro_sample.set_value(
+                        data_x * RADIANS_TO_DEGREES,
+                        data_y * RADIANS_TO_DEGREES,
+                        data_z * RADIANS_TO_DEGREES,
+                    )
+                )
+            else:
+                self.gyro_update = True
+                self.sensor_pipeline.add_gyro(
+                    timestamp,
+                    data_x * RADIANS_TO_DEGREES,
+                    data_y * RADIANS_TO_DEGREES,
+                    data_z * RADIANS_TO_DEGREES,
+                )
+        elif sensor_type == sdl3.SDL_SENSOR_ACCEL:
+            self.sensor_pipeline.add_accel(data_x, data_y, data_z)
+
     def send_changed_input_values(self, delta_time: float = 0.0):
+        if self.dispatch_mode == DispatchMode.INTERPRETED:
+            return self.send_changed_input_values_interpreted(delta_time=delta_time)
+        state = self.state
+        changed_inputs = self.input_store.get_inputs()
+        for source, value in changed_inputs.items():
+            # fetched per source, as a layer target may have changed the plan
+            handlers = state.handlers.get(source)
+            if handlers:
+                if self.latency:
+                    timestamp = self.input_store.get_timestamp(source)
+                    if timestamp is not None:
+                        self.latency_pending.append((source, timestamp))
+                for handler in handlers:
+                    handler(self, source, value, delta_time)
+            self.send_to_web_server(source, value)
+        self.input_store.clear()
+
+    def send_changed_input_values_interpreted(self, delta_time: float = 0.0):
         changed_inputs = self.input_store.get_inputs()
         for source in changed_inputs:
             value = changed_inputs.get(source)
-            target_raw = self.mapping.map.get(source)
+            target_raw = self.state.map.get(source)
+            if target_raw and self.latency:
+                timestamp = self.input_store.get_timestamp(source)
+                if timestamp is not None:
+                    self.latency_pending.append((source, timestamp))
             for target in (
                 target_raw if isinstance(target_raw, typing.Sequence) else (target_raw,)
             ):
@@ -450,6 +542,7 @@ class PyroGyroPad:
                             real_world_calibration=self.mapping.get_real_world_calibration(),
                             in_game_sens=self.mapping.get_in_game_sens(),
                             os_mouse_speed=self.mapping.get_os_mouse_speed_correction(),
+                            pad_state=self.state,
                         )
                         for mapped_output_key in complex_output_dict:
                             self.send_value(
@@ -468,30 +561,101 @@ class PyroGyroPad:
         if delta_time > delta_max:
             self.logger.debug(f"got delayed update clocking at {delta_time}")
             delta_time = 0
-        self.led.update(time_now)
-        color = self.led.get_rgb_color()
-        color_r, color_g, color_b = (
-            int(color.x * 255),
-            int(color.y * 255),
-            int(color.z * 255),
-        )
-        sdl3.SDL_SetGamepadLED(self.sdl_pad, color_r, color_g, color_b)
+        led_color = self.led.update(time_now)
+        if led_color:
+            self.send_latest_output((self, "led"), self.write_led, *led_color)
         if self.gyro_update:
-            self.gyro_vec = self.gyro_calibration.calibrated(self.gyro_vec)
-            adjusted_delta = self.delta_time if self.delta_time <= delta_max else 0
-            sensor_fusion_gravity(
-                self.gravity, self.gyro_vec, self.accel_vec, adjusted_delta
-            )
-            pixel_vel = self.mapping.gyro.mode.gyro_pixels(
-                self.gyro_vec,
-                self.gravity.normalized(),
-                adjusted_delta,
-                real_world_calibration=self.mapping.get_real_world_calibration(),
-                in_game_sens=self.mapping.get_in_game_sens(),
-            )
-            self.input_store.put_input(GyroSource.GYRO, pixel_vel)
+            if self.sensor_pipeline_mode == SensorPipelineMode.PER_SAMPLE:
+                pixel_vel = self.sensor_pipeline.process(
+                    self.gravity,
+                    self.gyro_calibration,
+                    self.mapping.gyro.mode,
+                    self.gyro_pixel_vel,
+                    delta_max,
+                    real_world_calibration=self.mapping.get_real_world_calibration(),
+                    in_game_sens=self.mapping.get_in_game_sens(),
+                    smooth_buffer=self.state.gyro_smooth_buffer,
+                )
+            else:
+                pixel_vel = self.summed_gyro_pixels(delta_max)
+            self.input_store.put_input(GyroSource.GYRO, pixel_vel, self.gyro_input_ts)
         if self.touchpad_update:
-            self.input_store.put_input(TouchSource.TOUCHPAD, self.touchpad_state)
+            self.input_store.put_input(
+                TouchSource.TOUCHPAD, self.touchpad_state, self.touchpad_input_ts
+            )
         self.send_changed_input_values(delta_time=delta_time)
-        self.vpad.update()
+        self.flush_outputs()
+        if self.latency_pending:
+            self.record_latency()
         self.last_timestamp = time_now
+
+    def summed_gyro_pixels(self, delta_max: float):
+        self.gyro_calibration.calibrate(self.gyro_vec)
+        adjusted_delta = self.delta_time if self.delta_time <= delta_max else 0
+        sensor_fusion_gravity(
+            self.gravity,
+            self.gyro_vec,
+            self.accel_vec,
+            adjusted_delta,
+            rotation=self.fusion_rotation,
+        )
+        return self.mapping.gyro.mode.gyro_pixels(
+            self.gyro_vec,
+            self.grav_norm.set_normalized(self.gravity),
+            adjusted_delta,
+            real_world_calibration=self.mapping.get_real_world_calibration(),
+            in_game_sens=self.mapping.get_in_game_sens(),
+            smooth_buffer=self.state.gyro_smooth_buffer,
+            out=self.gyro_pixel_vel,
+        )
+
+    def record_latency(self):
+        # SDL event timestamps are on the SDL_GetTicksNS clock
+        now_ns = sdl3.SDL_GetTicksNS()
+        for source, timestamp in self.latency_pending:
+            self.latency.record(source, now_ns - timestamp)
+        self.latency_pending.clear()
+
+    def write_led(self, color_r: int, color_g: int, color_b: int):
+        sdl3.SDL_SetGamepadLED(self.sdl_pad, color_r, color_g, color_b)
+
+    def flush_mouse(self):
+        if self.mouse_moved:
+            if self.output_frame is None:
+                MouseTarget.MOUSE.move_mouse(
+                    self.mouse_motion.x, self.mouse_motion.y, self.state.mouse_leftover
+                )
+            else:
+                leftover = self.state.mouse_leftover
+                vel_x = self.mouse_motion.x + leftover.x
+                vel_y = self.mouse_motion.y + leftover.y
+                move_x, move_y = int(vel_x), int(vel_y)
+                leftover.set_value(vel_x - move_x, vel_y - move_y)
+                self.output_frame.mouse_x += move_x
+                self.output_frame.mouse_y += move_y
+            self.mouse_motion.set_value(0, 0)
+            self.mouse_moved = False
+
+    def flush_outputs(self):
+        now_ns = time.monotonic_ns()
+        self.flush_mouse()
+        if self.output_frame is None or self.output_frame.has_mkb_output():
+            # an empty frame stays empty, and isn't submitted
+            self.send_latest_output(MKB_FLUSH_KEY, flush_mkb)
+        report = self.vpad_report.take(now_ns)
+        if report:
+            self.send_latest_output((self, "vpad"), self.vpad_report.send, report)
+        motors = self.rumble.take(now_ns)
+        if motors:
+            self.send_latest_output((self, "rumble"), self.write_rumble, *motors)
+        if self.output_frame:
+            # latency runs to when the dispatcher has made the calls
+            if self.latency_pending:
+                latency = self.latency
+                self.output_frame.input_timestamps.extend(
+                    (latency, source, timestamp)
+                    for source, timestamp in self.latency_pending
+                )
+                self.latency_pending.clear()
+            self.output_dispatcher.submit(self.output_frame)
+            self.output_frame = OutputFrame()
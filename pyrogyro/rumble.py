@@ -0,0 +1,86 @@
+"""
+Coalescing of rumble requests from the virtual pad.
+
+Games can change rumble hundreds of times a second, and ViGEm reports every
+change on its notification thread; writing each one to the real pad from
+there competes with the poll thread for the GIL and the device. RumbleSlot
+holds only the latest request: the notification thread replaces it with one
+attribute store (no lock), and the pad's own thread applies it at most
+`rate` times a second, skipping writes that wouldn't change the motors.
+
+Each write only lasts `duration` seconds, and a game holding a steady rumble
+may not send anything more, so running motors are written again once half
+the duration has passed.
+"""
+
+import time
+
+from pyrogyro.constants import RUMBLE_DURATION, RUMBLE_UPDATE_RATE
+
+
+class RumbleSlot:
+    def __init__(
+        self, rate: float = RUMBLE_UPDATE_RATE, duration: float = RUMBLE_DURATION
+    ):
+        # 0 applies every frame a request is waiting
+        self.interval_ns = int(1000000000 / rate) if rate else 0
+        self.duration_ms = int(duration * 1000)
+        self.refresh_ns = int(duration * 1000000000) // 2
+        # (sequence, large_motor, small_motor); replaced whole, never mutated
+        self.latest = (0, 0, 0)
+        self.taken_sequence = 0
+        self.motors = (0, 0)
+        self.next_apply_ns = 0
+        self.last_write_ns = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.requests = 0
+        self.written = 0
+        self.coalesced = 0
+        self.unchanged = 0
+        self.refreshed = 0
+
+    def request(self, large_motor: int, small_motor: int):
+        """
+        Called from the virtual pad's notification thread.
+        """
+        self.requests += 1
+        self.latest = (self.latest[0] + 1, large_motor, small_motor)
+
+    def take(self, now_ns: int | None = None):
+        """
+        Returns the (large_motor, small_motor) to write now, or None if
+        nothing new is due, the latest request matches the motors already and
+        they don't need refreshing yet.
+        """
+        sequence, large_motor, small_motor = self.latest
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        if sequence != self.taken_sequence and now_ns >= self.next_apply_ns:
+            # every request since the last one taken but this was overwritten
+            self.coalesced += sequence - self.taken_sequence - 1
+            self.taken_sequence = sequence
+            if (large_motor, small_motor) != self.motors:
+                self.motors = (large_motor, small_motor)
+                self.written += 1
+                return self.write_due(now_ns)
+            self.unchanged += 1
+        if self.motors != (0, 0) and now_ns - self.last_write_ns >= self.refresh_ns:
+            self.refreshed += 1
+            return self.write_due(now_ns)
+        return None
+
+    def write_due(self, now_ns: int):
+        self.last_write_ns = now_ns
+        self.next_apply_ns = now_ns + self.interval_ns
+        return self.motors
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "written": self.written,
+            "coalesced": self.coalesced,
+            "unchanged": self.unchanged,
+            "refreshed": self.refreshed,
+        }
@@ -0,0 +1,179 @@
+import enum
+import time
+from dataclasses import dataclass
+
+import sdl3
+
+from pyrogyro.constants import SCHEDULER_EVENT_CHECK_NS, SCHEDULER_SPIN_NS
+
+NS_PER_SECOND = 1000000000
+NS_PER_MS = 1000000
+
+
+class SchedulerMode(enum.Enum):
+    # sleep for whatever is left of each frame, timed from the frame's own start
+    DELAY = "DELAY"
+    # wake on an absolute grid of deadlines, so overruns don't accumulate as drift
+    DEADLINE = "DEADLINE"
+
+
+@dataclass
+class FrameStats:
+    frames: int = 0
+    overruns: int = 0
+    early_wakes: int = 0
+    jitter_total_ns: int = 0
+    jitter_max_ns: int = 0
+    busy_total_ns: int = 0
+    busy_max_ns: int = 0
+    window_start_ns: int = 0
+
+    def reset(self, now_ns: int):
+        self.frames = 0
+        self.overruns = 0
+        self.early_wakes = 0
+        self.jitter_total_ns = 0
+        self.jitter_max_ns = 0
+        self.busy_total_ns = 0
+        self.busy_max_ns = 0
+        self.window_start_ns = now_ns
+
+    def add_jitter(self, jitter_ns: int):
+        self.jitter_total_ns += jitter_ns
+        if jitter_ns > self.jitter_max_ns:
+            self.jitter_max_ns = jitter_ns
+
+    def add_busy(self, busy_ns: int):
+        self.busy_total_ns += busy_ns
+        if busy_ns > self.busy_max_ns:
+            self.busy_max_ns = busy_ns
+
+    def summary(self, now_ns: int):
+        elapsed = now_ns - self.window_start_ns
+        frames = max(self.frames, 1)
+        return {
+            "frames": self.frames,
+            "achieved_rate": (
+                self.frames * NS_PER_SECOND / elapsed if elapsed > 0 else 0.0
+            ),
+            "overruns": self.overruns,
+            "early_wakes": self.early_wakes,
+            "jitter_mean_us": self.jitter_total_ns / frames / 1000,
+            "jitter_max_us": self.jitter_max_ns / 1000,
+            "busy_mean_us": self.busy_total_ns / frames / 1000,
+            "busy_max_us": self.busy_max_ns / 1000,
+        }
+
+
+class PollScheduler:
+    """
+    Paces the input poll loop.
+
+    In DEADLINE mode, frames are due on a fixed grid (start + n * period). The
+    wait sleeps on the OS until shortly before the deadline and spins the rest
+    of the way, yielding the GIL to other threads as it does. With
+    wake_on_event, a pending SDL event ends the wait early: SDL only waits in
+    whole milliseconds, so shorter waits (all of them at 1000Hz) check for
+    events every event_check_ns instead. A frame that finishes after its
+    deadline counts as an overrun; any whole periods it missed are skipped
+    rather than replayed.
+    """
+
+    def __init__(
+        self,
+        poll_rate: int,
+        mode: SchedulerMode = SchedulerMode.DEADLINE,
+        spin_ns: int = SCHEDULER_SPIN_NS,
+        wake_on_event: bool = True,
+        event_check_ns: int = SCHEDULER_EVENT_CHECK_NS,
+    ):
+        self.mode = mode
+        self.spin_ns = spin_ns
+        self.wake_on_event = wake_on_event
+        self.event_check_ns = max(event_check_ns, 1)
+        self.poll_rate = poll_rate
+        self.frame_start_ns = None
+        self.stats = FrameStats()
+        # set to a list to record every frame's busy time, in ns
+        self.frame_times = None
+
+    @property
+    def poll_rate(self):
+        return self._poll_rate
+
+    @poll_rate.setter
+    def poll_rate(self, poll_rate: int):
+        self._poll_rate = poll_rate
+        self.period_ns = int(NS_PER_SECOND / poll_rate)
+        # re-anchor the grid on the next frame
+        self.next_deadline_ns = None
+
+    def begin_frame(self):
+        now = time.perf_counter_ns()
+        if self.next_deadline_ns is None:
+            self.next_deadline_ns = now + self.period_ns
+            self.stats.reset(now)
+        self.frame_start_ns = now
+        self.stats.frames += 1
+        return now
+
+    def end_frame(self):
+        now = time.perf_counter_ns()
+        busy_ns = now - self.frame_start_ns
+        self.stats.add_busy(busy_ns)
+        if self.frame_times is not None:
+            self.frame_times.append(busy_ns)
+        match self.mode:
+            case SchedulerMode.DEADLINE:
+                self._wait_for_deadline(now)
+            case SchedulerMode.DELAY:
+                deadline = self.frame_start_ns + self.period_ns
+                if now < deadline:
+                    sdl3.SDL_DelayNS(deadline - now)
+                    self.stats.add_jitter(max(time.perf_counter_ns() - deadline, 0))
+                else:
+                    self.stats.overruns += 1
+
+    def _wait_for_deadline(self, now: int):
+        deadline = self.next_deadline_ns
+        if now >= deadline:
+            self.stats.overruns += 1
+            missed_periods = (now - deadline) // self.period_ns
+            self.next_deadline_ns = deadline + (missed_periods + 1) * self.period_ns
+            return
+        self.next_deadline_ns = deadline + self.period_ns
+        sleep_until_ns = deadline - self.spin_ns
+        if self.wake_on_event:
+            if self._wait_for_event(sleep_until_ns):
+                self.stats.early_wakes += 1
+                return
+        elif sleep_until_ns > now:
+            sdl3.SDL_DelayNS(sleep_until_ns - now)
+        while time.perf_counter_ns() < deadline:
+            # let the pad worker, output and housekeeping threads run
+            time.sleep(0)
+        self.stats.add_jitter(time.perf_counter_ns() - deadline)
+
+    def _wait_for_event(self, until_ns: int) -> bool:
+        """
+        Sleeps until until_ns, returning True as soon as an SDL event is
+        pending.
+        """
+        while True:
+            remaining_ns = until_ns - time.perf_counter_ns()
+            if remaining_ns <= 0:
+                return False
+            if remaining_ns >= NS_PER_MS:
+                if sdl3.SDL_WaitEventTimeout(None, remaining_ns // NS_PER_MS):
+                    return True
+            else:
+                if sdl3.SDL_WaitEventTimeout(None, 0):
+                    return True
+                sdl3.SDL_DelayNS(min(remaining_ns, self.event_check_ns))
+
+    def summary(self, reset: bool = False):
+        now = time.perf_counter_ns()
+        summary = self.stats.summary(now)
+        if reset:
+            self.stats.reset(now)
+        return summary
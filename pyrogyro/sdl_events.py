@@ -0,0 +1,69 @@
+import ctypes
+import struct
+
+import sdl3
+
+from pyrogyro.constants import EVENT_BATCH_SIZE
+
+# Decoded events are plain tuples laid out as (type, timestamp, which, *payload):
+#   button:   (type, timestamp, which, button, down)
+#   axis:     (type, timestamp, which, axis, value)
+#   sensor:   (type, timestamp, which, sensor, x, y, z, sensor_timestamp)
+#   touchpad: (type, timestamp, which, touchpad, finger, x, y, pressure)
+#   other:    (type, timestamp, which)
+EVENT_TYPE = 0
+EVENT_TIMESTAMP = 1
+EVENT_WHICH = 2
+
+_EVENT_TYPE_STRUCT = struct.Struct("=I")
+_HEADER_STRUCT = struct.Struct("=I4xQI")
+_BUTTON_STRUCT = struct.Struct("=I4xQIB?")
+_AXIS_STRUCT = struct.Struct("=I4xQIB3xh")
+_SENSOR_STRUCT = struct.Struct("=I4xQIi3f4xQ")
+_TOUCHPAD_STRUCT = struct.Struct("=I4xQIii3f")
+
+EVENT_DECODERS = {
+    sdl3.SDL_EVENT_GAMEPAD_BUTTON_DOWN: _BUTTON_STRUCT.unpack_from,
+    sdl3.SDL_EVENT_GAMEPAD_BUTTON_UP: _BUTTON_STRUCT.unpack_from,
+    sdl3.SDL_EVENT_GAMEPAD_AXIS_MOTION: _AXIS_STRUCT.unpack_from,
+    sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE: _SENSOR_STRUCT.unpack_from,
+    sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_DOWN: _TOUCHPAD_STRUCT.unpack_from,
+    sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_MOTION: _TOUCHPAD_STRUCT.unpack_from,
+    sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_UP: _TOUCHPAD_STRUCT.unpack_from,
+}
+
+
+class EventBatch:
+    """
+    Drains the SDL event queue in batches with SDL_PeepEvents, into one
+    preallocated event array, and decodes each event straight out of the
+    raw buffer instead of going through the ctypes union wrappers.
+    """
+
+    def __init__(self, batch_size: int = EVENT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.events = (sdl3.SDL_Event * batch_size)()
+        self.buffer = memoryview(self.events).cast("B")
+        self.event_size = ctypes.sizeof(sdl3.SDL_Event)
+
+    def drain(self):
+        sdl3.SDL_PumpEvents()
+        buffer, event_size = self.buffer, self.event_size
+        read_type = _EVENT_TYPE_STRUCT.unpack_from
+        read_header = _HEADER_STRUCT.unpack_from
+        decoders = EVENT_DECODERS
+        while True:
+            count = sdl3.SDL_PeepEvents(
+                self.events,
+                self.batch_size,
+                sdl3.SDL_GETEVENT,
+                sdl3.SDL_EVENT_FIRST,
+                sdl3.SDL_EVENT_LAST,
+            )
+            if count <= 0:
+                return
+            for offset in range(0, count * event_size, event_size):
+                (evt_type,) = read_type(buffer, offset)
+                yield decoders.get(evt_type, read_header)(buffer, offset)
+            if count < self.batch_size:
+                return
@@ -0,0 +1,137 @@
+"""
+Per-sample gyro processing.
+
+Polling at 1000Hz, a pad can get several gyro reports in one frame and none
+in the next. Summing a frame's samples and integrating once over the frame's
+total delta time scales the frame's turn by the sample count as well as the
+elapsed time, and pairs the gyro with the summed accelerometer readings.
+SensorPipeline keeps each gyro sample of the frame with its sensor timestamp
+and the accelerometer reading current when it arrived, in buffers allocated
+once per pad. Calibration and gravity fusion run on every sample with its own
+delta time; the gyro camera then runs once per frame, on the samples' average
+rate over the time they cover. Smoothing, tightening and acceleration still
+see one entry per frame with gyro input, so smooth_window keeps its meaning.
+"""
+
+import enum
+
+from pyrogyro.constants import SENSOR_BUFFER_SIZE
+from pyrogyro.gamepad_motion import GyroCalibration, GyroConfig, sensor_fusion_gravity
+from pyrogyro.math import Quat, Vec2, Vec3
+
+
+class SensorPipelineMode(enum.Enum):
+    # each gyro sample is calibrated, fused and turned with its own delta time
+    PER_SAMPLE = "PER_SAMPLE"
+    # a frame's samples are summed and processed once with the frame's delta
+    SUMMED = "SUMMED"
+
+
+class SensorPipeline:
+    def __init__(self, capacity: int = SENSOR_BUFFER_SIZE):
+        self.capacity = max(capacity, 1)
+        # the first `count` entries are this frame's samples
+        self.gyro = [Vec3() for _ in range(self.capacity)]
+        self.accel = [Vec3() for _ in range(self.capacity)]
+        self.timestamps = [0] * self.capacity
+        self.count = 0
+        self.last_accel = Vec3()
+        # sensor timestamp of the last sample processed, in nanoseconds
+        self.last_timestamp = None
+        # scratch, reused for every sample
+        self.rotation = Quat(1.0, 0.0, 0.0, 0.0)
+        self.grav_norm = Vec3()
+        # the frame's calibrated gyro, weighted by each sample's delta time
+        self.gyro_sum = Vec3()
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.samples = 0
+        self.frames = 0
+        self.folded = 0
+
+    def add_accel(self, x: float, y: float, z: float):
+        self.last_accel.set_value(x, y, z)
+
+    def add_gyro(self, timestamp: int, x: float, y: float, z: float):
+        """
+        Buffers a gyro sample, in degrees per second, with its sensor
+        timestamp. Once the buffer is full each new sample replaces the last
+        one, and so also covers that sample's interval.
+        """
+        index = self.count
+        if index == self.capacity:
+            index -= 1
+            self.folded += 1
+        else:
+            self.count += 1
+        self.gyro[index].set_value(x, y, z)
+        accel = self.last_accel
+        self.accel[index].set_value(accel.x, accel.y, accel.z)
+        self.timestamps[index] = timestamp
+
+    def process(
+        self,
+        gravity: Vec3,
+        calibration: GyroCalibration,
+        gyro_config: GyroConfig,
+        out: Vec2,
+        delta_max: float,
+        real_world_calibration: float = 1.0,
+        in_game_sens: float = 1.0,
+        smooth_buffer=None,
+    ):
+        """
+        Runs the buffered samples through calibration and gravity fusion, then
+        the gyro camera over the time they cover, writing the mouse motion to
+        out, and empties the buffer. A sample more than delta_max seconds
+        after the one before (or the first ever) doesn't turn the camera.
+        """
+        out.set_value(0.0, 0.0)
+        if not self.count:
+            return out
+        gyro_sum = self.gyro_sum.set_value(0.0, 0.0, 0.0)
+        total_seconds = 0.0
+        last_timestamp = self.last_timestamp
+        for index in range(self.count):
+            timestamp = self.timestamps[index]
+            delta_seconds = 0.0
+            if last_timestamp is not None:
+                delta_seconds = (timestamp - last_timestamp) / 1000000000.0
+                if not 0.0 <= delta_seconds <= delta_max:
+                    delta_seconds = 0.0
+            last_timestamp = timestamp
+            gyro = calibration.calibrate(self.gyro[index])
+            sensor_fusion_gravity(
+                gravity, gyro, self.accel[index], delta_seconds, rotation=self.rotation
+            )
+            gyro_sum.set_value(
+                gyro_sum.x + gyro.x * delta_seconds,
+                gyro_sum.y + gyro.y * delta_seconds,
+                gyro_sum.z + gyro.z * delta_seconds,
+            )
+            total_seconds += delta_seconds
+        if total_seconds:
+            gyro_sum *= 1.0 / total_seconds
+        gyro_config.gyro_pixels(
+            gyro_sum,
+            self.grav_norm.set_normalized(gravity),
+            total_seconds,
+            real_world_calibration=real_world_calibration,
+            in_game_sens=in_game_sens,
+            smooth_buffer=smooth_buffer,
+            out=out,
+        )
+        self.last_timestamp = last_timestamp
+        self.samples += self.count
+        self.frames += 1
+        self.count = 0
+        return out
+
+    def summary(self):
+        return {
+            "frames": self.frames,
+            "samples": self.samples,
+            "samples_per_frame": self.samples / self.frames if self.frames else 0.0,
+            "folded": self.folded,
+        }
@@ -0,0 +1,382 @@
+"""
+Keyboard, mouse and gamepad output through Linux uinput devices.
+
+Writing input_events straight to /dev/uinput skips the X11 round trips (and
+cursor position queries) pyautogui makes on every call. Events are queued as
+they're produced and written with one os.write, behind a single SYN_REPORT,
+when the frame's outputs are flushed.
+
+A device created with test_mode=True writes to any file descriptor (a pipe
+or temp file) without the uinput ioctls, so the event stream can be checked
+with decode_events without root or a uinput module.
+"""
+
+import enum
+import functools
+import logging
+import os
+import struct
+import threading
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_REL = 0x02
+EV_ABS = 0x03
+SYN_REPORT = 0
+REL_X = 0x00
+REL_Y = 0x01
+BTN_LEFT = 0x110
+BTN_RIGHT = 0x111
+BTN_MIDDLE = 0x112
+BTN_SOUTH = 0x130
+BTN_EAST = 0x131
+BTN_NORTH = 0x133
+BTN_WEST = 0x134
+BTN_TL = 0x136
+BTN_TR = 0x137
+BTN_SELECT = 0x13A
+BTN_START = 0x13B
+BTN_MODE = 0x13C
+BTN_THUMBL = 0x13D
+BTN_THUMBR = 0x13E
+ABS_X = 0x00
+ABS_Y = 0x01
+ABS_Z = 0x02
+ABS_RX = 0x03
+ABS_RY = 0x04
+ABS_RZ = 0x05
+ABS_HAT0X = 0x10
+ABS_HAT0Y = 0x11
+BUS_USB = 0x03
+
+UINPUT_PATH = "/dev/uinput"
+UINPUT_VENDOR = 0x1209
+UINPUT_PRODUCT = 0x5047
+X360_VENDOR = 0x045E
+X360_PRODUCT = 0x028E
+
+
+def _ioc(direction, nr, size):
+    return (direction << 30) | (size << 16) | (ord("U") << 8) | nr
+
+
+_UINPUT_SETUP_STRUCT = struct.Struct("HHHH80sI")
+# struct uinput_abs_setup: code, then a struct input_absinfo
+_UINPUT_ABS_SETUP_STRUCT = struct.Struct("H2x6i")
+UI_DEV_CREATE = _ioc(0, 1, 0)
+UI_DEV_DESTROY = _ioc(0, 2, 0)
+UI_DEV_SETUP = _ioc(1, 3, _UINPUT_SETUP_STRUCT.size)
+UI_ABS_SETUP = _ioc(1, 4, _UINPUT_ABS_SETUP_STRUCT.size)
+UI_SET_EVBIT = _ioc(1, 100, 4)
+UI_SET_KEYBIT = _ioc(1, 101, 4)
+UI_SET_RELBIT = _ioc(1, 102, 4)
+UI_SET_ABSBIT = _ioc(1, 103, 4)
+
+# struct input_event: a struct timeval (ignored by uinput), type, code, value
+INPUT_EVENT_STRUCT = struct.Struct("llHHi")
+
+MOUSE_BUTTON_CODES = {
+    "left": BTN_LEFT,
+    "primary": BTN_LEFT,
+    "right": BTN_RIGHT,
+    "secondary": BTN_RIGHT,
+    "middle": BTN_MIDDLE,
+}
+
+# XUSB_BUTTON values (vgamepad) -> BTN_* codes; the dpad is reported as a hat
+XUSB_BUTTON_CODES = {
+    0x0010: BTN_START,
+    0x0020: BTN_SELECT,
+    0x0040: BTN_THUMBL,
+    0x0080: BTN_THUMBR,
+    0x0100: BTN_TL,
+    0x0200: BTN_TR,
+    0x0400: BTN_MODE,
+    0x1000: BTN_SOUTH,
+    0x2000: BTN_EAST,
+    0x4000: BTN_WEST,
+    0x8000: BTN_NORTH,
+}
+
+GAMEPAD_ABS_RANGES = {
+    ABS_X: (-32768, 32767),
+    ABS_Y: (-32768, 32767),
+    ABS_RX: (-32768, 32767),
+    ABS_RY: (-32768, 32767),
+    ABS_Z: (0, 255),
+    ABS_RZ: (0, 255),
+    ABS_HAT0X: (-1, 1),
+    ABS_HAT0Y: (-1, 1),
+}
+
+# pyautogui key names -> linux/input-event-codes.h KEY_* codes
+KEY_CODES = {
+    **dict(zip("1234567890", range(2, 12))),
+    **dict(zip("qwertyuiop", range(16, 26))),
+    **dict(zip("asdfghjkl", range(30, 39))),
+    **dict(zip("zxcvbnm", range(44, 51))),
+    **{f"f{index}": code for index, code in enumerate(range(59, 69), 1)},
+    "f11": 87,
+    "f12": 88,
+    **{f"f{index}": code for index, code in enumerate(range(183, 195), 13)},
+    **dict(zip(("num7", "num8", "num9"), range(71, 74))),
+    **dict(zip(("num4", "num5", "num6"), range(75, 78))),
+    **dict(zip(("num1", "num2", "num3"), range(79, 82))),
+    "num0": 82,
+    "esc": 1,
+    "escape": 1,
+    "-": 12,
+    "=": 13,
+    "backspace": 14,
+    "\b": 14,
+    "tab": 15,
+    "\t": 15,
+    "[": 26,
+    "]": 27,
+    "enter": 28,
+    "return": 28,
+    "\n": 28,
+    "\r": 28,
+    "ctrl": 29,
+    "ctrlleft": 29,
+    ";": 39,
+    "'": 40,
+    "`": 41,
+    "shift": 42,
+    "shiftleft": 42,
+    "\\": 43,
+    ",": 51,
+    ".": 52,
+    "/": 53,
+    "shiftright": 54,
+    "multiply": 55,
+    "alt": 56,
+    "altleft": 56,
+    "option": 56,
+    "optionleft": 56,
+    " ": 57,
+    "space": 57,
+    "capslock": 58,
+    "numlock": 69,
+    "scrolllock": 70,
+    "subtract": 74,
+    "add": 78,
+    "decimal": 83,
+    "ctrlright": 97,
+    "divide": 98,
+    "printscreen": 99,
+    "prntscrn": 99,
+    "prtsc": 99,
+    "prtscr": 99,
+    "print": 99,
+    "altright": 100,
+    "optionright": 100,
+    "home": 102,
+    "up": 103,
+    "pageup": 104,
+    "pgup": 104,
+    "left": 105,
+    "right": 106,
+    "end": 107,
+    "down": 108,
+    "pagedown": 109,
+    "pgdn": 109,
+    "insert": 110,
+    "delete": 111,
+    "del": 111,
+    "volumemute": 113,
+    "volumedown": 114,
+    "volumeup": 115,
+    "pause": 119,
+    "win": 125,
+    "winleft": 125,
+    "command": 125,
+    "winright": 126,
+    "apps": 127,
+    "playpause": 164,
+    "nexttrack": 163,
+    "prevtrack": 165,
+    "stop": 166,
+}
+
+
+class MkbBackend(enum.Enum):
+    # keyboard and mouse through pyautogui (pydirectinput on Windows)
+    PYAUTOGUI = "PYAUTOGUI"
+    # a uinput device; Linux only
+    UINPUT = "UINPUT"
+    # UINPUT on Linux when /dev/uinput is writable, else PYAUTOGUI
+    AUTO = "AUTO"
+
+    def resolve(self, system: str):
+        if self == MkbBackend.AUTO:
+            if system == "Linux" and os.access(UINPUT_PATH, os.W_OK):
+                return MkbBackend.UINPUT
+            return MkbBackend.PYAUTOGUI
+        return self
+
+
+def decode_events(data: bytes):
+    """
+    Returns the (type, code, value) of every input_event in data.
+    """
+    return [
+        (event_type, code, value)
+        for _, _, event_type, code, value in INPUT_EVENT_STRUCT.iter_unpack(data)
+    ]
+
+
+class UInputDevice:
+    """
+    A uinput device whose events are queued and written as one report by
+    flush(). Thread safe; pads on worker threads can share one device.
+    Subclasses declare their capabilities in enable_capabilities.
+    """
+
+    device_name = b"PyroGyro"
+    vendor = UINPUT_VENDOR
+    product = UINPUT_PRODUCT
+
+    def __init__(self, fd: int, test_mode: bool = False):
+        self.logger = logging.getLogger(type(self).__name__)
+        self.fd = fd
+        self.test_mode = test_mode
+        self.lock = threading.Lock()
+        self.pending = bytearray()
+        self.reports = 0
+        if not test_mode:
+            self.create()
+
+    @classmethod
+    def open(cls, path: str = UINPUT_PATH):
+        return cls(os.open(path, os.O_WRONLY | os.O_NONBLOCK | os.O_CLOEXEC))
+
+    def enable_capabilities(self, ioctl):
+        raise NotImplementedError
+
+    def create(self):
+        import fcntl
+
+        self.enable_capabilities(functools.partial(fcntl.ioctl, self.fd))
+        fcntl.ioctl(
+            self.fd,
+            UI_DEV_SETUP,
+            _UINPUT_SETUP_STRUCT.pack(
+                BUS_USB, self.vendor, self.product, 1, self.device_name, 0
+            ),
+        )
+        fcntl.ioctl(self.fd, UI_DEV_CREATE)
+
+    def close(self):
+        if not self.test_mode:
+            import fcntl
+
+            fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+        os.close(self.fd)
+
+    def queue_event(self, event_type: int, code: int, value: int):
+        with self.lock:
+            self.pending += INPUT_EVENT_STRUCT.pack(0, 0, event_type, code, value)
+
+    def flush(self):
+        """
+        Writes every queued event followed by one SYN_REPORT.
+        """
+        with self.lock:
+            if not self.pending:
+                return
+            self.pending += INPUT_EVENT_STRUCT.pack(0, 0, EV_SYN, SYN_REPORT, 0)
+            data = bytes(self.pending)
+            self.pending.clear()
+            self.reports += 1
+        try:
+            os.write(self.fd, data)
+        except BlockingIOError:
+            self.logger.debug("uinput device busy; dropped a report")
+
+
+class UInputMkb(UInputDevice):
+    """
+    A uinput device reporting relative mouse motion, mouse buttons and the
+    keys in KEY_CODES.
+    """
+
+    device_name = b"PyroGyro Keyboard/Mouse"
+
+    def __init__(self, fd: int, test_mode: bool = False):
+        self.unknown_keys = set()
+        super().__init__(fd, test_mode=test_mode)
+
+    def enable_capabilities(self, ioctl):
+        ioctl(UI_SET_EVBIT, EV_KEY)
+        ioctl(UI_SET_EVBIT, EV_REL)
+        ioctl(UI_SET_RELBIT, REL_X)
+        ioctl(UI_SET_RELBIT, REL_Y)
+        for code in {*KEY_CODES.values(), *MOUSE_BUTTON_CODES.values()}:
+            ioctl(UI_SET_KEYBIT, code)
+
+    def key_code(self, key: str):
+        code = KEY_CODES.get(key.lower())
+        if code is None and key not in self.unknown_keys:
+            self.unknown_keys.add(key)
+            self.logger.info(f"No uinput key code for '{key}'; ignoring it")
+        return code
+
+    def key_down(self, key: str):
+        code = self.key_code(key)
+        if code is not None:
+            self.queue_event(EV_KEY, code, 1)
+
+    def key_up(self, key: str):
+        code = self.key_code(key)
+        if code is not None:
+            self.queue_event(EV_KEY, code, 0)
+
+    def mouse_down(self, button: str = "left", **kwargs):
+        self.queue_event(EV_KEY, MOUSE_BUTTON_CODES[button], 1)
+
+    def mouse_up(self, button: str = "left", **kwargs):
+        self.queue_event(EV_KEY, MOUSE_BUTTON_CODES[button], 0)
+
+    def move_relative(self, x: int, y: int):
+        with self.lock:
+            if x:
+                self.pending += INPUT_EVENT_STRUCT.pack(0, 0, EV_REL, REL_X, x)
+            if y:
+                self.pending += INPUT_EVENT_STRUCT.pack(0, 0, EV_REL, REL_Y, y)
+
+
+class UInputGamepad(UInputDevice):
+    """
+    An Xbox 360 style uinput gamepad: XUSB buttons as BTN_* keys, the dpad
+    as a hat, sticks in [-32768, 32767] and triggers in [0, 255]. It takes
+    the same vendor/product IDs ViGEm's X360 pads do, so SDL maps it the
+    same way and the mapper ignores it as an input device.
+    """
+
+    device_name = b"PyroGyro Virtual X360 Pad"
+    vendor = X360_VENDOR
+    product = X360_PRODUCT
+
+    def enable_capabilities(self, ioctl):
+        ioctl(UI_SET_EVBIT, EV_KEY)
+        ioctl(UI_SET_EVBIT, EV_ABS)
+        for code in XUSB_BUTTON_CODES.values():
+            ioctl(UI_SET_KEYBIT, code)
+        for code, (minimum, maximum) in GAMEPAD_ABS_RANGES.items():
+            ioctl(UI_SET_ABSBIT, code)
+            ioctl(
+                UI_ABS_SETUP,
+                _UINPUT_ABS_SETUP_STRUCT.pack(code, 0, minimum, maximum, 0, 0, 0),
+            )
+
+    def set_button(self, xusb_button: int, pressed: bool):
+        self.queue_event(EV_KEY, XUSB_BUTTON_CODES[xusb_button], int(pressed))
+
+    def set_hat(self, x: int, y: int):
+        with self.lock:
+            self.pending += INPUT_EVENT_STRUCT.pack(0, 0, EV_ABS, ABS_HAT0X, x)
+            self.pending += INPUT_EVENT_STRUCT.pack(0, 0, EV_ABS, ABS_HAT0Y, y)
+
+    def set_axis(self, code: int, value: int):
+        self.queue_event(EV_ABS, code, value)
@@ -0,0 +1,248 @@
+"""
+Virtual gamepad output backends.
+
+PyroGyroPad drives its virtual pad (through VirtualPadReport) with the
+vgamepad X360 call set: press/release_button with XUSB_BUTTON values,
+triggers in [0, 255], sticks in [-32768, 32767] and update() to send the
+report. VirtualPad is that interface plus rumble and teardown, so the mapper
+can drive ViGEm on Windows, a uinput pad on Linux, or an in-memory recorder
+when there's nothing to drive (benchmarks, replays, servers).
+"""
+
+import enum
+import os
+import typing
+
+from pyrogyro.uinput import (
+    ABS_RX,
+    ABS_RY,
+    ABS_RZ,
+    ABS_X,
+    ABS_Y,
+    ABS_Z,
+    UINPUT_PATH,
+    UInputGamepad,
+)
+
+# on_rumble(large_motor, small_motor), both in [0, 255]
+RumbleCallback = typing.Callable[[int, int], typing.Any]
+
+DPAD_UP = 0x0001
+DPAD_DOWN = 0x0002
+DPAD_LEFT = 0x0004
+DPAD_RIGHT = 0x0008
+DPAD_BUTTONS = DPAD_UP | DPAD_DOWN | DPAD_LEFT | DPAD_RIGHT
+
+
+class VpadBackend(enum.Enum):
+    # ViGEmBus X360 pads through vgamepad; Windows only
+    VIGEM = "VIGEM"
+    # an X360 style uinput pad; Linux only, needs /dev/uinput write access
+    UINPUT = "UINPUT"
+    # keep reports in memory; no device is created
+    RECORDER = "RECORDER"
+    # VIGEM on Windows, UINPUT where /dev/uinput is writable, else RECORDER
+    AUTO = "AUTO"
+
+    def resolve(self, system: str):
+        if self == VpadBackend.AUTO:
+            if system == "Windows":
+                return VpadBackend.VIGEM
+            if system == "Linux" and os.access(UINPUT_PATH, os.W_OK):
+                return VpadBackend.UINPUT
+            return VpadBackend.RECORDER
+        return self
+
+
+class VirtualPad:
+    def press_button(self, button: int):
+        raise NotImplementedError
+
+    def release_button(self, button: int):
+        raise NotImplementedError
+
+    def left_trigger(self, value: int):
+        raise NotImplementedError
+
+    def right_trigger(self, value: int):
+        raise NotImplementedError
+
+    def left_joystick(self, x_value: int, y_value: int):
+        raise NotImplementedError
+
+    def right_joystick(self, x_value: int, y_value: int):
+        raise NotImplementedError
+
+    def update(self):
+        raise NotImplementedError
+
+    def set_rumble_callback(self, on_rumble: RumbleCallback | None):
+        pass
+
+    def vid_pid(self):
+        """
+        The (vendor, product) SDL will see this pad as, or None if SDL can't.
+        """
+        return None
+
+    def close(self):
+        pass
+
+
+class ViGEmVirtualPad(VirtualPad):
+    def __init__(self):
+        import vgamepad
+
+        self.vpad = vgamepad.VX360Gamepad()
+        self.on_rumble = None
+        self.press_button = self.vpad.press_button
+        self.release_button = self.vpad.release_button
+        self.left_trigger = self.vpad.left_trigger
+        self.right_trigger = self.vpad.right_trigger
+        self.left_joystick = self.vpad.left_joystick
+        self.right_joystick = self.vpad.right_joystick
+        self.update = self.vpad.update
+
+    def notification(
+        self, client, target, large_motor, small_motor, led_number, user_data
+    ):
+        """
+        vgamepad's callback, run on its notification thread at each state change
+
+        :param client: vigem bus ID
+        :param target: vigem device ID
+        :param large_motor: integer in [0, 255] representing the state of the large motor
+        :param small_motor: integer in [0, 255] representing the state of the small motor
+        :param led_number: integer in [0, 255] representing the state of the LED ring
+        :param user_data: placeholder, do not use
+        """
+        if self.on_rumble:
+            self.on_rumble(large_motor, small_motor)
+
+    def set_rumble_callback(self, on_rumble: RumbleCallback | None):
+        if on_rumble and not self.on_rumble:
+            self.vpad.register_notification(callback_function=self.notification)
+        elif self.on_rumble and not on_rumble:
+            self.vpad.unregister_notification()
+        self.on_rumble = on_rumble
+
+    def vid_pid(self):
+        return self.vpad.get_vid(), self.vpad.get_pid()
+
+    def close(self):
+        self.set_rumble_callback(None)
+        del self.vpad
+
+
+class UInputVirtualPad(VirtualPad):
+    """
+    Drives a UInputGamepad. Stick Y is flipped (evdev's points down) and the
+    XUSB dpad buttons become hat positions. Rumble isn't forwarded: uinput
+    force feedback needs the effect upload protocol, which isn't handled.
+    """
+
+    def __init__(self, device: UInputGamepad | None = None):
+        self.device = device or UInputGamepad.open()
+        self.dpad = 0
+
+    def press_button(self, button: int):
+        if button & DPAD_BUTTONS:
+            self.set_dpad(self.dpad | button)
+        else:
+            self.device.set_button(button, True)
+
+    def release_button(self, button: int):
+        if button & DPAD_BUTTONS:
+            self.set_dpad(self.dpad & ~button)
+        else:
+            self.device.set_button(button, False)
+
+    def set_dpad(self, dpad: int):
+        self.dpad = dpad
+        hat_x = bool(dpad & DPAD_RIGHT) - bool(dpad & DPAD_LEFT)
+        hat_y = bool(dpad & DPAD_DOWN) - bool(dpad & DPAD_UP)
+        self.device.set_hat(hat_x, hat_y)
+
+    def left_trigger(self, value: int):
+        self.device.set_axis(ABS_Z, value)
+
+    def right_trigger(self, value: int):
+        self.device.set_axis(ABS_RZ, value)
+
+    def left_joystick(self, x_value: int, y_value: int):
+        self.device.set_axis(ABS_X, x_value)
+        self.device.set_axis(ABS_Y, -1 - y_value)
+
+    def right_joystick(self, x_value: int, y_value: int):
+        self.device.set_axis(ABS_RX, x_value)
+        self.device.set_axis(ABS_RY, -1 - y_value)
+
+    def update(self):
+        self.device.flush()
+
+    def vid_pid(self):
+        return self.device.vendor, self.device.product
+
+    def close(self):
+        self.device.close()
+
+
+class RecorderVirtualPad(VirtualPad):
+    """
+    Keeps the current report in memory. Each update() counts one report and,
+    when record is set, appends (buttons, left_trigger, right_trigger,
+    left_x, left_y, right_x, right_y) to reports. rumble() plays the part of
+    a game's rumble request.
+    """
+
+    def __init__(self, record: bool = False):
+        self.buttons = 0
+        self.triggers = (0, 0)
+        self.left_stick = (0, 0)
+        self.right_stick = (0, 0)
+        self.update_count = 0
+        self.reports = [] if record else None
+        self.on_rumble = None
+
+    def press_button(self, button: int):
+        self.buttons |= button
+
+    def release_button(self, button: int):
+        self.buttons &= ~button
+
+    def left_trigger(self, value: int):
+        self.triggers = (value, self.triggers[1])
+
+    def right_trigger(self, value: int):
+        self.triggers = (self.triggers[0], value)
+
+    def left_joystick(self, x_value: int, y_value: int):
+        self.left_stick = (x_value, y_value)
+
+    def right_joystick(self, x_value: int, y_value: int):
+        self.right_stick = (x_value, y_value)
+
+    def update(self):
+        self.update_count += 1
+        if self.reports is not None:
+            self.reports.append(
+                (self.buttons, *self.triggers, *self.left_stick, *self.right_stick)
+            )
+
+    def set_rumble_callback(self, on_rumble: RumbleCallback | None):
+        self.on_rumble = on_rumble
+
+    def rumble(self, large_motor: int, small_motor: int):
+        if self.on_rumble:
+            self.on_rumble(large_motor, small_motor)
+
+
+def create_virtual_pad(backend: VpadBackend) -> VirtualPad:
+    match backend:
+        case VpadBackend.VIGEM:
+            return ViGEmVirtualPad()
+        case VpadBackend.UINPUT:
+            return UInputVirtualPad()
+        case VpadBackend.RECORDER:
+            return RecorderVirtualPad()
+    raise ValueError(f"Unresolved virtual pad backend {backend}")
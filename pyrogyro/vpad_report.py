@@ -0,0 +1,147 @@
+"""
+Dirty tracking for virtual gamepad reports.
+
+Every vpad.update() submits a report to ViGEm, a round trip through the
+kernel; at 1000Hz per pad most of those resubmit the report already there.
+VirtualPadReport keeps the report, quantized the way vgamepad quantizes it,
+and only submits when something changed (or a keepalive is due). The vpad
+itself is only touched when a report is sent, so reports can be taken on the
+thread computing outputs and sent from another.
+"""
+
+import time
+
+from pyrogyro.constants import VPAD_KEEPALIVE_INTERVAL
+
+TRIGGER_SCALE = 255
+STICK_SCALE = 32767
+
+
+class VirtualPadReport:
+    def __init__(self, vpad, keepalive_interval: float = VPAD_KEEPALIVE_INTERVAL):
+        self.vpad = vpad
+        # 0 disables the keepalive; the report is only sent when it changes
+        self.keepalive_ns = int(keepalive_interval * 1000000000)
+        self.buttons = 0
+        self.left_trigger = 0
+        self.right_trigger = 0
+        self.left_stick = (0, 0)
+        self.right_stick = (0, 0)
+        self.dirty = False
+        self.last_submit_ns = time.monotonic_ns()
+        # buttons held on the vpad, as of the last report sent
+        self.sent_buttons = 0
+        self.reset_counters()
+
+    def reset_counters(self):
+        self.submitted = 0
+        self.suppressed = 0
+        self.keepalives = 0
+        self.values_skipped = 0
+
+    def set_button(self, button: int, pressed: bool):
+        buttons = self.buttons | button if pressed else self.buttons & ~button
+        if buttons == self.buttons:
+            self.values_skipped += 1
+            return
+        self.buttons = buttons
+        self.dirty = True
+
+    def set_left_trigger(self, value: float):
+        trigger = round(value * TRIGGER_SCALE)
+        if trigger == self.left_trigger:
+            self.values_skipped += 1
+            return
+        self.left_trigger = trigger
+        self.dirty = True
+
+    def set_right_trigger(self, value: float):
+        trigger = round(value * TRIGGER_SCALE)
+        if trigger == self.right_trigger:
+            self.values_skipped += 1
+            return
+        self.right_trigger = trigger
+        self.dirty = True
+
+    def set_left_stick(self, x: float, y: float):
+        stick = (round(x * STICK_SCALE), round(y * STICK_SCALE))
+        if stick == self.left_stick:
+            self.values_skipped += 1
+            return
+        self.left_stick = stick
+        self.dirty = True
+
+    def set_right_stick(self, x: float, y: float):
+        stick = (round(x * STICK_SCALE), round(y * STICK_SCALE))
+        if stick == self.right_stick:
+            self.values_skipped += 1
+            return
+        self.right_stick = stick
+        self.dirty = True
+
+    def take(self, now_ns: int | None = None):
+        """
+        Returns the report to send if it changed since the last one taken, or
+        if the keepalive interval has passed; otherwise None.
+        """
+        if now_ns is None:
+            now_ns = time.monotonic_ns()
+        if not self.dirty:
+            if not self.keepalive_ns or (
+                now_ns - self.last_submit_ns < self.keepalive_ns
+            ):
+                self.suppressed += 1
+                return None
+            self.keepalives += 1
+        self.dirty = False
+        self.last_submit_ns = now_ns
+        self.submitted += 1
+        return (
+            self.buttons,
+            self.left_trigger,
+            self.right_trigger,
+            self.left_stick,
+            self.right_stick,
+        )
+
+    def send(self, report):
+        """
+        Writes a report from take() to the vpad and submits it.
+        """
+        buttons, left_trigger, right_trigger, left_stick, right_stick = report
+        changed_buttons = buttons ^ self.sent_buttons
+        button = 1
+        while changed_buttons:
+            if changed_buttons & button:
+                if buttons & button:
+                    self.vpad.press_button(button)
+                else:
+                    self.vpad.release_button(button)
+                changed_buttons &= ~button
+            button <<= 1
+        self.sent_buttons = buttons
+        self.vpad.left_trigger(left_trigger)
+        self.vpad.right_trigger(right_trigger)
+        self.vpad.left_joystick(*left_stick)
+        self.vpad.right_joystick(*right_stick)
+        self.vpad.update()
+
+    def submit(self, now_ns: int | None = None):
+        """
+        Sends the report if take() has one; returns whether it was sent.
+        """
+        report = self.take(now_ns)
+        if report is None:
+            return False
+        self.send(report)
+        return True
+
+    def summary(self):
+        total = self.submitted + self.suppressed
+        return {
+            "submitted": self.submitted,
+            "suppressed": self.suppressed,
+            "keepalives": self.keepalives,
+            "values_skipped": self.values_skipped,
+            "suppressed_pct": 100.0 * self.suppressed / total if total else 0.0,
+        }
@@ -2,9 +2,9 @@ import json
 import logging
 import threading
 
-from flask import Flask
+from flask import Flask, abort
 from flask import cli as flask_cli
-from flask import render_template, send_file
+from flask import jsonify, render_template, send_file
 from flask_sock import Sock
 
 from pyrogyro.constants import DEBUG, ROOT_DIR, icon_location
@@ -31,8 +31,10 @@ class WebServer:
         self.app.config["SOCK_SERVER_OPTIONS"] = {"ping_interval": 25}
         self.app.add_url_rule("/", "index", self.index)
         self.app.add_url_rule("/favicon.ico", "favicon", self.favicon)
+        self.app.add_url_rule("/stats/<name>", "stats", self.stats)
         self.ws_conns = set()
         self.conn_lock = threading.Lock()
+        self.stats_providers = {}
 
         @self.sock_app.route("/ws")
         def _(ws):
@@ -59,6 +61,15 @@ class WebServer:
     def index(self):
         return render_template("display.html", host=self.host, port=self.port)
 
+    def add_stats_provider(self, name, provider):
+        self.stats_providers[name] = provider
+
+    def stats(self, name):
+        provider = self.stats_providers.get(name)
+        if not provider:
+            abort(404)
+        return jsonify(provider())
+
     def favicon(self):
         return send_file(icon_location())
 
@@ -0,0 +1,42 @@
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from pyrogyro import config_loader
+from pyrogyro.config_loader import ConfigCache
+from pyrogyro.mapping import Mapping
+
+CONFIG_PATH = Path(__file__).parent.parent / "configs" / "default_xbox.yml"
+
+
+class ConfigCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "config_cache.pickle")
+        config_loader._cache_tag.cache_clear()
+        self.addCleanup(config_loader._cache_tag.cache_clear)
+        self.addCleanup(shutil.rmtree, self.temp_dir)
+
+    def load_with_new_cache(self):
+        cache = ConfigCache(self.cache_path)
+        mapping = cache.load(CONFIG_PATH)
+        cache.save()
+        return cache, mapping
+
+    def test_unchanged_config_is_served_from_the_cache(self):
+        self.load_with_new_cache()
+        cache, mapping = self.load_with_new_cache()
+        self.assertEqual((cache.hits, cache.misses), (1, 0))
+        with open(CONFIG_PATH) as config_file:
+            self.assertEqual(mapping.name, Mapping.load_from_file(config_file).name)
+
+    def test_mapping_schema_change_discards_the_cache(self):
+        self.load_with_new_cache()
+        config_loader._cache_tag.cache_clear()
+        schema = dict(Mapping.model_json_schema(), title="Changed")
+        with mock.patch.object(Mapping, "model_json_schema", return_value=schema):
+            cache, _ = self.load_with_new_cache()
+        self.assertEqual((cache.hits, cache.misses), (0, 1))
@@ -0,0 +1,194 @@
+import io
+import math
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import sdl3
+
+from pyrogyro.capture import CaptureWriter, diff_outputs, replay_capture
+from pyrogyro.dispatch import DispatchMode
+from pyrogyro.mapping import Mapping
+from pyrogyro.sensor_pipeline import SensorPipelineMode
+
+CONFIG_DIR = Path(__file__).parent.parent / "configs"
+
+LAYERED_MAPPING = """
+name: Layered
+counter_os_mouse_speed: true
+mapping:
+  S: [X_A, X_B]
+  E:
+    map_as: LAYER
+    layer: alt
+  LSTICK:
+    map_as: DPAD
+    UP: X_UP
+    DOWN: X_DOWN
+    LEFT: X_LEFT
+    RIGHT: X_RIGHT
+  RSTICK:
+    map_as: AIM
+    o: MOUSE
+  GYRO: MOUSE
+  L2: X_L2
+layers:
+  alt:
+    mapping:
+      S: X_Y
+      RSTICK: X_RSTICK
+      L2: [LMOUSE, X_R2]
+      TOUCHPAD:
+        map_as: GRID_STICKS
+        pad_fingers:
+          0:
+            0:
+              map_as: AIM
+              o: MOUSE
+"""
+
+
+def write_synthetic_capture(path, frames: int = 600):
+    """
+    Two pads turning, moving both sticks, pulling the left trigger, pressing
+    face buttons and dragging a finger over the touchpad.
+    """
+    writer = CaptureWriter(path)
+    writer.add_device(7, "PS4 Controller")
+    writer.add_device(9, "DualSense")
+    timestamp = 0
+    for index in range(frames):
+        events = []
+        timestamp += 1000000
+        for pad in (7, 9):
+            rate = 1.0 if pad == 7 else 1.3
+            events.append(
+                (
+                    sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE,
+                    timestamp,
+                    pad,
+                    sdl3.SDL_SENSOR_GYRO,
+                    0.1 * math.sin(index / 10 * rate),
+                    0.5 * math.cos(index / 20),
+                    0.02,
+                    timestamp,
+                )
+            )
+            events.append(
+                (
+                    sdl3.SDL_EVENT_GAMEPAD_SENSOR_UPDATE,
+                    timestamp,
+                    pad,
+                    sdl3.SDL_SENSOR_ACCEL,
+                    0.0,
+                    -9.8,
+                    0.1,
+                    timestamp,
+                )
+            )
+            axis = sdl3.SDL_EVENT_GAMEPAD_AXIS_MOTION
+            if index % 7 == 0:
+                stick_x = int(32000 * math.sin(index / 30 * rate))
+                stick_y = int(32000 * math.cos(index / 30))
+                events.append(
+                    (axis, timestamp, pad, sdl3.SDL_GAMEPAD_AXIS_LEFTX, stick_x)
+                )
+                events.append(
+                    (axis, timestamp, pad, sdl3.SDL_GAMEPAD_AXIS_LEFTY, stick_y)
+                )
+                events.append(
+                    (axis, timestamp, pad, sdl3.SDL_GAMEPAD_AXIS_RIGHTX, stick_y)
+                )
+                events.append(
+                    (axis, timestamp, pad, sdl3.SDL_GAMEPAD_AXIS_RIGHTY, -stick_x)
+                )
+            if index % 30 == 0:
+                trigger = 30000 if index % 60 else 0
+                events.append(
+                    (axis, timestamp, pad, sdl3.SDL_GAMEPAD_AXIS_LEFT_TRIGGER, trigger)
+                )
+            for button, down_at, up_at, period in ((0, 0, 20, 40), (1, 10, 55, 90)):
+                if index % period in (down_at, up_at):
+                    pressed = index % period == down_at
+                    event_type = (
+                        sdl3.SDL_EVENT_GAMEPAD_BUTTON_DOWN
+                        if pressed
+                        else sdl3.SDL_EVENT_GAMEPAD_BUTTON_UP
+                    )
+                    events.append((event_type, timestamp, pad, button, pressed))
+            if 100 < index < 340 and index % 3:
+                event_type = (
+                    sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_MOTION
+                    if index > 101
+                    else sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_DOWN
+                )
+                finger_x = 0.1 + index / 1000
+                finger_y = 0.5 + math.sin(index / 20) * 0.2
+                events.append(
+                    (event_type, timestamp, pad, 0, 0, finger_x, finger_y, 1.0)
+                )
+            elif index == 340:
+                events.append(
+                    (
+                        sdl3.SDL_EVENT_GAMEPAD_TOUCHPAD_UP,
+                        timestamp,
+                        pad,
+                        0,
+                        0,
+                        0.1,
+                        0.5,
+                        0.0,
+                    )
+                )
+        writer.write_frame(1000.0 + index * 0.001, events)
+    writer.close()
+
+
+class DispatchModeTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.capture_path = os.path.join(cls.temp_dir.name, "synthetic.pgcap")
+        write_synthetic_capture(cls.capture_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def replay(self, mapping, dispatch_mode):
+        return replay_capture(
+            self.capture_path,
+            mapping,
+            dispatch_mode=dispatch_mode,
+            sensor_pipeline_mode=SensorPipelineMode.SUMMED,
+        )
+
+    def assert_modes_match(self, mapping):
+        interpreted = self.replay(mapping, DispatchMode.INTERPRETED)
+        compiled = self.replay(mapping, DispatchMode.COMPILED)
+        self.assertTrue(interpreted)
+        self.assertEqual(diff_outputs(interpreted, compiled), [])
+
+    def test_shipped_configs(self):
+        for config_path in sorted(CONFIG_DIR.glob("*.yml")):
+            with self.subTest(config=config_path.name):
+                with open(config_path) as config_file:
+                    self.assert_modes_match(Mapping.load_from_file(config_file))
+
+    def test_layers_and_nested_targets(self):
+        mapping = Mapping.load_from_file(io.StringIO(LAYERED_MAPPING))
+        with mock.patch("pyrogyro.mapping.get_os_mouse_speed", return_value=1.0):
+            self.assert_modes_match(mapping)
+
+    def test_os_mouse_speed_is_read_on_every_input(self):
+        mapping = Mapping.load_from_file(io.StringIO(LAYERED_MAPPING))
+        with mock.patch("pyrogyro.mapping.get_os_mouse_speed", return_value=1.0):
+            before = self.replay(mapping, DispatchMode.COMPILED)
+        # the compiled plans are cached on the mapping, and must follow the change
+        with mock.patch("pyrogyro.mapping.get_os_mouse_speed", return_value=2.0):
+            self.assert_modes_match(mapping)
+            self.assertNotEqual(
+                diff_outputs(before, self.replay(mapping, DispatchMode.COMPILED)), []
+            )
@@ -0,0 +1,69 @@
+import unittest
+
+from pyrogyro.alloc_util import GYRO_FRAME_ALLOC_BUDGET, peak_frame_bytes
+from pyrogyro.gamepad_motion import (
+    GyroCalibration,
+    GyroConfig,
+    GyroMode,
+    sensor_fusion_gravity,
+)
+from pyrogyro.math import Quat, Vec2, Vec3
+
+DELTA_SECONDS = 0.001
+
+
+class GyroAllocationTest(unittest.TestCase):
+    def setUp(self):
+        self.calibration = GyroCalibration()
+        self.calibration.update(Vec3(0.5, -0.25, 0.125))
+        self.gravity = Vec3(0.0, -1.0, 0.0)
+        self.accel = Vec3(0.05, 0.98, -0.1)
+
+    def test_in_place_frame_stays_within_budget(self):
+        gyro = Vec3()
+        rotation = Quat(1.0, 0.0, 0.0, 0.0)
+        grav_norm = Vec3()
+        pixel_vel = Vec2()
+        for gyro_mode in GyroMode:
+            config = GyroConfig(
+                gyro_mode=gyro_mode,
+                gyro_sens=2.0,
+                slow_threshold=10.0,
+                fast_threshold=100.0,
+            )
+
+            def frame():
+                gyro.set_value(40.0, -75.0, 20.0)
+                self.calibration.calibrate(gyro)
+                sensor_fusion_gravity(
+                    self.gravity, gyro, self.accel, DELTA_SECONDS, rotation=rotation
+                )
+                config.gyro_pixels(
+                    gyro,
+                    grav_norm.set_normalized(self.gravity),
+                    DELTA_SECONDS,
+                    out=pixel_vel,
+                )
+
+            with self.subTest(gyro_mode=gyro_mode):
+                self.assertLessEqual(
+                    peak_frame_bytes(frame, 200), GYRO_FRAME_ALLOC_BUDGET
+                )
+
+
+class GyroSmoothingTest(unittest.TestCase):
+    def test_smoothing_without_a_buffer_is_an_error(self):
+        config = GyroConfig(gyro_mode=GyroMode.LOCAL, smooth_window=4)
+        with self.assertRaises(ValueError):
+            config.gyro_pixels(Vec3(1.0, 2.0, 3.0), Vec3(0.0, -1.0, 0.0), 0.01)
+
+    def test_smoothing_averages_the_window(self):
+        config = GyroConfig(gyro_mode=GyroMode.LOCAL, smooth_window=2)
+        smooth_buffer = config.new_smooth_buffer()
+        pixels = [
+            config.gyro_camera(
+                Vec3(pitch, 0.0, 0.0), Vec3(0.0, -1.0, 0.0), 1.0, smooth_buffer
+            ).y
+            for pitch in (2.0, 4.0, 8.0)
+        ]
+        self.assertEqual(pixels, [2.0, 3.0, 6.0])
@@ -0,0 +1,98 @@
+import unittest
+from unittest import mock
+
+from pyrogyro.output_dispatch import (
+    MKB_FLUSH_KEY,
+    OutputDispatcher,
+    OutputFrame,
+    OutputQueuePolicy,
+)
+
+
+def frame(events=(), mouse=(0, 0), latest=None):
+    output_frame = OutputFrame()
+    output_frame.events.extend(events)
+    output_frame.mouse_x, output_frame.mouse_y = mouse
+    output_frame.latest.update(latest or {})
+    return output_frame
+
+
+class OutputDispatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+    def call(self, name):
+        return (self.calls.append, (name,))
+
+    def queued(self, dispatcher):
+        return list(dispatcher.frames)
+
+    def test_drop_keeps_only_the_dropped_frames_key_events(self):
+        dispatcher = OutputDispatcher(capacity=1, policy=OutputQueuePolicy.DROP)
+        dispatcher.submit(
+            frame(
+                events=[self.call("key a")],
+                mouse=(3, 1),
+                latest={
+                    "led": self.call("led 1"),
+                    "rumble": self.call("rumble"),
+                    MKB_FLUSH_KEY: self.call("flush"),
+                },
+            )
+        )
+        dispatcher.submit(frame(mouse=(2, -1), latest={"led": self.call("led 2")}))
+        (queued,) = self.queued(dispatcher)
+        self.assertEqual(dispatcher.dropped, 1)
+        # the stale mouse motion, LED and rumble writes
+        self.assertEqual(dispatcher.dropped_outputs, 3)
+        self.assertEqual((queued.mouse_x, queued.mouse_y), (2, -1))
+        queued.mouse_x = queued.mouse_y = 0
+        queued.run()
+        self.assertEqual(self.calls, ["key a", "led 2", "flush"])
+
+    def test_drop_of_a_frame_with_only_latest_calls(self):
+        dispatcher = OutputDispatcher(capacity=1, policy=OutputQueuePolicy.DROP)
+        dispatcher.submit(frame(latest={"led": self.call("led")}))
+        dispatcher.submit(frame(latest={MKB_FLUSH_KEY: self.call("flush")}))
+        (queued,) = self.queued(dispatcher)
+        queued.run()
+        self.assertEqual(self.calls, ["flush"])
+        self.assertEqual(dispatcher.dropped_outputs, 1)
+
+    def test_merge_keeps_every_frames_outputs(self):
+        dispatcher = OutputDispatcher(capacity=1, policy=OutputQueuePolicy.MERGE)
+        dispatcher.submit(frame(events=[self.call("key a")], mouse=(1, 1)))
+        dispatcher.submit(
+            frame(events=[self.call("key b")], latest={"led": self.call("led")})
+        )
+        (queued,) = self.queued(dispatcher)
+        self.assertEqual((queued.mouse_x, queued.mouse_y), (1, 1))
+        queued.mouse_x = queued.mouse_y = 0
+        queued.run()
+        self.assertEqual(self.calls, ["key a", "key b", "led"])
+
+    def test_only_key_and_mouse_output_needs_an_mkb_flush(self):
+        self.assertFalse(frame().has_mkb_output())
+        self.assertFalse(frame(latest={"led": self.call("led")}).has_mkb_output())
+        self.assertTrue(frame(events=[self.call("key a")]).has_mkb_output())
+        self.assertTrue(frame(mouse=(0, -1)).has_mkb_output())
+
+    def test_input_latency_is_recorded_after_the_calls(self):
+        class Tracker:
+            def __init__(self, calls):
+                self.calls = calls
+
+            def record(self, source, latency_ns):
+                self.calls.append(("latency", source, latency_ns))
+
+        sent = frame(events=[self.call("key a")])
+        sent.input_timestamps.append((Tracker(self.calls), "A", 1000))
+        with mock.patch("sdl3.SDL_GetTicksNS", return_value=5000):
+            dispatcher = OutputDispatcher().start()
+            dispatcher.submit(sent)
+            dispatcher.stop()
+        self.assertEqual(self.calls, ["key a", ("latency", "A", 4000)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+import threading
+import unittest
+
+from pyrogyro.capture import ReplayPad
+from pyrogyro.mapping import Mapping
+
+
+class InterleavingLock:
+    """
+    Wraps a pad's pending_lock: the first time the pad takes it, write() is
+    started on another thread and given a moment to run before the pad goes
+    on to clear the pending change it read.
+    """
+
+    def __init__(self, lock, write):
+        self.lock = lock
+        self.write = write
+        self.writer = None
+
+    def __enter__(self):
+        self.lock.acquire()
+        if self.writer is None:
+            self.writer = threading.Thread(target=self.write)
+            self.writer.start()
+            self.writer.join(0.05)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.lock.release()
+
+
+class PendingChangeTest(unittest.TestCase):
+    def setUp(self):
+        self.pad = ReplayPad(0, "Test Pad", mapping=Mapping(name="Start"))
+
+    def interleave(self, write):
+        lock = InterleavingLock(self.pad.pending_lock, write)
+        self.pad.pending_lock = lock
+        self.pad.on_poll_start()
+        lock.writer.join()
+
+    def test_calibration_stop_during_a_start_is_kept(self):
+        self.pad.set_gyro_calibrating(True)
+        self.interleave(lambda: self.pad.set_gyro_calibrating(False))
+        self.assertTrue(self.pad.gyro_calibrating)
+        self.pad.on_poll_start()
+        self.assertFalse(self.pad.gyro_calibrating)
+
+    def test_mapping_switch_during_a_switch_is_kept(self):
+        first, second = Mapping(name="First"), Mapping(name="Second")
+        self.pad.apply_mapping(first)
+        self.interleave(lambda: self.pad.apply_mapping(second))
+        self.assertIs(self.pad.mapping, first)
+        self.pad.on_poll_start()
+        self.assertIs(self.pad.mapping, second)
@@ -0,0 +1,45 @@
+import unittest
+
+from pyrogyro.rumble import RumbleSlot
+
+MS = 1000000
+
+
+class RumbleSlotTest(unittest.TestCase):
+    def test_steady_rumble_is_refreshed_before_it_expires(self):
+        slot = RumbleSlot(rate=100, duration=1.0)
+        slot.request(200, 100)
+        self.assertEqual(slot.take(1000 * MS), (200, 100))
+        # the game re-sends the same values: nothing to write yet
+        slot.request(200, 100)
+        self.assertIsNone(slot.take(1100 * MS))
+        self.assertIsNone(slot.take(1400 * MS))
+        # nothing new at all, but the write would run out at 2000ms
+        self.assertEqual(slot.take(1500 * MS), (200, 100))
+        self.assertIsNone(slot.take(1600 * MS))
+        self.assertEqual(slot.take(2000 * MS), (200, 100))
+        self.assertEqual(slot.written, 1)
+        self.assertEqual(slot.unchanged, 1)
+        self.assertEqual(slot.refreshed, 2)
+
+    def test_stopped_motors_are_not_refreshed(self):
+        slot = RumbleSlot(rate=100, duration=1.0)
+        slot.request(200, 100)
+        slot.take(1000 * MS)
+        slot.request(0, 0)
+        self.assertEqual(slot.take(1020 * MS), (0, 0))
+        self.assertIsNone(slot.take(5000 * MS))
+
+    def test_requests_are_rate_limited_and_coalesced(self):
+        slot = RumbleSlot(rate=100, duration=1.0)
+        slot.request(10, 10)
+        self.assertEqual(slot.take(1000 * MS), (10, 10))
+        slot.request(20, 20)
+        slot.request(30, 30)
+        self.assertIsNone(slot.take(1005 * MS))
+        self.assertEqual(slot.take(1010 * MS), (30, 30))
+        self.assertEqual(slot.coalesced, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
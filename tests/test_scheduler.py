@@ -0,0 +1,56 @@
+import time
+import unittest
+from unittest import mock
+
+from pyrogyro.scheduler import PollScheduler
+
+MS = 1000000
+
+
+def sleep_ns(ns, *args):
+    time.sleep(ns / 1000000000.0)
+    return False
+
+
+class PollSchedulerTest(unittest.TestCase):
+    def test_events_end_a_sub_millisecond_wait_at_1000hz(self):
+        scheduler = PollScheduler(1000)
+        with mock.patch("sdl3.SDL_WaitEventTimeout", return_value=True) as wait:
+            scheduler.begin_frame()
+            scheduler.end_frame()
+        # a whole frame left to wait is under SDL's 1ms resolution
+        wait.assert_called_once_with(None, 0)
+        self.assertEqual(scheduler.stats.early_wakes, 1)
+
+    def test_wait_checks_for_events_until_the_deadline(self):
+        scheduler = PollScheduler(1000, spin_ns=0, event_check_ns=MS // 10)
+        with (
+            mock.patch("sdl3.SDL_WaitEventTimeout", return_value=False) as wait,
+            mock.patch("sdl3.SDL_DelayNS", side_effect=sleep_ns),
+        ):
+            scheduler.begin_frame()
+            deadline = scheduler.next_deadline_ns
+            scheduler.end_frame()
+        self.assertGreaterEqual(time.perf_counter_ns(), deadline)
+        # every check was a poll, the whole wait being under 1ms
+        self.assertTrue(wait.call_args_list)
+        for call in wait.call_args_list:
+            self.assertEqual(call, mock.call(None, 0))
+        self.assertEqual(scheduler.stats.early_wakes, 0)
+
+    def test_longer_waits_use_sdl_timeout(self):
+        scheduler = PollScheduler(100)
+        waits = []
+
+        def wait_event(event, timeout_ms):
+            waits.append(timeout_ms)
+            time.sleep(timeout_ms / 1000.0)
+            return False
+
+        with (
+            mock.patch("sdl3.SDL_WaitEventTimeout", side_effect=wait_event),
+            mock.patch("sdl3.SDL_DelayNS", side_effect=sleep_ns),
+        ):
+            scheduler.begin_frame()
+            scheduler.end_frame()
+        self.assertGreaterEqual(waits[0], 8)
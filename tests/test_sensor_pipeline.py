@@ -0,0 +1,73 @@
+import unittest
+
+from pyrogyro.gamepad_motion import GyroCalibration, GyroConfig, GyroMode
+from pyrogyro.math import Vec2, Vec3
+from pyrogyro.sensor_pipeline import SensorPipeline
+
+FRAME_NS = 1000000
+DELTA_MAX = 0.005
+
+
+def run_frames(config, samples_per_frame, frames=200, smooth_buffer=None):
+    """
+    A steady 90 deg/s yaw with the pad flat, reported samples_per_frame
+    times per 1ms frame. Returns each frame's mouse motion.
+    """
+    pipeline = SensorPipeline()
+    gravity = Vec3(0.0, -1.0, 0.0)
+    calibration = GyroCalibration()
+    pixels = Vec2()
+    sample_ns = FRAME_NS // samples_per_frame
+    timestamp = 0
+    motion = []
+    for _ in range(frames):
+        for _ in range(samples_per_frame):
+            timestamp += sample_ns
+            pipeline.add_accel(0.0, 1.0, 0.0)
+            pipeline.add_gyro(timestamp, 0.0, 90.0, 0.0)
+        pipeline.process(
+            gravity,
+            calibration,
+            config,
+            pixels,
+            DELTA_MAX,
+            smooth_buffer=smooth_buffer,
+        )
+        motion.append((pixels.x, pixels.y))
+    return motion
+
+
+class SensorPipelineTest(unittest.TestCase):
+    def assert_motion_equal(self, expected, actual):
+        self.assertEqual(len(expected), len(actual))
+        for (exp_x, exp_y), (act_x, act_y) in zip(expected, actual):
+            self.assertAlmostEqual(exp_x, act_x)
+            self.assertAlmostEqual(exp_y, act_y)
+
+    def test_turn_does_not_scale_with_sample_count(self):
+        for gyro_mode in (GyroMode.LOCAL, GyroMode.WORLD, GyroMode.PLAYER_TURN):
+            with self.subTest(gyro_mode=gyro_mode):
+                config = GyroConfig(gyro_mode=gyro_mode)
+                single = run_frames(config, 1)
+                # the first frame only starts the clock
+                self.assertEqual(single[0], (0.0, 0.0))
+                self.assertAlmostEqual(single[1][0], -0.09)
+                self.assert_motion_equal(single[1:], run_frames(config, 4)[1:])
+
+    def test_smoothing_window_counts_frames(self):
+        config = GyroConfig(gyro_mode=GyroMode.WORLD, smooth_window=3)
+        single_buffer = config.new_smooth_buffer()
+        multi_buffer = config.new_smooth_buffer()
+        single = run_frames(config, 1, frames=10, smooth_buffer=single_buffer)
+        multi = run_frames(config, 4, frames=10, smooth_buffer=multi_buffer)
+        # once the first frame, which starts the clock, is out of the window
+        self.assert_motion_equal(single[3:], multi[3:])
+        self.assertEqual(len(multi_buffer), 3)
+
+    def test_full_buffer_folds_into_the_last_sample(self):
+        pipeline = SensorPipeline(capacity=2)
+        for timestamp in (1, 2, 3):
+            pipeline.add_gyro(timestamp, 0.0, float(timestamp), 0.0)
+        self.assertEqual((pipeline.count, pipeline.folded), (2, 1))
+        self.assertEqual(pipeline.timestamps, [1, 3])
+        self.assertEqual(pipeline.gyro[1].y, 3.0)
@@ -0,0 +1,70 @@
+import os
+import unittest
+
+from pyrogyro.uinput import (
+    BTN_LEFT,
+    EV_KEY,
+    EV_REL,
+    EV_SYN,
+    INPUT_EVENT_STRUCT,
+    KEY_CODES,
+    REL_X,
+    REL_Y,
+    SYN_REPORT,
+    UInputMkb,
+    decode_events,
+)
+
+
+class UInputMkbTest(unittest.TestCase):
+    def setUp(self):
+        self.read_fd, write_fd = os.pipe()
+        self.device = UInputMkb(write_fd, test_mode=True)
+
+    def tearDown(self):
+        self.device.close()
+        os.close(self.read_fd)
+
+    def read_events(self):
+        return decode_events(os.read(self.read_fd, 4096))
+
+    def test_sequence_is_one_report(self):
+        self.device.key_down("a")
+        self.device.mouse_down(button="left")
+        self.device.move_relative(3, -2)
+        self.device.mouse_up(button="left")
+        self.device.key_up("a")
+        self.device.flush()
+        self.assertEqual(
+            self.read_events(),
+            [
+                (EV_KEY, KEY_CODES["a"], 1),
+                (EV_KEY, BTN_LEFT, 1),
+                (EV_REL, REL_X, 3),
+                (EV_REL, REL_Y, -2),
+                (EV_KEY, BTN_LEFT, 0),
+                (EV_KEY, KEY_CODES["a"], 0),
+                (EV_SYN, SYN_REPORT, 0),
+            ],
+        )
+        self.assertEqual(self.device.reports, 1)
+
+    def test_zero_motion_and_unknown_keys_are_skipped(self):
+        self.device.move_relative(0, 5)
+        self.device.key_down("not a key")
+        self.device.flush()
+        self.assertEqual(
+            self.read_events(), [(EV_REL, REL_Y, 5), (EV_SYN, SYN_REPORT, 0)]
+        )
+
+    def test_empty_flush_writes_nothing(self):
+        self.device.flush()
+        self.device.key_down("b")
+        self.device.flush()
+        data = os.read(self.read_fd, 4096)
+        self.assertEqual(len(data), 2 * INPUT_EVENT_STRUCT.size)
+        self.assertEqual(self.device.reports, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()